@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""Benchmark suite of the signal and noise generators.
+
+Every generator registered in `syntheticprophet.signals` and `syntheticprophet.noise`
+is timed stepwise (one `sample_next` call per time point) and vectorized (one
+`sample_vectorized` call), on regular and irregular `TimeSampler` output, for series of
+10^2 to 10^6 points. Each case runs in a forked process, which reports the best wall
+time over the repeats, the throughput in points per second and the peak resident
+memory of the sampling. The import time of the package, and of each lazily resolved
+generator, is measured in fresh interpreters.
+
+Usage
+-----
+Run the suite, and write the results as JSON::
+
+    python benchmarks/bench.py run --output results.json
+
+Compare results against a stored baseline, exiting with status 1 on regressions::
+
+    python benchmarks/bench.py compare baseline.json results.json
+
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import warnings
+from typing import Callable, Dict, List, Optional
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Benchmark the checkout the script belongs to, not an installed version
+sys.path.insert(0, REPO_DIR)
+
+import torch  # noqa: E402
+import syntheticprophet as sp  # noqa: E402
+from syntheticprophet import noise, signals  # noqa: E402
+
+SIZES = [10**2, 10**3, 10**4, 10**5, 10**6]
+MODES = ["stepwise", "vectorized"]
+TIMES = ["regular", "irregular"]
+
+
+class Case:
+    """A generator to benchmark.
+
+    Parameters
+    ----------
+    factory : callable
+        Returns a new generator. Called for every repeat, outside of the timed region
+    max_points : dict (default None)
+        Largest number of points to benchmark, by mode or time kind, for generators
+        whose cost grows faster than linearly, e.g. {'irregular': 10 ** 4}
+    modes : list of str (default None)
+        Modes the configuration supports, e.g. ['vectorized'] for GaussianProcess
+        kernels without a state-space form. Defaults to all modes. Every generator must
+        be covered in every mode by at least one of its cases
+
+    """
+
+    def __init__(
+        self,
+        factory: Callable,
+        max_points: Optional[Dict[str, int]] = None,
+        modes: Optional[List[str]] = None,
+    ):
+        self.factory = factory
+        self.max_points = max_points or {}
+        self.modes = MODES if modes is None else modes
+
+    def limit(self, mode: str, time_kind: str) -> Optional[int]:
+        limits = [
+            self.max_points[key] for key in (mode, time_kind) if key in self.max_points
+        ]
+        return min(limits) if limits else None
+
+
+# Generators whose defaults do not make a representative benchmark, or that need
+# arguments. Every other registered class is benchmarked with its defaults.
+CASES = {
+    "AutoRegressive": Case(
+        lambda: signals.AutoRegressive(
+            ar_param=[0.5, 0.3], start_value=[0.0, 0.0], seed=0
+        )
+    ),
+    "CAR": Case(lambda: signals.CAR(ar_param=0.9, seed=0)),
+    # Matern kernels with half-integer nu have a state-space form, and hence sample_next
+    "GaussianProcess": Case(
+        lambda: signals.GaussianProcess(kernel="Matern", nu=1.5, seed=0)
+    ),
+    "GaussianProcess[SE]": Case(
+        lambda: signals.GaussianProcess(kernel="SE", seed=0),
+        # Irregular times fall back to the dense Cholesky factorization
+        max_points={"irregular": 5 * 10**3},
+        modes=["vectorized"],
+    ),
+    "GaussianProcess[rff]": Case(
+        lambda: signals.GaussianProcess(
+            kernel="SE", approximation="rff", n_features=1000, seed=0
+        ),
+        max_points={"vectorized": 10**5},
+        modes=["vectorized"],
+    ),
+    "MackeyGlass": Case(lambda: signals.MackeyGlass()),
+    "MackeyGlass[torch]": Case(lambda: signals.MackeyGlass(backend="torch")),
+    "PseudoPeriodic": Case(lambda: signals.PseudoPeriodic(frequency=0.1, seed=0)),
+    "Sinusoidal": Case(lambda: signals.Sinusoidal(frequency=0.1)),
+    "Sum": Case(
+        lambda: signals.Sinusoidal(frequency=0.1) + signals.CAR(ar_param=0.9, seed=0)
+    ),
+    "Product": Case(
+        lambda: signals.Sinusoidal(frequency=0.1)
+        * signals.PseudoPeriodic(frequency=0.1, seed=0)
+    ),
+    "Scale": Case(lambda: 2.0 * signals.Sinusoidal(frequency=0.1)),
+    "GaussianNoise": Case(lambda: noise.GaussianNoise(seed=0)),
+    "RedNoise": Case(lambda: noise.RedNoise(seed=0)),
+}
+
+
+def all_cases() -> Dict[str, Case]:
+    """CASES, completed with default constructions of the other registered classes."""
+    cases = dict(CASES)
+    covered = {name.split("[")[0] for name in cases}
+    for module in (signals, noise):
+        for name in module.__all__:
+            if name not in covered:
+                cases[name] = Case(
+                    lambda module=module, name=name: getattr(module, name)()
+                )
+    return dict(sorted(cases.items()))
+
+
+def make_time(time_kind: str, n_points: int) -> torch.Tensor:
+    """Time vector of n_points points, spaced by 1 on average."""
+    if time_kind == "regular":
+        return sp.TimeSampler(stop_time=n_points).sample_time(num_points=n_points)
+    time_sampler = sp.TimeSampler(stop_time=n_points, seed=0)
+    return time_sampler.sample_time(
+        num_points=2 * n_points, keep_percentage=50, how="irregular"
+    )
+
+
+def sample_stepwise(generator, time_vector: torch.Tensor) -> torch.Tensor:
+    """Samples with sample_next, passing the history as SyntheticSeries does."""
+    samples = torch.zeros(len(time_vector))
+    errors = torch.zeros(len(time_vector))
+    for i in range(len(time_vector)):
+        # Generators return numbers, 0-d or 1-element tensors, or 1-element arrays
+        value = generator.sample_next(time_vector[i], samples[:i], errors[:i])
+        samples[i] = torch.as_tensor(value).reshape(()).item()
+    return samples
+
+
+def _resident_memory() -> Optional[int]:
+    """Current resident memory of the process in bytes, where available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_memory() -> Optional[int]:
+    """Peak resident memory of the process in bytes, where available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(case: Case, mode: str, time_kind: str, n_points: int, repeat: int) -> Dict:
+    """Times one case in the current process."""
+    # Warm up, so that compilation and caches are not timed
+    generator = case.factory()
+    warm_up_time = make_time(time_kind, 10)
+    if mode == "stepwise":
+        sample_stepwise(generator, warm_up_time)
+    else:
+        generator.sample_vectorized(warm_up_time)
+
+    time_vector = make_time(time_kind, n_points)
+    memory_before = _resident_memory()
+    seconds = []
+    for _ in range(repeat):
+        generator = case.factory()
+        start = time.perf_counter()
+        if mode == "stepwise":
+            sample_stepwise(generator, time_vector)
+        else:
+            generator.sample_vectorized(time_vector)
+        seconds.append(time.perf_counter() - start)
+    memory_after = _peak_memory()
+
+    best = min(seconds)
+    result = {
+        "status": "ok",
+        "n_points": len(time_vector),
+        "seconds": best,
+        "mean_seconds": sum(seconds) / len(seconds),
+        "throughput": len(time_vector) / best if best > 0 else float("inf"),
+        "peak_memory_bytes": None,
+    }
+    if memory_before is not None and memory_after is not None:
+        result["peak_memory_bytes"] = max(0, memory_after - memory_before)
+    return result
+
+
+def _measure_in_child(connection, *args):
+    warnings.simplefilter("ignore")
+    try:
+        result = measure(*args)
+    except NotImplementedError as error:
+        result = {"status": "unsupported", "message": str(error)}
+    except Exception as error:
+        result = {"status": "error", "message": f"{type(error).__name__}: {error}"}
+    connection.send(result)
+    connection.close()
+
+
+def run_case(
+    case: Case, mode: str, time_kind: str, n_points: int, repeat: int, timeout: float
+) -> Dict:
+    """Times one case in a forked process, so that its peak memory is its own."""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        try:
+            return measure(case, mode, time_kind, n_points, repeat)
+        except NotImplementedError as error:
+            return {"status": "unsupported", "message": str(error)}
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_measure_in_child, args=(sender, case, mode, time_kind, n_points, repeat)
+    )
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = {"status": "error", "message": "benchmark process died"}
+    else:
+        process.terminate()
+        result = {"status": "timeout", "message": f"exceeded {timeout} s"}
+    process.join()
+    if process.exitcode not in (0, None) and result.get("status") == "ok":
+        result = {"status": "error", "message": f"exit code {process.exitcode}"}
+    return result
+
+
+def measure_import_time(repeat: int = 5) -> Dict[str, float]:
+    """Best times of `import syntheticprophet` and of each lazy class lookup, in s."""
+    code = (
+        "import json, time\n"
+        "start = time.perf_counter()\n"
+        "import syntheticprophet\n"
+        "timings = {'syntheticprophet': time.perf_counter() - start}\n"
+        "for module in (syntheticprophet.signals, syntheticprophet.noise):\n"
+        "    for name in module.__all__:\n"
+        "        start = time.perf_counter()\n"
+        "        getattr(module, name)\n"
+        "        timings[module.__name__ + '.' + name] = time.perf_counter() - start\n"
+        "print(json.dumps(timings))\n"
+    )
+    environment = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")])
+        ),
+    )
+    best = {}
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=environment,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for name, seconds in json.loads(output.splitlines()[-1]).items():
+            best[name] = min(seconds, best.get(name, float("inf")))
+    return best
+
+
+def metadata() -> Dict:
+    """Description of the machine and the versions the results were obtained with."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import numpy
+
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict:
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+    pattern = re.compile(args.filter) if args.filter else None
+    results = {}
+    for case_name, case in all_cases().items():
+        for mode in args.modes:
+            for time_kind in args.times:
+                failed = None
+                for n_points in args.sizes:
+                    name = f"{case_name}/{mode}/{time_kind}/{n_points}"
+                    if pattern is not None and not pattern.search(name):
+                        continue
+                    limit = case.limit(mode, time_kind)
+                    if mode == "stepwise":
+                        limit = min(
+                            limit or args.max_stepwise_points, args.max_stepwise_points
+                        )
+                    if mode not in case.modes:
+                        result = {
+                            "status": "skipped",
+                            "message": f"{mode} not supported by this configuration",
+                        }
+                    elif failed is not None:
+                        result = {
+                            "status": "skipped",
+                            "message": f"{failed} at a smaller size",
+                        }
+                    elif limit is not None and n_points > limit:
+                        result = {
+                            "status": "skipped",
+                            "message": f"limited to {limit} points",
+                        }
+                    else:
+                        result = run_case(
+                            case, mode, time_kind, n_points, args.repeat, args.timeout
+                        )
+                        if result["status"] != "ok":
+                            failed = result["status"]
+                    results[name] = dict(
+                        result,
+                        generator=case_name,
+                        mode=mode,
+                        time=time_kind,
+                        size=n_points,
+                    )
+                    if not args.quiet:
+                        print(_format_result(name, results[name]), file=sys.stderr)
+    report = {"metadata": metadata(), "results": results}
+    if not args.skip_import:
+        report["import_time"] = measure_import_time()
+    return report
+
+
+def _format_result(name: str, result: Dict) -> str:
+    if result["status"] != "ok":
+        return f"{name:<50} {result['status']}: {result.get('message', '')}"
+    memory = result["peak_memory_bytes"]
+    memory = "" if memory is None else f"{memory / 2 ** 20:10.1f} MiB"
+    return (
+        f"{name:<50} {result['seconds']:10.4f} s "
+        f"{result['throughput']:14.0f} points/s {memory}"
+    )
+
+
+def compare(
+    baseline: Dict,
+    current: Dict,
+    tolerance: float,
+    memory_tolerance: float,
+    import_tolerance: float,
+) -> List[str]:
+    """Lists the regressions of current with respect to baseline.
+
+    A case regresses if its throughput dropped by more than tolerance, its peak memory
+    grew by more than memory_tolerance (and at least 1 MiB), or it ran in baseline but
+    not any more. An import regresses if its time grew by more than import_tolerance.
+    """
+    regressions = []
+    for name, before in sorted(baseline["results"].items()):
+        after = current["results"].get(name)
+        if after is None or before["status"] != "ok":
+            continue
+        if after["status"] != "ok":
+            regressions.append(
+                f"{name}: {after['status']} ({after.get('message', '')}), was ok"
+            )
+            continue
+        change = after["throughput"] / before["throughput"] - 1
+        if change < -tolerance:
+            regressions.append(f"{name}: throughput {change:+.1%}")
+        memory_before, memory_after = before.get("peak_memory_bytes"), after.get(
+            "peak_memory_bytes"
+        )
+        if memory_before is not None and memory_after is not None:
+            growth = memory_after - memory_before
+            if growth > max(memory_tolerance * memory_before, 2**20):
+                regressions.append(f"{name}: peak memory {growth / 2 ** 20:+.1f} MiB")
+    for name, before in sorted(baseline.get("import_time", {}).items()):
+        after = current.get("import_time", {}).get(name)
+        if after is not None and after > (1 + import_tolerance) * before:
+            regressions.append(f"import {name}: {after / before - 1:+.1%}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument(
+        "--output", "-o", help="JSON file to write, defaults to stdout"
+    )
+    run_parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(float(n)) for n in s.split(",")],
+        default=SIZES,
+        help="comma-separated numbers of points, e.g. 1e2,1e4",
+    )
+    run_parser.add_argument("--modes", type=lambda s: s.split(","), default=MODES)
+    run_parser.add_argument("--times", type=lambda s: s.split(","), default=TIMES)
+    run_parser.add_argument(
+        "--filter", help="regular expression on the case names, e.g. '^CAR/'"
+    )
+    run_parser.add_argument(
+        "--repeat", type=int, default=3, help="timed runs per case, the best is kept"
+    )
+    run_parser.add_argument(
+        "--timeout", type=float, default=120.0, help="seconds per case"
+    )
+    run_parser.add_argument("--max-stepwise-points", type=int, default=10**5)
+    run_parser.add_argument("--threads", type=int, help="torch intra-op threads")
+    run_parser.add_argument(
+        "--skip-import", action="store_true", help="do not measure import times"
+    )
+    run_parser.add_argument("--quiet", "-q", action="store_true")
+
+    compare_parser = commands.add_parser(
+        "compare", help="flag regressions against a baseline"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="relative throughput drop flagged as a regression",
+    )
+    compare_parser.add_argument("--memory-tolerance", type=float, default=0.2)
+    compare_parser.add_argument("--import-tolerance", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = run(args)
+        if args.output is None:
+            json.dump(report, sys.stdout, indent=2)
+        else:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(
+        baseline, current, args.tolerance, args.memory_tolerance, args.import_tolerance
+    )
+    for regression in regressions:
+        print(regression)
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
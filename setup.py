@@ -1,6 +1,7 @@
 from setuptools import setup
 from setuptools import find_packages
 import os
+import re
 
 dir_repo = os.path.abspath(os.path.dirname(__file__))
 # read the contents of REQUIREMENTS file
@@ -9,10 +10,13 @@ with open(os.path.join(dir_repo, "requirements.txt"), "r") as f:
 # read the contents of README file
 with open(os.path.join(dir_repo, "README.md"), encoding="utf-8") as f:
     readme = f.read()
+# read the version from the package, without importing it
+with open(os.path.join(dir_repo, "syntheticprophet", "__init__.py"), encoding="utf-8") as f:
+    version = re.search(r'^__version__ = "(.*)"', f.read(), re.M).group(1)
 
 setup(
     name="syntheticprophet",
-    version="0.1",
+    version=version,
     description="Library for creating synthetic time series",
     url="https://github.com/neuralprophet/synthetic_prophet",
     author="Rodrigo Rivera-Castro",
@@ -26,9 +30,14 @@ setup(
         "sympy",
         "torch",
         "symengine>=0.4",
-        "jitcdde==1.4",
-        "jitcxde_common==1.4.1",
+        "jitcdde>=1.8,<2",
+        "jitcxde_common>=1.5",
     ],
+    extras_require={
+        # Compiles the NARMA recursion and the steps of the torch MackeyGlass backend, which
+        # otherwise run one Python loop iteration per time step
+        "numba": ["numba"],
+    },
     tests_require=["pytest"],
     setup_requires=["pytest-runner"],
     scripts=["scripts/neuralprophet_dev_setup"],
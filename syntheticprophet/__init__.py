@@ -1,6 +1,14 @@
+__version__ = "0.1"
+
 from .syntheticseries import SyntheticSeries
 from . import signals
 from . import noise
 from .timesampler import TimeSampler
+from . import storage
+from . import rng
+from . import instrumentation
+from .parallel import generate_dataset
+from .dataset_cache import DatasetCache
+from .config import from_config
 
 name = "syntheticprophet"
@@ -0,0 +1,39 @@
+import hashlib
+import os
+from typing import Optional
+
+__all__ = ["get_cache_dir", "hash_key"]
+
+# Environment variable overriding the default cache directory
+CACHE_DIR_ENV = "SYNTHETICPROPHET_CACHE_DIR"
+
+
+def get_cache_dir(*subdirectories:str, cache_dir:Optional[str]=None)->str:
+    """Returns (and creates) a directory for persistent caches.
+
+    Parameters
+    ----------
+    subdirectories : str
+        Path components appended to the cache directory
+    cache_dir : str (default None)
+        Root cache directory. Defaults to $SYNTHETICPROPHET_CACHE_DIR, or
+        ~/.cache/syntheticprophet if the variable is not set
+
+    Returns
+    -------
+    str
+        Path to the directory
+
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get(
+            CACHE_DIR_ENV, os.path.join(os.path.expanduser("~"), ".cache", "syntheticprophet")
+        )
+    directory = os.path.join(cache_dir, *subdirectories)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def hash_key(*parts)->str:
+    """Stable hexadecimal digest of the textual representation of parts."""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
@@ -0,0 +1,233 @@
+import copy
+import importlib
+import inspect
+import json
+import numpy as np
+import torch
+from torch import Tensor
+from typing import Any, Dict
+
+__all__ = ["Configurable", "to_config", "from_config", "dumps", "rebuild"]
+
+
+class Configurable:
+    """Base of the objects that serialize to a config.
+
+    The arguments an object is constructed with are recorded when it is created, so
+    subclasses need no code of their own: `get_config` returns them, with defaults filled
+    in, as a JSON-compatible dict, and `from_config` constructs an equal object from it.
+    The config describes how the object was built, not the state it reached by sampling.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        instance = super().__new__(cls)
+        try:
+            bound = inspect.signature(cls.__init__).bind(instance, *args, **kwargs)
+        except TypeError:
+            # Copies and unpickled objects are created without arguments, their recorded
+            # arguments are restored with the rest of their state
+            return instance
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop(next(iter(arguments)))
+        instance._config_arguments = arguments
+        return instance
+
+    def get_config(self)->Dict:
+        """Canonical, JSON-compatible description of the object.
+
+        Returns
+        -------
+        dict
+            'class', the import path of the class, and 'args', its constructor arguments.
+            Nested signals, noises, tensors, dtypes and module-level functions are encoded
+            recursively
+
+        """
+        return to_config(self)
+
+    @classmethod
+    def from_config(cls, config:Dict):
+        """Constructs an object from the output of `get_config`.
+
+        Parameters
+        ----------
+        config : dict
+            Config of an instance of this class or of a subclass
+
+        """
+        instance = from_config(config)
+        if not isinstance(instance, cls):
+            raise TypeError(f"Config of {type(instance).__name__}, not of {cls.__name__}")
+        return instance
+
+
+def _import(path:str):
+    module, _, name = path.rpartition(".")
+    value = importlib.import_module(module)
+    for attribute in name.split("."):
+        value = getattr(value, attribute)
+    return value
+
+
+def _class_path(cls)->str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _function_path(function)->str:
+    module = getattr(function, "__module__", None)
+    name = getattr(function, "__name__", None)
+    if module is not None and name is not None:
+        try:
+            if getattr(importlib.import_module(module), name, None) is function:
+                return f"{module}.{name}"
+        except ImportError:
+            pass
+    raise ValueError(f"Only module-level functions can be serialized, got {function!r}")
+
+
+def to_config(value:Any)->Any:
+    """Encodes a value as JSON-compatible data.
+
+    Parameters
+    ----------
+    value : any
+        A Configurable object, a tensor, numpy array, torch dtype, module-level function,
+        or a number, string, None, or list, tuple or dict of those
+
+    Returns
+    -------
+    any
+        Data that `dumps` turns into canonical JSON and `from_config` decodes
+
+    """
+    from .timesampler.time_index import RegularTimeIndex
+
+    if isinstance(value, Configurable):
+        if not hasattr(value, "_config_arguments"):
+            raise ValueError(f"The constructor arguments of {type(value).__name__} were not recorded")
+        return {
+            "class": _class_path(type(value)),
+            "args": {name: to_config(argument) for name, argument in value._config_arguments.items()},
+        }
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    if isinstance(value, torch.dtype):
+        return {"__dtype__": str(value).replace("torch.", "")}
+    if isinstance(value, Tensor):
+        return {"__tensor__": value.detach().cpu().tolist(), "dtype": str(value.dtype).replace("torch.", "")}
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": value.tolist(), "dtype": value.dtype.str}
+    if isinstance(value, RegularTimeIndex):
+        return {"__RegularTimeIndex__": [value.start, value.step, value.n]}
+    if isinstance(value, torch.Generator):
+        raise ValueError("torch.Generator arguments cannot be serialized, pass a seed instead")
+    if isinstance(value, (list, tuple)):
+        return [to_config(item) for item in value]
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise ValueError("Only dicts with string keys can be serialized")
+        return {key: to_config(item) for key, item in value.items()}
+    if callable(value):
+        return {"__function__": _function_path(value)}
+    raise ValueError(f"Cannot serialize {value!r} of type {type(value).__name__}")
+
+
+def _construct(cls, arguments:Dict):
+    """Instance of cls constructed from recorded arguments, by parameter name."""
+    args, kwargs = [], {}
+    for name, parameter in list(inspect.signature(cls.__init__).parameters.items())[1:]:
+        if name not in arguments:
+            continue
+        if parameter.kind == parameter.VAR_POSITIONAL:
+            args.extend(arguments[name])
+        elif parameter.kind == parameter.VAR_KEYWORD:
+            kwargs.update(arguments[name])
+        elif parameter.kind == parameter.POSITIONAL_ONLY:
+            args.append(arguments[name])
+        else:
+            kwargs[name] = arguments[name]
+    return cls(*args, **kwargs)
+
+
+def from_config(config:Any)->Any:
+    """Decodes the output of `to_config` or `get_config`.
+
+    As with pickles, only decode configs from trusted sources: they can name any
+    importable function, and any importable Configurable class.
+
+    Parameters
+    ----------
+    config : any
+        Encoded value
+
+    Returns
+    -------
+    any
+        The decoded value, e.g. a new SyntheticSeries
+
+    """
+    from .timesampler.time_index import RegularTimeIndex
+
+    if isinstance(config, list):
+        return [from_config(item) for item in config]
+    if not isinstance(config, dict):
+        return config
+    if "class" in config and "args" in config:
+        cls = _import(config["class"])
+        if not (isinstance(cls, type) and issubclass(cls, Configurable)):
+            raise ValueError(f"{config['class']} is not a Configurable class")
+        return _construct(cls, {name: from_config(argument) for name, argument in config["args"].items()})
+    if "__dtype__" in config:
+        return getattr(torch, config["__dtype__"])
+    if "__tensor__" in config:
+        return torch.tensor(config["__tensor__"], dtype=getattr(torch, config["dtype"]))
+    if "__ndarray__" in config:
+        return np.array(config["__ndarray__"], dtype=np.dtype(config["dtype"]))
+    if "__RegularTimeIndex__" in config:
+        return RegularTimeIndex(*config["__RegularTimeIndex__"])
+    if "__function__" in config:
+        return _import(config["__function__"])
+    return {key: from_config(item) for key, item in config.items()}
+
+
+def dumps(config:Any)->str:
+    """Canonical JSON text of a config: sorted keys and no whitespace, so equal configs,
+    and only those, give equal text."""
+    return json.dumps(config, sort_keys=True, separators=(",", ":"))
+
+
+def rebuild(value:Any)->Any:
+    """Fresh copy of a value, in the state it was constructed in.
+
+    Configurable objects, also nested ones such as the signals of a series, are constructed
+    anew from their recorded arguments, so that no state reached by sampling, e.g. the last
+    value of a stateful generator, is carried over. Unlike `get_config`, this also works for
+    arguments that cannot be serialized, such as lambdas, which are passed on as they are.
+
+    Parameters
+    ----------
+    value : any
+        A Configurable object, or a list, tuple or dict of those
+
+    Returns
+    -------
+    any
+        The copy
+
+    """
+    if isinstance(value, Configurable):
+        if not hasattr(value, "_config_arguments"):
+            raise ValueError(f"The constructor arguments of {type(value).__name__} were not recorded")
+        return _construct(
+            type(value), {name: rebuild(argument) for name, argument in value._config_arguments.items()}
+        )
+    if isinstance(value, (list, tuple)):
+        return type(value)(rebuild(item) for item in value)
+    if isinstance(value, dict):
+        return {key: rebuild(item) for key, item in value.items()}
+    if callable(value) and not isinstance(value, Tensor):
+        return value
+    return copy.deepcopy(value)
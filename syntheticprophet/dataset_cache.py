@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from torch import Tensor
+from typing import Dict, List, Optional, Tuple, Union
+from . import __version__
+from .caching import get_cache_dir, hash_key
+from .config import dumps, to_config
+from .parallel import generate_dataset
+from .storage import load_dataset
+from .syntheticseries import SyntheticSeries
+from .timesampler import RegularTimeIndex, TimeSampler
+
+__all__ = ["DatasetCache"]
+
+
+class DatasetCache:
+    """Content-addressed cache of datasets generated by `generate_dataset`.
+
+    A dataset is keyed by the hash of the config of its series, its time sampler, the
+    number of series, the root seed, the data type and the library version. It is stored
+    as memory-mappable `.npy` files, so a repeated request loads it without copying
+    instead of generating it again. When the cache grows beyond max_bytes, the least
+    recently used datasets are deleted.
+
+    Datasets are written to a temporary directory and moved into place when complete, so
+    that several processes can share a cache directory.
+
+    Parameters
+    ----------
+    max_bytes : int (default 10 GiB)
+        Size the cache is trimmed to after a dataset is added. The dataset just added is
+        always kept, even if it is larger
+    cache_dir : str (default None)
+        Root cache directory, see `get_cache_dir`. Datasets are stored in its `datasets`
+        subdirectory
+
+    """
+
+    def __init__(self, max_bytes:int=10 * 2 ** 30, cache_dir:Optional[str]=None):
+        self.max_bytes = max_bytes
+        self.directory = get_cache_dir("datasets", cache_dir=cache_dir)
+
+    def config(
+        self, spec:SyntheticSeries, n_series:int, time_sampler:Union[TimeSampler, Tensor, RegularTimeIndex],
+            seed:Optional[int]=None, dtype=np.float32, **time_kwargs
+    )->Dict:
+        """Description of a dataset, from which its key is computed.
+
+        Parameters are those of `generate`. Raises a ValueError if neither seed nor
+        spec.seed is given, since the dataset would then not be reproducible.
+        """
+        seed = getattr(spec, "seed", None) if seed is None else seed
+        if seed is None:
+            raise ValueError("A seed, or a series with a seed, is required to cache a dataset")
+        if isinstance(time_sampler, Tensor):
+            values = time_sampler.detach().cpu().contiguous().numpy()
+            time_config = {"digest": hashlib.sha1(values.tobytes()).hexdigest(), "dtype": values.dtype.str,
+                           "shape": list(values.shape)}
+        else:
+            time_config = to_config(time_sampler)
+        return {
+            "version": __version__,
+            "series": to_config(spec),
+            "n_series": n_series,
+            "time": time_config,
+            "time_kwargs": to_config(time_kwargs),
+            "seed": seed,
+            "dtype": np.dtype(dtype).str,
+        }
+
+    def key(self, *args, **kwargs)->str:
+        """Key of a dataset, the hash of its `config`. Takes the arguments of `generate`."""
+        return hash_key(dumps(self.config(*args, **kwargs)))
+
+    def path(self, key:str)->str:
+        """Directory of the dataset with the given key."""
+        return os.path.join(self.directory, key)
+
+    def __contains__(self, key:str)->bool:
+        return os.path.isdir(self.path(key))
+
+    def load(self, key:str)->Optional[Dict[str, np.ndarray]]:
+        """Memory-maps a cached dataset, marking it as recently used, or returns None."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return load_dataset(path)
+
+    def generate(
+        self, spec:SyntheticSeries, n_series:int, time_sampler:Union[TimeSampler, Tensor, RegularTimeIndex],
+            seed:Optional[int]=None, dtype=np.float32, n_workers:Optional[int]=None,
+            shard_size:Optional[int]=None, n_threads:Optional[int]=None, **time_kwargs
+    )->Dict[str, np.ndarray]:
+        """Loads a dataset from the cache, or generates and caches it.
+
+        Parameters
+        ----------
+        spec : SyntheticSeries
+            Series to sample, see `generate_dataset`. It must serialize with `get_config`
+        n_series : int
+            Number of series
+        time_sampler : TimeSampler, tensor or RegularTimeIndex
+            Sampler or shared times, see `generate_dataset`
+        seed : int (default None)
+            Root seed of the dataset. Defaults to spec.seed; one of them is required
+        dtype : numpy dtype (default np.float32)
+            Data type of the stored values
+        n_workers, shard_size, n_threads : int (default None)
+            Parallelism of the generation, see `generate_dataset`. They do not change the
+            data, so they are not part of the key
+        time_kwargs
+            Keyword arguments of `TimeSampler.sample_time`
+
+        Returns
+        -------
+        dict
+            The dataset, as returned by `storage.load_dataset`
+
+        """
+        config = self.config(spec, n_series, time_sampler, seed=seed, dtype=dtype, **time_kwargs)
+        key = hash_key(dumps(config))
+        dataset = self.load(key)
+        if dataset is not None:
+            return dataset
+
+        temporary = os.path.join(self.directory, f".{key}.{os.getpid()}.tmp")
+        try:
+            generate_dataset(
+                spec, n_series, time_sampler, n_workers=n_workers, path=temporary, seed=config["seed"],
+                shard_size=shard_size, n_threads=n_threads, dtype=dtype, **time_kwargs
+            )
+            with open(os.path.join(temporary, "config.json"), "w") as f:
+                json.dump(config, f, sort_keys=True, indent=1)
+            try:
+                os.rename(temporary, self.path(key))
+            except OSError:
+                # Cached by another process in the meantime
+                if key not in self:
+                    raise
+        finally:
+            shutil.rmtree(temporary, ignore_errors=True)
+        self.evict(keep=key)
+        return self.load(key)
+
+    def entries(self)->List[Tuple[str, int, float]]:
+        """Key, size in bytes and last use time of the cached datasets, least recent first."""
+        entries = []
+        for key in os.listdir(self.directory):
+            path = self.path(key)
+            if key.startswith(".") or not os.path.isdir(path):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+                entries.append((key, size, os.stat(path).st_mtime))
+            except FileNotFoundError:
+                # Evicted by another process
+                continue
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self)->int:
+        """Total size of the cached datasets in bytes."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep:Optional[str]=None):
+        """Deletes the least recently used datasets until the cache fits in max_bytes.
+
+        Parameters
+        ----------
+        keep : str (default None)
+            Key of a dataset not to delete
+
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Deletes all cached datasets."""
+        for key, _, _ in self.entries():
+            shutil.rmtree(self.path(key), ignore_errors=True)
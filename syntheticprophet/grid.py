@@ -0,0 +1,63 @@
+import numbers
+import torch
+from torch import Tensor
+from typing import Optional, Tuple, Union
+
+__all__ = ["is_grid", "grid_shape", "as_column", "align_grids"]
+
+
+def is_grid(value)->bool:
+    """Whether a parameter value is a grid of values, i.e. a tensor, array or list of at
+    least one dimension, rather than a single number."""
+    if isinstance(value, numbers.Number):
+        return False
+    return torch.as_tensor(value).dim() > 0
+
+
+def grid_shape(*values)->Tuple[int, ...]:
+    """Shape of the parameter grid spanned by values.
+
+    Grid values broadcast against each other, e.g. amplitudes of shape (P,) and
+    frequencies of shape (P,), or of shapes (P, 1) and (Q,) for all combinations.
+    Single numbers do not add dimensions, so without grids the shape is ().
+    """
+    return tuple(torch.broadcast_shapes(*(torch.as_tensor(value).shape for value in values if is_grid(value))))
+
+
+def as_column(value, dtype:Optional[torch.dtype]=None)->Union[numbers.Number, Tensor]:
+    """Parameter value ready to broadcast against a time axis.
+
+    A grid of shape (P,) becomes a tensor of shape (P, 1), so that combined with
+    timestamps of shape (T,) it gives values of shape (P, T). Single numbers are returned
+    as they are, so scalar parameters keep their exact computations.
+
+    Parameters
+    ----------
+    value : number, tensor, array or list
+        Parameter value
+    dtype : torch dtype (default None)
+        Data type of the column. Defaults to the dtype of value, or to torch's default
+        dtype for lists of numbers
+
+    """
+    if not is_grid(value):
+        return value
+    if not isinstance(value, Tensor):
+        value = torch.as_tensor(value, dtype=dtype if dtype is not None else torch.get_default_dtype())
+    return value.to(dtype).unsqueeze(-1) if dtype is not None else value.unsqueeze(-1)
+
+
+def align_grids(first:Tensor, second:Tensor, batched:bool)->Tuple[Tensor, Tensor]:
+    """Views of two sampled tensors that broadcast against each other.
+
+    Samples have shape (*grid, T), or (batch_size, *grid, T) for a batch. Without a batch,
+    they broadcast as they are; with one, grid dimensions are inserted after the batch
+    dimension of the tensor that has fewer of them.
+    """
+    if not batched or first.dim() == second.dim():
+        return first, second
+    if first.dim() < second.dim():
+        second, first = align_grids(second, first, batched)
+        return first, second
+    second = second.reshape(second.shape[:1] + (1,) * (first.dim() - second.dim()) + second.shape[1:])
+    return first, second
@@ -0,0 +1,280 @@
+import contextlib
+import functools
+import json
+import os
+import time
+from torch import Tensor
+from typing import Callable, Dict, Iterator, List, Optional
+
+__all__ = ["Profiler", "profile", "active_profiler"]
+
+# Profiler collecting the calls, None when instrumentation is disabled
+_profiler: Optional["Profiler"] = None
+
+
+class _InstrumentedGenerator:
+    """Stand-in for a signal or noise generator, timing its sampling methods."""
+
+    def __init__(self, generator, stats:Dict, events:List, origin:int):
+        self._generator = generator
+        self._stats = stats
+        self._events = events
+        self._origin = origin
+
+    def __getattr__(self, name):
+        return getattr(self._generator, name)
+
+    def sample_next(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        value = self._generator.sample_next(*args, **kwargs)
+        self._stats["sample_next_ns"] += time.perf_counter_ns() - start
+        self._stats["sample_next_calls"] += 1
+        return value
+
+    def sample_vectorized(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        value = self._generator.sample_vectorized(*args, **kwargs)
+        duration = time.perf_counter_ns() - start
+        self._stats["sample_vectorized_ns"] += duration
+        self._stats["sample_vectorized_calls"] += 1
+        self._events.append((start - self._origin, duration))
+        return value
+
+
+def _tensor_bytes(values)->int:
+    """Bytes of the distinct storages of the tensors in values."""
+    storages = {}
+    for value in values:
+        if isinstance(value, Tensor):
+            storage = value.untyped_storage()
+            storages[storage.data_ptr()] = storage.nbytes()
+    return sum(storages.values())
+
+
+class Profiler:
+    """Records how `SyntheticSeries` samples were generated.
+
+    For every call of `SyntheticSeries.sample` or `sample_batch`, the profiler records the
+    sampling path taken, the time spent in the signal and the noise generator, the number
+    of `sample_next` and `sample_vectorized` calls, the bytes of the returned tensors and
+    the throughput in points per second. Calls made while another one is being recorded,
+    e.g. the per-series samples of a stepwise `sample_batch`, are part of the outer call.
+
+    Usually created with `profile`. Series sampled in other processes, such as the workers
+    of `generate_dataset`, are not recorded.
+
+    Parameters
+    ----------
+    callback : callable (default None)
+        Called with the record of each call, a dict as in `to_dict()['calls']`, when the
+        call completes
+
+    """
+
+    def __init__(self, callback:Optional[Callable[[Dict], None]]=None):
+        self.callback = callback
+        self.calls: List[Dict] = []
+        self._origin = time.perf_counter_ns()
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def instrument(self, series, name:str, time_vector)->Iterator[Dict]:
+        """Records one sampling call of series, swapping its generators for timed stand-ins."""
+        generators = {"signal": series.signal_generator, "noise": series.noise_generator}
+        record = {
+            "name": name,
+            "path": series.sampling_path,
+            "n_points": len(time_vector),
+            "batch_size": None,
+            "bytes": 0,
+            "generators": {},
+        }
+        events = {}
+        for role, generator in generators.items():
+            if generator is None:
+                continue
+            record["generators"][role] = {
+                "class": type(generator).__name__,
+                "sample_vectorized_calls": 0,
+                "sample_vectorized_ns": 0,
+                "sample_next_calls": 0,
+                "sample_next_ns": 0,
+            }
+            events[role] = []
+            setattr(
+                series, role + "_generator",
+                _InstrumentedGenerator(generator, record["generators"][role], events[role], self._origin),
+            )
+
+        self._depth += 1
+        start = time.perf_counter_ns()
+        try:
+            yield record
+        finally:
+            duration = time.perf_counter_ns() - start
+            self._depth -= 1
+            for role, generator in generators.items():
+                setattr(series, role + "_generator", generator)
+
+        n_values = record["n_points"] * (record["batch_size"] or 1)
+        record.update(
+            start_ns=start - self._origin,
+            duration_ns=duration,
+            points_per_second=n_values / duration * 1e9 if duration > 0 else float("inf"),
+            events=events,
+        )
+        self.calls.append(record)
+        if self.callback is not None:
+            self.callback(self._public(record))
+
+    @staticmethod
+    def _public(record:Dict)->Dict:
+        """Record in seconds, without the raw generator events."""
+        public = {key: value for key, value in record.items() if key not in ("start_ns", "duration_ns", "events")}
+        public["start"] = record["start_ns"] * 1e-9
+        public["seconds"] = record["duration_ns"] * 1e-9
+        public["generators"] = {
+            role: {
+                "class": stats["class"],
+                "sample_vectorized_calls": stats["sample_vectorized_calls"],
+                "sample_next_calls": stats["sample_next_calls"],
+                "seconds": (stats["sample_vectorized_ns"] + stats["sample_next_ns"]) * 1e-9,
+            }
+            for role, stats in record["generators"].items()
+        }
+        return public
+
+    def to_dict(self)->Dict:
+        """The recorded calls, and a summary by path and by generator.
+
+        Returns
+        -------
+        dict
+            'calls', the list of call records, and 'summary', with the number of calls per
+            path, the total time, points and bytes, the overall points per second and, per
+            generator role and class, the accumulated calls and time
+
+        """
+        calls = [self._public(record) for record in self.calls]
+        summary = {"paths": {}, "seconds": 0.0, "points": 0, "bytes": 0, "generators": {}}
+        for call in calls:
+            summary["paths"][call["path"]] = summary["paths"].get(call["path"], 0) + 1
+            summary["seconds"] += call["seconds"]
+            summary["points"] += call["n_points"] * (call["batch_size"] or 1)
+            summary["bytes"] += call["bytes"]
+            for role, stats in call["generators"].items():
+                total = summary["generators"].setdefault(
+                    f"{role}/{stats['class']}",
+                    {"sample_vectorized_calls": 0, "sample_next_calls": 0, "seconds": 0.0},
+                )
+                for key in total:
+                    total[key] += stats[key]
+        seconds = summary["seconds"]
+        summary["points_per_second"] = summary["points"] / seconds if seconds > 0 else float("inf")
+        return {"calls": calls, "summary": summary}
+
+    def to_chrome_trace(self, path:Optional[str]=None)->Dict:
+        """The recorded calls in the Chrome trace event format.
+
+        The trace can be opened in chrome://tracing or https://ui.perfetto.dev. Every call
+        is an event, with one nested event per `sample_vectorized` call of its generators.
+        The time a generator spent in `sample_next` over a stepwise call is shown as a
+        single event from the start of the call, as the individual steps are not recorded.
+
+        Parameters
+        ----------
+        path : str (default None)
+            If given, the trace is also written to this JSON file
+
+        Returns
+        -------
+        dict
+            The trace
+
+        """
+        pid = os.getpid()
+        trace_events = []
+        for record in self.calls:
+            public = self._public(record)
+            args = {key: public[key] for key in ("path", "n_points", "batch_size", "points_per_second", "bytes")}
+            trace_events.append(self._trace_event(
+                f"SyntheticSeries.{record['name']}", record["path"], record["start_ns"], record["duration_ns"], pid, args
+            ))
+            for role, stats in record["generators"].items():
+                name = f"{role}: {stats['class']}"
+                for start, duration in record["events"][role]:
+                    trace_events.append(self._trace_event(
+                        name + ".sample_vectorized", role, start, duration, pid, {}
+                    ))
+                if stats["sample_next_calls"]:
+                    trace_events.append(self._trace_event(
+                        name + ".sample_next", role, record["start_ns"], stats["sample_next_ns"], pid,
+                        {"calls": stats["sample_next_calls"]},
+                    ))
+        trace = {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+    @staticmethod
+    def _trace_event(name:str, category:str, start_ns:int, duration_ns:int, pid:int, args:Dict)->Dict:
+        return {
+            "name": name, "cat": category, "ph": "X", "ts": start_ns / 1e3, "dur": duration_ns / 1e3,
+            "pid": pid, "tid": 0, "args": args,
+        }
+
+
+@contextlib.contextmanager
+def profile(callback:Optional[Callable[[Dict], None]]=None)->Iterator[Profiler]:
+    """Records the sampling of all SyntheticSeries in the block.
+
+    Instrumentation is off by default: sampling then only checks a module attribute once
+    per call. Profiles can be nested, in which case the innermost one records.
+
+    Parameters
+    ----------
+    callback : callable (default None)
+        Called with the record of each call when it completes, see `Profiler`
+
+    Yields
+    ------
+    Profiler
+        The profiler, whose results are available during and after the block
+
+    Examples
+    --------
+    >>> with profile() as profiler:
+    ...     series.sample(time_vector)
+    >>> profiler.to_dict()['summary']
+    >>> profiler.to_chrome_trace('trace.json')
+
+    """
+    global _profiler
+    previous, _profiler = _profiler, Profiler(callback)
+    try:
+        yield _profiler
+    finally:
+        _profiler = previous
+
+
+def active_profiler()->Optional[Profiler]:
+    """Profiler currently recording, or None if instrumentation is disabled."""
+    return _profiler
+
+
+def instrumented(method):
+    """Decorates a SyntheticSeries sampling method, so that the active profiler records it."""
+
+    @functools.wraps(method)
+    def wrapper(series, time_vector, *args, **kwargs):
+        profiler = _profiler
+        if profiler is None or profiler._depth:
+            return method(series, time_vector, *args, **kwargs)
+        with profiler.instrument(series, method.__name__, time_vector) as record:
+            result = method(series, time_vector, *args, **kwargs)
+            record["batch_size"] = result[0].shape[0] if method.__name__ == "sample_batch" else None
+            record["bytes"] = _tensor_bytes(result)
+        return result
+
+    return wrapper
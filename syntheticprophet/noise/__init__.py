@@ -1,15 +1,37 @@
-from os.path import dirname as _dirname, basename as _basename, isfile as _isfile
-import glob as _glob
-
-exec(
-    "\n".join(
-        map(
-            lambda name: "from ." + name + " import *",
-            [
-                _basename(f)[:-3]
-                for f in _glob.glob(_dirname(__file__) + "/*.py")
-                if _isfile(f) and not _basename(f).startswith("_")
-            ],
-        )
-    )
-)
+import importlib as _importlib
+
+# Noise classes and the modules defining them. Modules are imported on first access.
+_registry = {
+    "GaussianNoise": ".gaussian_noise",
+    "RedNoise": ".red_noise",
+}
+
+__all__ = sorted(_registry)
+
+
+def register(name:str, module:str):
+    """Registers a noise class, to be imported from module on first access.
+
+    Parameters
+    ----------
+    name : str
+        Name of the class, available as syntheticprophet.noise.<name>
+    module : str
+        Absolute name of the module defining the class
+
+    """
+    _registry[name] = module
+    if name not in __all__:
+        __all__.append(name)
+
+
+def __getattr__(name:str):
+    if name in _registry:
+        value = getattr(_importlib.import_module(_registry[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,15 +1,29 @@
 __all__ = []
 import torch
 from torch import Tensor
+from typing import Optional
+from ..config import Configurable
+from ..rng import make_generator
 
 
-class BaseNoise:
+class BaseNoise(Configurable):
     """BaseNoise class
 
     Signature for all noise classes.
 
+    Noises serialize to a config of their constructor arguments with `get_config`, and
+    are rebuilt with `from_config`.
+
     """
 
+    # Random number generator of the noise, None for torch's global generator
+    generator = None
+    # Data type of the samples, None for the noise's own default
+    dtype = None
+    # Whether sample_next reads the samples and errors passed to it. If not, the noise can
+    # be stepped without the history, while the other generator of a series is vectorized
+    requires_history = True
+
     def __init__(self):
         raise NotImplementedError
 
@@ -34,3 +48,52 @@ class BaseNoise:
 
         """
         raise NotImplementedError
+
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
+        """Samples errors for all time points in input
+
+        Parameters
+        ----------
+        time_vector : array like
+            all time stamps to be sampled
+        batch_size : int (default None)
+            number of independent series to draw. If None, a single series is returned
+        out : tensor (default None)
+            tensor of shape (T,) or (batch_size, T) to write the samples to
+
+        Returns
+        -------
+        tensor
+            sampled errors of shape (T,), or (batch_size, T) if batch_size is given
+
+        """
+        raise NotImplementedError
+
+    def _output(self, values:Tensor, out:Optional[Tensor]=None, default_dtype=None)->Tensor:
+        """Returns values in the noise's dtype, or copies them into out if given.
+
+        Without a dtype, values are cast to default_dtype if given, and returned as is
+        otherwise.
+        """
+        if out is not None:
+            return out.copy_(values)
+        dtype = default_dtype if self.dtype is None else self.dtype
+        return values if dtype is None else values.to(dtype)
+
+    def reseed(self, seed:Optional[int]=None, generator=None):
+        """Replaces the random number generator of the noise
+
+        Only the random stream changes; state carried between calls, such as the last
+        sampled values of stateful generators, is kept.
+
+        Parameters
+        ----------
+        seed : int (default None)
+            Seed of a new generator
+        generator : torch.Generator (default None)
+            Generator to use as is. Takes precedence over seed
+
+        """
+        self.generator = make_generator(seed, generator)
@@ -1,6 +1,9 @@
 import torch
 from torch import Tensor
+from typing import Optional
 from .base_noise import BaseNoise
+from ..grid import as_column, grid_shape
+from ..rng import make_generator, normal
 
 
 __all__ = ["GaussianNoise"]
@@ -12,21 +15,48 @@ class GaussianNoise(BaseNoise):
 
     Attributes
     ----------
-    mean : float
-        mean for the noise
-    std : float
-        standard deviation for the noise
+    mean : float or tensor
+        mean for the noise. A tensor of shape (P,) is a grid of P means
+    std : float or tensor
+        standard deviation for the noise. A tensor of shape (P,) is a grid of P standard
+        deviations, broadcast against a grid of means
+    seed : int (default None)
+        Seed of the generator's own random number generator. If neither seed nor generator
+        is given, torch's global generator is used
+    generator : torch.Generator (default None)
+        Random number generator to draw from. Takes precedence over seed
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to torch's default dtype
+
+    With parameter grids, `sample_vectorized` draws one series per grid point at once,
+    of shape (P, T), or (batch_size, P, T) for a batch.
 
     """
 
-    def __init__(self, mean=0, std=1.0):
+    requires_history = False
+
+    def __init__(
+        self, mean=0, std=1.0, seed:Optional[int]=None, generator:Optional[torch.Generator]=None,
+            dtype:Optional[torch.dtype]=None
+    ):
         self.vectorizable = True
         self.mean = mean
         self.std = std
+        self.generator = make_generator(seed, generator)
+        self.dtype = dtype
 
     def sample_next(self, t:int, samples:torch.tensor, errors:torch.tensor)-> Tensor:
-        return torch.normal(mean=self.mean, std=self.std, size=(1,))
+        size = grid_shape(self.mean, self.std) or (1,)
+        return normal(self.mean, self.std, size, generator=self.generator)
 
-    def sample_vectorized(self, time_vector:torch.tensor)-> Tensor:
+    def sample_vectorized(
+        self, time_vector:torch.tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )-> Tensor:
         n_samples = len(time_vector)
-        return torch.normal(mean=self.mean, std=self.std, size=(n_samples,))
+        size = grid_shape(self.mean, self.std) + (n_samples,)
+        if batch_size is not None:
+            size = (batch_size,) + size
+        # Drawn in place, in the dtype of out, if given
+        return normal(
+            as_column(self.mean), as_column(self.std), size, generator=self.generator, dtype=self.dtype, out=out
+        )
@@ -1,6 +1,10 @@
 import torch
 from torch import Tensor
+from typing import Optional
 from .base_noise import BaseNoise
+from ..rng import make_generator
+from ..scan import affine_scan
+from ..timesampler.time_index import as_time_tensor
 
 
 __all__ = ["RedNoise"]
@@ -20,11 +24,29 @@ class RedNoise(BaseNoise):
         ?
     start_value : float
         ?
+    seed : int (default None)
+        Seed of the generator's own random number generator. If neither seed nor generator
+        is given, torch's global generator is used
+    generator : torch.Generator (default None)
+        Random number generator to draw from. Takes precedence over seed
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to torch's default dtype
+
+    Vectorized sampling evaluates the recurrence with a parallel scan, and supports
+    irregularly sampled time vectors.
 
     """
 
-    def __init__(self, mean:float=0, std:float=1.0, tau:float=0.2, start_value:float=0):
-        self.vectorizable = False
+    requires_history = False
+
+    def __init__(
+        self, mean:float=0, std:float=1.0, tau:float=0.2, start_value:float=0,
+            seed:Optional[int]=None, generator:Optional[torch.Generator]=None,
+            dtype:Optional[torch.dtype]=None
+    ):
+        self.vectorizable = True
+        self.generator = make_generator(seed, generator)
+        self.dtype = dtype
         self.mean = mean
         self.std = std
         self.start_value = torch.tensor(start_value)
@@ -37,10 +59,73 @@ class RedNoise(BaseNoise):
             red_noise = self.start_value
         else:
             time_diff = t - self.previous_time
-            wnoise = torch.normal(mean=self.mean, std=self.std, size=(1,))
+            wnoise = torch.normal(mean=self.mean, std=self.std, size=(1,), generator=self.generator)
             red_noise = (self.tau / (self.tau + time_diff)) * (
                 time_diff * wnoise + self.previous_value
             )
         self.previous_time = t
         self.previous_value = red_noise
         return red_noise
+
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
+        """Samples errors for all time points in input
+
+        The recurrence x[k] = tau / (tau + dt[k]) * (dt[k] * w[k] + x[k-1]) is affine, so all
+        white noise is drawn up front and the series is computed by `affine_scan`.
+        A single series continues from the value left by previous calls, while a batch
+        draws independent series from the starting value.
+
+        Parameters
+        ----------
+        time_vector : array like
+            all time stamps to be sampled
+        batch_size : int (default None)
+            number of independent series to draw
+        out : tensor (default None)
+            tensor of shape (T,) or (batch_size, T) to write the samples to
+
+        Returns
+        -------
+        tensor
+            sampled errors of shape (T,), or (batch_size, T) if batch_size is given
+
+        """
+        time_vector = as_time_tensor(time_vector, torch.float64).reshape(-1)
+        n_samples = time_vector.shape[0]
+        size = (n_samples,) if batch_size is None else (batch_size, n_samples)
+        # Continue the last series only on timestamps after it, otherwise start a new one
+        continued = (
+            batch_size is None and self.previous_time is not None and n_samples > 0
+            and float(time_vector.min()) > float(self.previous_time)
+        )
+
+        if continued:
+            previous_time = torch.as_tensor(self.previous_time, dtype=torch.float64).reshape(1)
+            time_diff = time_vector - torch.cat((previous_time, time_vector[:-1]))
+        else:
+            time_diff = torch.cat((torch.zeros(1, dtype=torch.float64), time_vector[1:] - time_vector[:-1]))
+        coefficients = self.tau / (self.tau + time_diff)
+        # A new series starts from the starting value, without noise, as in sample_next
+        n_drawn = n_samples if continued else max(n_samples - 1, 0)
+        wnoise = torch.zeros(size, dtype=torch.float64)
+        wnoise[..., n_samples - n_drawn:] = torch.normal(
+            mean=self.mean, std=self.std, size=size[:-1] + (n_drawn,), generator=self.generator
+        )
+        offsets = coefficients * time_diff * wnoise
+
+        if continued:
+            initial = torch.as_tensor(self.previous_value, dtype=torch.float64).reshape(())
+        else:
+            # The first error is the starting value itself
+            coefficients = coefficients.clone()
+            coefficients[0] = 0.0
+            offsets[..., 0] = self.start_value
+            initial = None
+        red_noise = affine_scan(coefficients, offsets, initial)
+
+        if batch_size is None and n_samples > 0:
+            self.previous_time = time_vector[-1]
+            self.previous_value = red_noise[-1:].clone()
+        return self._output(red_noise, out, torch.get_default_dtype())
@@ -0,0 +1,209 @@
+import copy
+import math
+import multiprocessing
+import os
+import pickle
+import numpy as np
+import torch
+from concurrent.futures import ProcessPoolExecutor
+from torch import Tensor
+from typing import Callable, Dict, Optional, Tuple, Union
+from .config import rebuild
+from .rng import derive_seed, make_generator
+from .storage import NpyWriter, load_dataset
+from .storage.writers import COLUMNS, _grid_rows
+from .syntheticseries import SyntheticSeries
+from .timesampler import RegularTimeIndex, TimeSampler, as_time_tensor
+
+__all__ = ["generate_dataset"]
+
+# State of a worker process, set once by `_init_worker`
+_worker_state: Dict = {}
+
+
+def _init_worker(spec, time_sampler, time_kwargs:Dict, path:str, seed:int, n_threads:int, grid:Tuple[int, ...]):
+    """Sets up a worker: its torch threads, the dataset specification and the output arrays."""
+    torch.set_num_threads(n_threads)
+    _worker_state.update(
+        spec=spec,
+        time_sampler=copy.copy(time_sampler),
+        time_kwargs=time_kwargs,
+        seed=seed,
+        grid=grid,
+        columns={
+            column: np.load(os.path.join(path, column + ".npy"), mmap_mode="r+") for column in COLUMNS
+        },
+    )
+
+
+def _make_series(spec:Union[SyntheticSeries, Callable[[], SyntheticSeries]])->SyntheticSeries:
+    """Fresh series from a specification, so that no state leaks from one series to the next.
+
+    A SyntheticSeries is rebuilt from its constructor arguments: a copy would also carry the
+    state its generators reached if it was sampled before.
+    """
+    return spec() if callable(spec) else rebuild(spec)
+
+
+def _series_factory(spec:Union[SyntheticSeries, Callable[[], SyntheticSeries]])->Callable[[], SyntheticSeries]:
+    """Function returning a fresh series of spec for every series of a shard.
+
+    A SyntheticSeries is rebuilt once, and copied before it is sampled for every series, so
+    that costly set-ups, such as the burn-in of a MackeyGlass, run once per shard. Series
+    that cannot be copied, such as those of a jitcdde MackeyGlass, are rebuilt every time.
+    """
+    if callable(spec):
+        return spec
+    template = _make_series(spec)
+    try:
+        copy.deepcopy(template)
+    except (pickle.PickleError, TypeError):
+        return lambda: _make_series(spec)
+    return lambda: copy.deepcopy(template)
+
+
+def _generate_shard(start:int, stop:int)->int:
+    """Generates series start to stop - 1 and writes them to the output arrays."""
+    state = _worker_state
+    time_sampler = state["time_sampler"]
+    n_rows = math.prod(state["grid"])
+    make_series = _series_factory(state["spec"])
+    for series_id in range(start, stop):
+        series = make_series()
+        series.seed = state["seed"]
+        series.reseed(series_id)
+        if isinstance(time_sampler, TimeSampler):
+            time_sampler.generator = make_generator(derive_seed(state["seed"], series_id, 2))
+            time_vector = time_sampler.sample_time(**state["time_kwargs"])
+        else:
+            time_vector = time_sampler
+        samples, signals, errors = series.sample(time_vector)
+        if tuple(samples.shape[:-1]) != state["grid"]:
+            raise ValueError(
+                f"Series {series_id} has the parameter grid {tuple(samples.shape[:-1])}, series 0 has {state['grid']}"
+            )
+        # One row per grid point, as written by `write_dataset`
+        rows = _grid_rows(samples[None], signals[None], errors[None])
+        time_row = as_time_tensor(time_vector).reshape(1, -1).expand(n_rows, -1)
+        for column, values in zip(COLUMNS, (time_row,) + rows):
+            state["columns"][column][series_id * n_rows:(series_id + 1) * n_rows] = (
+                torch.as_tensor(values).detach().cpu().numpy()
+            )
+    for array in state["columns"].values():
+        array.flush()
+    return stop - start
+
+
+def _grid_of(spec, time_vector, seed:int)->Tuple[int, ...]:
+    """Parameter grid shape of the series of spec, from a sample of series 0."""
+    series = _make_series(spec)
+    series.seed = seed
+    series.reseed(0)
+    return tuple(series.sample(time_vector)[0].shape[:-1])
+
+
+def generate_dataset(
+    spec:Union[SyntheticSeries, Callable[[], SyntheticSeries]],
+        n_series:int,
+        time_sampler:Union[TimeSampler, Tensor, RegularTimeIndex],
+        n_workers:Optional[int]=None,
+        path:str="dataset",
+        seed:Optional[int]=None,
+        shard_size:Optional[int]=None,
+        n_threads:Optional[int]=None,
+        dtype=np.float32,
+        **time_kwargs
+)->Dict[str, np.ndarray]:
+    """Generates n_series series in parallel, straight into memory-mapped `.npy` files.
+
+    Series are sharded across a process pool. Each worker writes its rows in place into
+    the files of an `NpyWriter` dataset, so no sampled tensor is pickled back to the
+    parent process. Series i is drawn from the random streams derived from (seed, i) and
+    starts from spec as it was constructed, whatever was sampled from it before, so the
+    dataset is the same for any number of workers and any shard size. Workers build spec
+    once per shard and copy it for each series, so set-ups such as burn-ins are not
+    repeated.
+
+    If spec has parameter grids, e.g. a Sinusoidal with a tensor of P frequencies, each
+    series is stored as P consecutive rows, as with `storage.write_dataset`. The grid shape
+    is taken from a sample of series 0, drawn in the calling process.
+
+    Parameters
+    ----------
+    spec : SyntheticSeries or callable
+        Series to sample, rebuilt from its constructor arguments, or a function returning
+        a new one, called for each series. With the default fork start method, it is
+        inherited by the workers; with others, it must be picklable
+    n_series : int
+        Number of series to generate
+    time_sampler : TimeSampler, tensor or RegularTimeIndex
+        A TimeSampler, sampled for every series with time_kwargs, or times shared by all
+        series. All series must have the same number of points
+    n_workers : int (default None)
+        Number of worker processes. Defaults to the number of CPUs; with 1, the series are
+        generated in the calling process
+    path : str (default 'dataset')
+        Directory of the dataset
+    seed : int (default None)
+        Root seed of the dataset. Defaults to the seed of spec, and to a random seed drawn
+        from torch's global generator if spec has none
+    shard_size : int (default None)
+        Number of series per task. Defaults to splitting the series in 4 tasks per worker
+    n_threads : int (default None)
+        torch intra-op threads per worker. Defaults to the number of CPUs divided by the
+        number of workers, to avoid oversubscription
+    dtype : numpy dtype (default np.float32)
+        Data type of the stored values
+    time_kwargs
+        Keyword arguments of `TimeSampler.sample_time`, e.g. num_points and how
+
+    Returns
+    -------
+    dict
+        The dataset, as returned by `storage.load_dataset`
+
+    """
+    n_cpus = os.cpu_count() or 1
+    n_workers = n_cpus if n_workers is None else n_workers
+    n_threads = max(1, n_cpus // n_workers) if n_threads is None else n_threads
+    shard_size = max(1, -(-n_series // (4 * n_workers))) if shard_size is None else shard_size
+    if seed is None:
+        seed = getattr(spec, "seed", None)
+    if seed is None:
+        seed = int(torch.randint(0, 2 ** 63 - 1, ()))
+
+    if isinstance(time_sampler, TimeSampler):
+        probe = copy.copy(time_sampler)
+        probe.generator = make_generator(derive_seed(seed, 0, 2))
+        probe_time = probe.sample_time(**time_kwargs)
+    else:
+        probe_time = time_sampler
+    grid = _grid_of(spec, probe_time, seed) if n_series > 0 else ()
+    writer = NpyWriter(path, n_series * math.prod(grid), len(probe_time), dtype=dtype, grid=grid)
+    for array in writer.columns.values():
+        array.flush()
+
+    initargs = (spec, time_sampler, time_kwargs, path, seed, n_threads, grid)
+    shards = [(start, min(start + shard_size, n_series)) for start in range(0, n_series, shard_size)]
+    if n_workers == 1:
+        previous_threads = torch.get_num_threads()
+        try:
+            _init_worker(*initargs)
+            for start, stop in shards:
+                _generate_shard(start, stop)
+        finally:
+            _worker_state.clear()
+            torch.set_num_threads(previous_threads)
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(
+            n_workers, mp_context=context, initializer=_init_worker, initargs=initargs
+        ) as executor:
+            starts, stops = zip(*shards) if shards else ((), ())
+            for _ in executor.map(_generate_shard, starts, stops):
+                pass
+
+    writer.n_written = n_series * math.prod(grid)
+    writer.close()
+    return load_dataset(path)
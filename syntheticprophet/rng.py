@@ -0,0 +1,89 @@
+import hashlib
+import numbers
+import numpy as np
+import torch
+from torch import Tensor
+from typing import Optional, Tuple
+
+__all__ = ["derive_seed", "make_generator", "normal", "standard_gamma"]
+
+
+def derive_seed(root:int, *ids:int)->int:
+    """Seed of the random stream identified by ids, derived from a root seed.
+
+    The root seed and the ids are hashed with BLAKE2b, so every (root, ids) tuple maps to a
+    fixed, statistically independent 63-bit seed, whatever the process, the order or the
+    number of streams created before it. This allows per-series and per-chunk streams,
+    e.g. derive_seed(root, series_id, chunk_id), to be created independently by workers.
+
+    Parameters
+    ----------
+    root : int
+        Root seed
+    ids : int
+        Identifiers of the stream, e.g. series and chunk numbers
+
+    Returns
+    -------
+    int
+        Seed of the stream
+
+    """
+    key = "/".join(str(int(part)) for part in (root,) + ids).encode("ascii")
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "little") & (2 ** 63 - 1)
+
+
+def make_generator(seed:Optional[int]=None, generator:Optional[torch.Generator]=None)->Optional[torch.Generator]:
+    """Random number generator of a sampler.
+
+    Parameters
+    ----------
+    seed : int (default None)
+        Seed of a new generator
+    generator : torch.Generator (default None)
+        Generator to use as is. Takes precedence over seed
+
+    Returns
+    -------
+    torch.Generator or None
+        None if neither is given, in which case torch's global generator is used
+
+    """
+    if generator is not None:
+        return generator
+    if seed is not None:
+        return torch.Generator().manual_seed(seed)
+    return None
+
+
+def standard_gamma(concentration:float, size:Tuple[int, ...], generator:Optional[torch.Generator]=None)->Tensor:
+    """Gamma(concentration, 1) samples in float64, drawn reproducibly from generator.
+
+    torch's gamma sampler does not accept a generator, so the samples come from a numpy
+    generator seeded by a draw from it.
+    """
+    seed = int(torch.randint(0, 2 ** 63 - 1, (), generator=generator))
+    return torch.from_numpy(np.random.default_rng(seed).standard_gamma(concentration, size))
+
+
+def normal(
+    mean, std, size:Tuple[int, ...], generator:Optional[torch.Generator]=None,
+        dtype:Optional[torch.dtype]=None, out:Optional[Tensor]=None
+)->Tensor:
+    """torch.normal for a mean and standard deviation that are numbers or tensors.
+
+    Tensors and lists are broadcast to size, e.g. a (P, 1) column of means with size
+    (B, P, T). With numbers, this is torch.normal(mean, std, size), so the draws do not
+    change.
+    """
+    if isinstance(mean, numbers.Number) and isinstance(std, numbers.Number):
+        if out is not None:
+            return torch.normal(mean=mean, std=std, size=size, generator=generator, out=out)
+        return torch.normal(mean=mean, std=std, size=size, generator=generator, dtype=dtype)
+    dtype = out.dtype if out is not None else dtype or torch.get_default_dtype()
+    mean = torch.as_tensor(mean, dtype=dtype).expand(size)
+    std = torch.as_tensor(std, dtype=dtype).expand(size)
+    if out is not None:
+        return torch.normal(mean, std, generator=generator, out=out)
+    return torch.normal(mean, std, generator=generator)
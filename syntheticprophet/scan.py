@@ -0,0 +1,46 @@
+import torch
+from torch import Tensor
+from typing import Optional
+
+__all__ = ["affine_scan"]
+
+
+def affine_scan(coefficients:Tensor, offsets:Tensor, initial:Optional[Tensor]=None)->Tensor:
+    """Evaluates the affine recurrence x[k] = a[k] * x[k-1] + b[k] along the last dimension.
+
+    The recurrence is computed with a parallel prefix (Hillis-Steele) scan over the
+    associative composition of affine maps, (a1, b1) then (a2, b2) = (a1 * a2, a2 * b1 + b2).
+    This takes log2(T) vectorized steps instead of T scalar ones.
+
+    Parameters
+    ----------
+    coefficients : tensor
+        Multiplicative coefficients a, of shape (..., T)
+    offsets : tensor
+        Additive terms b, of shape (..., T)
+    initial : tensor (default None)
+        Value of x[-1], broadcastable to (...,). Zero if None
+
+    Returns
+    -------
+    tensor
+        Values x[0], ..., x[T-1], of shape (..., T)
+
+    """
+    coefficients, offsets = torch.broadcast_tensors(coefficients, offsets)
+    length = coefficients.shape[-1]
+    step = 1
+    while step < length:
+        offsets = torch.cat(
+            (offsets[..., :step], coefficients[..., step:] * offsets[..., :-step] + offsets[..., step:]),
+            dim=-1,
+        )
+        coefficients = torch.cat(
+            (coefficients[..., :step], coefficients[..., step:] * coefficients[..., :-step]),
+            dim=-1,
+        )
+        step *= 2
+    if initial is None:
+        return offsets
+    initial = torch.as_tensor(initial, dtype=offsets.dtype)
+    return coefficients * initial[..., None] + offsets
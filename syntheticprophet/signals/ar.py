@@ -1,7 +1,9 @@
+import numpy as np
 import torch
 from torch import Tensor
 from .base_signal import BaseSignal
-from typing import List
+from ..rng import make_generator
+from typing import List, Optional
 
 __all__ = ["AutoRegressive"]
 
@@ -12,6 +14,11 @@ class AutoRegressive(BaseSignal):
     Generates time series with an autogressive lag defined by the number of parameters in ar_param.
     NOTE: Only use this for regularly sampled signals
 
+    Vectorized sampling pre-draws all innovations and runs the recursion as an IIR filter.
+    `sample_next` keeps the original step-by-step recursion for debugging. Both paths
+    sample the same process, but not the same values for a given seed: torch draws a
+    block of normals with a different algorithm than one normal at a time.
+
     Parameters
     ----------
     ar_param : list (default [None])
@@ -21,37 +28,30 @@ class AutoRegressive(BaseSignal):
         Standard deviation of the signal
     start_value : list (default [None])
         Starting value of the AR(p) process
+    seed : int (default None)
+        Seed of the generator's own random number generator. If neither seed nor generator
+        is given, torch's global generator is used
+    generator : torch.Generator (default None)
+        Random number generator to draw from. Takes precedence over seed
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to torch's default dtype
 
     """
 
+    requires_history = False
+
     def __init__(self,
                  ar_param:List=[None],
                  sigma:float=0.5,
-                 start_value:List=[None]):
-        super().__init__(vectorizable=False)
-        #if start_value is None:
-        #    start_value = torch.Tensor()
-        # if ar_param is None:
-        #     ar_param = torch.Tensor()
-        # if isinstance(ar_param, List):
-        #     ar_param = torch.tensor(ar_param)
-        # ar_param.reverse()
-        # self.ar_param = torch.tensor(ar_param)
-        # self.sigma = sigma
-        #
-        # if start_value[0] is None:
-        #     self.start_value = torch.tensor([0 for i in range(len(ar_param))])
-        # else:
-        #     if len(start_value) != len(ar_param):
-        #         raise ValueError("AR parameters do not match starting value")
-        #     else:
-        #         self.start_value = start_value
-        # if isinstance(self.start_value, List):
-        #     self.start_value = torch.tensor(self.start_value)
-        # self.previous_value = self.start_value
-
-        ar_param.reverse()
-        self.ar_param = ar_param
+                 start_value:List=[None],
+                 seed:Optional[int]=None,
+                 generator:Optional[torch.Generator]=None,
+                 dtype:Optional[torch.dtype]=None):
+        super().__init__(vectorizable=True)
+        self.generator = make_generator(seed, generator)
+        self.dtype = dtype
+        # Stored oldest lag first, [phi_p, ..., phi_1], to match previous_value
+        self.ar_param = list(reversed(ar_param))
         self.sigma = sigma
         if start_value[0] is None:
             self.start_value = [0 for i in range(len(ar_param))]
@@ -59,12 +59,10 @@ class AutoRegressive(BaseSignal):
             if len(start_value) != len(ar_param):
                 raise ValueError("AR parameters do not match starting value")
             else:
-                self.start_value = start_value
-        self.previous_value = self.start_value
-
-
+                self.start_value = list(start_value)
+        self.previous_value = list(self.start_value)
 
-    def sample_next(self, time:int, samples:Tensor, errors:Tensor)->float:
+    def sample_next(self, time:int, samples:Tensor, errors:Tensor)->Tensor:
         """Sample a single time point
 
         Parameters
@@ -74,20 +72,60 @@ class AutoRegressive(BaseSignal):
 
         Returns
         -------
-        ar_value : float
+        ar_value : tensor
             sampled signal for time t
         """
-        #ar_value = torch.tensor([
-        #    self.previous_value[i] * self.ar_param[i] for i in range(len(self.ar_param))
-        #])
-        # assert(len(self.previous_value)==len(self.ar_param))
-        # ar_value = torch.mul(self.previous_value, self.ar_param)
+        ar_value = sum(self.previous_value[i] * self.ar_param[i] for i in range(len(self.ar_param)))
 
-        ar_value = [self.previous_value[i] * self.ar_param[i] for i in range(len(self.ar_param))]
+        noise = torch.normal(mean=0.0, std=self.sigma, size=(1,), generator=self.generator)
+        ar_value = ar_value + noise
+        self.previous_value = self.previous_value[1:] + [float(ar_value)]
 
-        noise = torch.normal(mean=0.0, std=self.sigma, size=(1,))
-        ar_value = torch.sum(ar_value) + noise
-        self.previous_value = self.previous_value[1:] + ar_value
+        return ar_value
 
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
+        """Sample entire series based off of time vector
 
-        return ar_value
+        All innovations are drawn at once and filtered with the AR(p) recursion
+        y[k] = phi_1 * y[k-1] + ... + phi_p * y[k-p] + e[k] along the time axis.
+        A single series continues from the values left by previous calls, while a batch
+        draws independent series from the starting value.
+
+        Parameters
+        ----------
+        time_vector : array-like
+            Timestamps for signal generation
+        batch_size : int (default None)
+            Number of independent series to draw
+        out : tensor (default None)
+            Tensor of shape (T,) or (batch_size, T) to write the samples to
+
+        Returns
+        -------
+        tensor
+            sampled signal for time vector, of shape (batch_size, T) if batch_size is given
+
+        """
+        from scipy.signal import lfilter, lfiltic
+
+        n_samples = len(time_vector)
+        size = (n_samples,) if batch_size is None else (batch_size, n_samples)
+        noise = torch.normal(mean=0.0, std=self.sigma, size=size, generator=self.generator)
+        noise = noise.numpy().astype(np.float64)
+        if len(self.ar_param) == 0:
+            return self._output(torch.from_numpy(noise), out, torch.get_default_dtype())
+
+        # Denominator [1, -phi_1, ..., -phi_p]; initial values are passed newest first
+        denominator = np.concatenate(([1.0], -np.asarray(self.ar_param[::-1], dtype=np.float64)))
+        history = self.previous_value if batch_size is None else self.start_value
+        initial_state = lfiltic([1.0], denominator, np.asarray(history[::-1], dtype=np.float64))
+        if batch_size is not None:
+            initial_state = np.broadcast_to(initial_state, (batch_size, initial_state.shape[0])).copy()
+        values, _ = lfilter([1.0], denominator, noise, axis=-1, zi=initial_state)
+
+        if batch_size is None:
+            history = np.concatenate((np.asarray(self.previous_value, dtype=np.float64), values))
+            self.previous_value = history[history.shape[0] - len(self.ar_param):].tolist()
+        return self._output(torch.from_numpy(values), out, torch.get_default_dtype())
@@ -1,14 +1,32 @@
 __all__ = []
+import numbers
 from torch import Tensor
+from typing import Optional
+from ..config import Configurable
+from ..rng import make_generator
 
 
-class BaseSignal:
+class BaseSignal(Configurable):
     """BaseSignal class
 
     Signature for all signal classes.
 
+    Signals can be combined into expression trees: `a + b` and `a * b` build a Sum and a
+    Product of signals, and `2.0 * a` a Scale of a signal.
+
+    Signals serialize to a config of their constructor arguments with `get_config`, and
+    are rebuilt with `from_config`.
+
     """
 
+    # Random number generator of the signal, None for torch's global generator
+    generator = None
+    # Data type of the samples, None for the signal's own default
+    dtype = None
+    # Whether sample_next reads the samples and errors passed to it. If not, the signal can
+    # be stepped without the history, while the other generator of a series is vectorized
+    requires_history = True
+
     def __init__(self, vectorizable:bool=False):
         self.vectorizable = vectorizable
 
@@ -32,18 +50,80 @@ class BaseSignal:
         """
         raise NotImplementedError
 
-    def sample_vectorized(self, time_vector:Tensor)->Tensor:
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
         """Samples for all time points in input
 
         Parameters
         ----------
         time_vector : array like
             all time stamps to be sampled
+        batch_size : int (default None)
+            number of independent series to draw. If None, a single series is returned
+        out : tensor (default None)
+            tensor of shape (T,) or (batch_size, T) to write the samples to
 
         Returns
         -------
-        float
-            sampled signal for time t
+        tensor
+            sampled signal of shape (T,), or (batch_size, T) if batch_size is given
 
         """
         raise NotImplementedError
+
+    def _output(self, values:Tensor, out:Optional[Tensor]=None, default_dtype=None)->Tensor:
+        """Returns values in the signal's dtype, or copies them into out if given.
+
+        Without a dtype, values are cast to default_dtype if given, and returned as is
+        otherwise.
+        """
+        if out is not None:
+            return out.copy_(values)
+        dtype = default_dtype if self.dtype is None else self.dtype
+        return values if dtype is None else values.to(dtype)
+
+    def reseed(self, seed:Optional[int]=None, generator=None):
+        """Replaces the random number generator of the signal
+
+        Only the random stream changes; state carried between calls, such as the last
+        sampled values of stateful generators, is kept.
+
+        Parameters
+        ----------
+        seed : int (default None)
+            Seed of a new generator
+        generator : torch.Generator (default None)
+            Generator to use as is. Takes precedence over seed
+
+        """
+        self.generator = make_generator(seed, generator)
+
+    def __add__(self, other):
+        from .composite import Sum
+
+        if isinstance(other, BaseSignal):
+            return Sum(self, other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        # Allows sum() over signals, which starts from 0
+        if isinstance(other, numbers.Number) and other == 0:
+            return self
+        return NotImplemented
+
+    def __mul__(self, other):
+        from .composite import Product, Scale
+
+        if isinstance(other, BaseSignal):
+            return Product(self, other)
+        if isinstance(other, numbers.Number):
+            return Scale(self, other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        from .composite import Scale
+
+        if isinstance(other, numbers.Number):
+            return Scale(self, other)
+        return NotImplemented
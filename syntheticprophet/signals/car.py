@@ -1,6 +1,10 @@
 import torch
 from torch import Tensor
+from typing import Optional
 from .base_signal import BaseSignal
+from ..rng import make_generator
+from ..scan import affine_scan
+from ..timesampler.time_index import as_time_tensor
 
 __all__ = ["CAR"]
 
@@ -16,11 +20,29 @@ class CAR(BaseSignal):
         Standard deviation of the signal
     start_value : number (default 0.0)
         Starting value of the AR process
+    seed : int (default None)
+        Seed of the generator's own random number generator. If neither seed nor generator
+        is given, torch's global generator is used
+    generator : torch.Generator (default None)
+        Random number generator to draw from. Takes precedence over seed
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to torch's default dtype
+
+    Vectorized sampling evaluates the recurrence with a parallel scan, and supports
+    irregularly sampled time vectors.
 
     """
 
-    def __init__(self, ar_param:float=1.0, sigma:float=0.5, start_value:float=0.01):
-        self.vectorizable = False
+    requires_history = False
+
+    def __init__(
+        self, ar_param:float=1.0, sigma:float=0.5, start_value:float=0.01,
+            seed:Optional[int]=None, generator:Optional[torch.Generator]=None,
+            dtype:Optional[torch.dtype]=None
+    ):
+        self.vectorizable = True
+        self.generator = make_generator(seed, generator)
+        self.dtype = dtype
         self.ar_param = ar_param
         self.sigma = sigma
         self.start_value = start_value
@@ -45,7 +67,7 @@ class CAR(BaseSignal):
             output = self.start_value
         else:
             time_diff = time - self.previous_time
-            noise = torch.normal(mean=0.0, std=1.0, size=(1,))
+            noise = torch.normal(mean=0.0, std=1.0, size=(1,), generator=self.generator)
             if isinstance(self.ar_param, float):
                 self.ar_param = torch.tensor([self.ar_param])
             if isinstance(time_diff, float):
@@ -59,3 +81,67 @@ class CAR(BaseSignal):
         self.previous_time = time
         self.previous_value = output
         return output
+
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
+        """Sample entire series based off of time vector
+
+        The recurrence x[k] = ar_param^dt[k] * x[k-1] + sigma * sqrt(1 - ar_param^dt[k]) * e[k]
+        is affine, so all noise is drawn up front and the series is computed by `affine_scan`.
+        A single series continues from the value left by previous calls, while a batch
+        draws independent series from the starting value.
+
+        Parameters
+        ----------
+        time_vector : array-like
+            Timestamps for signal generation
+        batch_size : int (default None)
+            Number of independent series to draw
+        out : tensor (default None)
+            Tensor of shape (T,) or (batch_size, T) to write the samples to
+
+        Returns
+        -------
+        tensor
+            sampled signal for time vector, of shape (batch_size, T) if batch_size is given
+
+        """
+        time_vector = as_time_tensor(time_vector, torch.float64).reshape(-1)
+        n_samples = time_vector.shape[0]
+        size = (n_samples,) if batch_size is None else (batch_size, n_samples)
+        ar_param = torch.as_tensor(self.ar_param, dtype=torch.float64).reshape(())
+        # Continue the last series only on timestamps after it, otherwise start a new one
+        continued = (
+            batch_size is None and self.previous_value is not None and n_samples > 0
+            and float(time_vector.min()) > float(self.previous_time)
+        )
+
+        if continued:
+            previous_time = torch.as_tensor(self.previous_time, dtype=torch.float64).reshape(1)
+            time_diff = time_vector - torch.cat((previous_time, time_vector[:-1]))
+        else:
+            time_diff = torch.cat((torch.zeros(1, dtype=torch.float64), time_vector[1:] - time_vector[:-1]))
+        coefficients = torch.pow(ar_param, time_diff)
+        # A new series starts from the starting value, without noise, as in sample_next
+        n_drawn = n_samples if continued else max(n_samples - 1, 0)
+        noise = torch.zeros(size, dtype=torch.float64)
+        noise[..., n_samples - n_drawn:] = torch.normal(
+            mean=0.0, std=1.0, size=size[:-1] + (n_drawn,), generator=self.generator
+        )
+        offsets = self.sigma * torch.sqrt(1 - coefficients) * noise
+
+        if continued:
+            initial = torch.as_tensor(self.previous_value, dtype=torch.float64).reshape(())
+        else:
+            # The first sample is the starting value itself
+            coefficients = coefficients.clone()
+            coefficients[0] = 0.0
+            offsets[..., 0] = self.start_value
+            initial = None
+        signal = affine_scan(coefficients, offsets, initial)
+
+        if batch_size is None and n_samples > 0:
+            self.previous_time = time_vector[-1]
+            self.previous_value = signal[-1:].clone()
+        return self._output(signal, out, torch.get_default_dtype())
@@ -0,0 +1,255 @@
+import numbers
+import torch
+from torch import Tensor
+from typing import List, Optional, Union
+from .base_signal import BaseSignal
+from ..grid import align_grids
+from ..rng import derive_seed
+
+__all__ = ["Sum", "Product", "Scale"]
+
+
+def _promote(out:Tensor, value:Tensor)->Tensor:
+    """out, cast and broadcast if needed so that value can be accumulated into it without
+    loss, e.g. when value has parameter grid dimensions that out lacks."""
+    dtype = torch.promote_types(out.dtype, value.dtype)
+    shape = torch.broadcast_shapes(out.shape, value.shape)
+    if out.shape != shape:
+        return out.to(dtype).expand(shape).clone()
+    return out if out.dtype == dtype else out.to(dtype)
+
+
+def _as_value(value)->Tensor:
+    """A child's sample_next value as a tensor, numbers kept in double precision."""
+    return torch.tensor(value, dtype=torch.float64) if isinstance(value, numbers.Number) else torch.as_tensor(value)
+
+
+class _Composite(BaseSignal):
+    """Node of a signal expression tree, combining the outputs of its children.
+
+    Vectorized sampling evaluates the vectorizable children one after the other, each
+    accumulated in place into the output of the first one, so no intermediate of the size
+    of the series is kept besides the output of the child being evaluated. Children that
+    are not vectorizable are stepped with `sample_next` over the time vector, without
+    history. A child that is not vectorizable and requires the history of samples and
+    errors makes the node not vectorizable: the node is then stepped by the series, and
+    passes the history on to its children. If an output tensor is given, the first child
+    writes into it and the others are accumulated into it in its dtype.
+
+    `reseed` gives child i the random stream derive_seed(seed, i).
+    """
+
+    # Neutral element of the combination
+    identity = 0.0
+
+    def __init__(self, children:List[BaseSignal], dtype:Optional[torch.dtype]=None):
+        super().__init__(
+            vectorizable=not any(not child.vectorizable and child.requires_history for child in children)
+        )
+        self.children = children
+        self.dtype = dtype
+
+    def reseed(self, seed:Optional[int]=None, generator=None):
+        """Replaces the random number generators of the node and of its children
+
+        Parameters
+        ----------
+        seed : int (default None)
+            Root seed of the children's generators, child i drawing from the stream
+            derive_seed(seed, i)
+        generator : torch.Generator (default None)
+            Generator shared by the children as is. Takes precedence over seed
+
+        """
+        super().reseed(seed, generator)
+        for i, child in enumerate(self.children):
+            if generator is None and seed is not None:
+                child.reseed(derive_seed(seed, i))
+            else:
+                child.reseed(generator=generator)
+
+    @property
+    def requires_history(self)->bool:
+        """Whether a child reads the history passed to sample_next."""
+        return any(child.requires_history for child in self.children)
+
+    def _accumulate(self, out:Tensor, value:Tensor, promote:bool=True)->Tensor:
+        """Combines value into out, in place, casting out first if promote and needed."""
+        raise NotImplementedError
+
+    def _finalize(self, out:Tensor)->Tensor:
+        return out
+
+    def sample_next(self, time:int, samples:Tensor, errors:Tensor)->Union[float, Tensor]:
+        """Sample a single time point by combining the children's samples
+
+        Parameters
+        ----------
+        time : number
+            Time at which a sample was required
+
+        Returns
+        -------
+        float or tensor
+            sampled signal for time t, or one value per grid point if a child has
+            parameter grids
+
+        """
+        out = torch.tensor(self.identity, dtype=torch.float64)
+        for child in self.children:
+            out = self._accumulate(out, _as_value(child.sample_next(time, samples, errors)))
+        out = self._finalize(out)
+        return float(out) if out.dim() == 0 else out
+
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
+        """Samples for all time points in input
+
+        Parameters
+        ----------
+        time_vector : array like
+            all time stamps to be sampled
+        batch_size : int (default None)
+            number of series to draw. Children that are not vectorizable are stepped for
+            each series in turn
+        out : tensor (default None)
+            tensor of shape (T,) or (batch_size, T) to write the samples to
+
+        Returns
+        -------
+        tensor
+            sampled signal of shape (T,), or (batch_size, T) if batch_size is given
+
+        """
+        result = None
+        for child in self.children:
+            if not child.vectorizable:
+                continue
+            if result is None:
+                if out is None:
+                    result = child.sample_vectorized(time_vector, batch_size)
+                else:
+                    result = child.sample_vectorized(time_vector, batch_size, out=out)
+            else:
+                value = child.sample_vectorized(time_vector, batch_size)
+                result, value = align_grids(result, value, batch_size is not None)
+                result = self._accumulate(result, value, promote=out is None)
+        stepped = [child for child in self.children if not child.vectorizable]
+        if stepped:
+            result = self._step(stepped, time_vector, batch_size, result, out)
+        result = self._finalize(result)
+        return result if result is out else self._output(result, out)
+
+    def _step(
+        self, children:List[BaseSignal], time_vector:Tensor, batch_size:Optional[int],
+            result:Optional[Tensor], out:Optional[Tensor]
+    )->Tensor:
+        """Accumulates the children's sample_next into result, one time point at a time.
+
+        The children's values are combined first, for each series of the batch, with one
+        value per grid point if a child has parameter grids, and then into result.
+        """
+        n_series = 1 if batch_size is None else batch_size
+        # The children do not require the history, see the class docstring
+        history = torch.empty(0)
+        series = []
+        for _ in range(n_series):
+            steps = []
+            for time in time_vector:
+                value = torch.tensor(self.identity, dtype=torch.float64)
+                for child in children:
+                    value = self._accumulate(value, _as_value(child.sample_next(time, history, history)))
+                steps.append(value)
+            series.append(torch.stack(steps, dim=-1))
+        values = series[0] if batch_size is None else torch.stack(series)
+        if result is None:
+            if out is None:
+                return values.to(self.dtype or torch.get_default_dtype())
+            return out.copy_(values)
+        result, values = align_grids(result, values.to(result.dtype), batch_size is not None)
+        return self._accumulate(result, values, promote=out is None)
+
+
+class Sum(_Composite):
+    """Sum of signals, e.g. trend + seasonality + residual.
+
+    Usually built with the `+` operator of signals. Nested sums are flattened.
+
+    Parameters
+    ----------
+    terms : signal objects
+        Signals to add up
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to the promoted dtype of the terms
+
+    """
+
+    identity = 0.0
+
+    def __init__(self, *terms:BaseSignal, dtype:Optional[torch.dtype]=None):
+        children = []
+        for term in terms:
+            children.extend(term.children if isinstance(term, Sum) else [term])
+        super().__init__(children, dtype=dtype)
+
+    def _accumulate(self, out:Tensor, value:Tensor, promote:bool=True)->Tensor:
+        return (_promote(out, value) if promote else out).add_(value)
+
+
+class Product(_Composite):
+    """Product of signals, e.g. an amplitude-modulated seasonality.
+
+    Usually built with the `*` operator of signals. Nested products are flattened.
+
+    Parameters
+    ----------
+    factors : signal objects
+        Signals to multiply
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to the promoted dtype of the factors
+
+    """
+
+    identity = 1.0
+
+    def __init__(self, *factors:BaseSignal, dtype:Optional[torch.dtype]=None):
+        children = []
+        for factor in factors:
+            children.extend(factor.children if isinstance(factor, Product) else [factor])
+        super().__init__(children, dtype=dtype)
+
+    def _accumulate(self, out:Tensor, value:Tensor, promote:bool=True)->Tensor:
+        return (_promote(out, value) if promote else out).mul_(value)
+
+
+class Scale(_Composite):
+    """Signal multiplied by a constant.
+
+    Usually built by multiplying a signal with a number. Nested scalings are folded.
+
+    Parameters
+    ----------
+    signal : signal object
+        Signal to scale
+    factor : number
+        Constant factor
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to the dtype of the signal
+
+    """
+
+    # The signal is multiplied into the neutral element, then by the factor
+    identity = 1.0
+
+    def __init__(self, signal:BaseSignal, factor:numbers.Number, dtype:Optional[torch.dtype]=None):
+        if isinstance(signal, Scale):
+            signal, factor = signal.children[0], signal.factor * factor
+        super().__init__([signal], dtype=dtype)
+        self.factor = factor
+
+    def _accumulate(self, out:Tensor, value:Tensor, promote:bool=True)->Tensor:
+        return (_promote(out, value) if promote else out).mul_(value)
+
+    def _finalize(self, out:Tensor)->Tensor:
+        return out.mul_(self.factor)
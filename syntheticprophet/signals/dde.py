@@ -1,13 +1,18 @@
+import inspect
+import itertools
+import os
+import shutil
+import sysconfig
 import warnings
 import torch
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from torch import Tensor
-from typing import List
+from typing import Dict, List, Optional, Sequence, Union
 from .base_signal import BaseSignal
-
-with warnings.catch_warnings():
-    warnings.simplefilter("ignore")
-    from jitcdde import y, t, jitcdde
+from .dde_integrator import MackeyGlassIntegrator
+from ..caching import get_cache_dir, hash_key
+from ..timesampler.time_index import as_time_tensor
 
 
 __all__ = ["MackeyGlass"]
@@ -41,42 +46,263 @@ class MackeyGlass(BaseSignal):
         will be used.
     burn_in : float (default 500)
         Amount of time after which samples will be taken and returned
+    cache : bool (default True)
+        Whether to keep the compiled DDE module, keyed by the equation and its parameters,
+        and the state after burn-in, keyed by the parameters, initial condition and
+        burn_in, on disk. Later instances with the same settings, also in other processes,
+        then skip the compilation and the burn-in integration
+    cache_dir : str (default None)
+        Root cache directory, see `syntheticprophet.caching.get_cache_dir`
+    control_parameters : bool (default False)
+        If True, beta, gamma and n are compiled as jitcdde control parameters instead of
+        constants, so that all instances with the same tau share one compiled module.
+        Used by `MackeyGlass.sweep`
+    backend : {'jitcdde', 'torch'} (default 'jitcdde')
+        'jitcdde' integrates adaptively with compiled C code. 'torch' uses a fixed-step
+        RK4 integrator, which needs no C compiler and integrates batches of trajectories at
+        once. Its steps are compiled with numba if installed, about a microsecond each;
+        otherwise they are tensor operations of about 0.2 ms each, so that a single series
+        is much slower than with jitcdde. The caching options do not apply to it
+    step : float (default 0.05)
+        Maximum integration step of the 'torch' backend
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to float64, the precision of the integration
 
     """
 
+    requires_history = False
+
     def __init__(
         self, tau:float=17.0,
             n:float=10.0,
             beta:float=0.2,
             gamma:float=0.1,
             initial_condition:List=None,
-            burn_in:float=500.0
+            burn_in:float=500.0,
+            cache:bool=True,
+            cache_dir:Optional[str]=None,
+            control_parameters:bool=False,
+            backend:str="jitcdde",
+            step:float=0.05,
+            dtype:Optional[torch.dtype]=None
     ):
+        if backend not in ("jitcdde", "torch"):
+            raise ValueError(f"Unknown backend {backend}")
         self.vectorizable = True
+        self.burn_in = burn_in
+        self.backend = backend
+        self.dtype = dtype
 
-        # Set system of equations
-        f = [-gamma * y(0) + beta * y(0, t - tau) / (1.0 + y(0, t - tau) ** n)]
-        self.dde = jitcdde(f)
-
-        # Set initial condition
         if initial_condition is None:
-            y_initial = 0.5
-            dy = lambda y: -gamma * y + beta * y / (1.0 + y ** n)
-            dy_initial = dy(y_initial)
-            self.dde.add_past_point(0.0, np.array([y_initial]), np.array([dy_initial]))
-            self.dde.add_past_point(tau, np.array([1.0]), np.array([0.0]))
+            initial_condition = self._default_initial_condition(tau, n, beta, gamma)
+        if backend == "torch":
+            integrator = MackeyGlassIntegrator(tau, n, beta, gamma, initial_condition, step=step)
+            integrator.integrate(burn_in)
+            self._burned_in = integrator
+            self._integrator = integrator.copy()
+            return
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            import jitcdde as jitcdde_module
+            from jitcdde import y, t, jitcdde
+            from symengine import Symbol
+
+        # Set system of equations. Integration results depend on the jitcdde version, and
+        # compiled modules also on the interpreter's ABI
+        equation_key = hash_key("MackeyGlass", tau, n, beta, gamma, jitcdde_module.__version__)
+        if control_parameters:
+            control_pars = [Symbol("beta"), Symbol("gamma"), Symbol("n")]
+            beta_, gamma_, n_ = control_pars
+            module_key = hash_key(
+                "MackeyGlass", tau, "control_parameters", jitcdde_module.__version__,
+                sysconfig.get_config_var("EXT_SUFFIX"),
+            )
         else:
-            for condition in initial_condition:
-                time, value, derivative = condition
-                self.dde.add_past_point(time, np.array([value]), np.array([derivative]))
+            control_pars = []
+            beta_, gamma_, n_ = beta, gamma, n
+            module_key = hash_key(equation_key, sysconfig.get_config_var("EXT_SUFFIX"))
+        f = [-gamma_ * y(0) + beta_ * y(0, t - tau) / (1.0 + y(0, t - tau) ** n_)]
+        module_path = state_path = None
+        if cache:
+            directory = get_cache_dir("mackeyglass", cache_dir=cache_dir)
+            module_path = os.path.join(directory, f"mackeyglass_{module_key}.so")
+            state_path = os.path.join(
+                directory, f"state_{hash_key(equation_key, initial_condition, burn_in, 'adjust_diff')}.npz"
+            )
+
+        compiled = True
+        if module_path is not None and os.path.exists(module_path):
+            self.dde = jitcdde(
+                f, n=1, max_delay=tau, control_pars=control_pars, module_location=module_path,
+                verbose=False,
+            )
+        else:
+            self.dde = jitcdde(f, control_pars=control_pars, verbose=False)
+            compiled = self._compile(module_path)
+
+        if state_path is not None and os.path.exists(state_path):
+            # Continue from the cached state after burn-in
+            state = np.load(state_path)
+            self.dde.add_past_points(zip(state["time"], state["state"], state["diff"]))
+            if not compiled:
+                self.dde.generate_lambdas()
+            if control_parameters:
+                self.dde.set_parameters(beta, gamma, n)
+            self.dde.set_integration_parameters()
+            # The cached past is smooth, so the zero-amplitude jump of adjust_diff only marks
+            # the initial discontinuities as handled, at negligible cost
+            self.dde.adjust_diff()
+            return
+
+        # Set initial condition
+        for condition in initial_condition:
+            time, value, derivative = condition
+            self.dde.add_past_point(time, np.array([value]), np.array([derivative]))
+        if not compiled:
+            self.dde.generate_lambdas()
 
         # Prepare DDE
-        self.dde.generate_lambdas()
+        if control_parameters:
+            self.dde.set_parameters(beta, gamma, n)
         self.dde.set_integration_parameters()
 
-        # Run burn_in
-        self.burn_in = burn_in
-        self.dde.integrate_blindly(self.burn_in)
+        # Run burn_in. The derivative of the initial past is not that of the DDE at its end;
+        # adjust_diff smooths this discontinuity, so that the adaptive integration stays
+        # accurate, where integrate_blindly took steps of max_step through it
+        self.dde.adjust_diff()
+        self.dde.integrate(self.burn_in)
+        if state_path is not None:
+            anchors = self.dde.get_state()
+            np.savez(
+                state_path,
+                time=np.array([anchor.time for anchor in anchors]),
+                state=np.array([anchor.state for anchor in anchors]),
+                diff=np.array([anchor.diff for anchor in anchors]),
+            )
+
+    @staticmethod
+    def _default_initial_condition(tau:float, n:float, beta:float, gamma:float)->List:
+        """Past used when no initial condition is given, as (time, value, derivative) anchors."""
+        y_initial = 0.5
+        dy = lambda y: -gamma * y + beta * y / (1.0 + y ** n)
+        return [(0.0, y_initial, dy(y_initial)), (tau, 1.0, 0.0)]
+
+    @classmethod
+    def sweep(
+        cls, param_grid:Union[Dict[str, Sequence[float]], List[Dict[str, float]]],
+            time_vector:Tensor, n_workers:int=1, **kwargs
+    )->Tensor:
+        """Samples the DDE for many parameter combinations.
+
+        beta, gamma and n are control parameters of a single compiled module per value of tau,
+        which is compiled (or loaded from the cache) once before the combinations are
+        integrated, optionally across worker processes. With backend='torch', all
+        combinations sharing a value of tau are integrated as one batch instead.
+
+        Parameters
+        ----------
+        param_grid : dict of lists, or list of dicts
+            Values for any of tau, n, beta and gamma. A dict is expanded to all combinations
+            of its values, a list of dicts is used as is
+        time_vector : array like
+            all time stamps to be sampled
+        n_workers : int (default 1)
+            Number of worker processes. With 1, all combinations run in this process
+        kwargs
+            Further arguments of MackeyGlass shared by all combinations, e.g. burn_in. Values
+            of tau, n, beta and gamma given here apply to the combinations that do not set them
+
+        Returns
+        -------
+        tensor
+            samples of shape (P, T), one row per parameter combination, in grid order
+
+        """
+        if isinstance(param_grid, dict):
+            names = list(param_grid)
+            param_grid = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+        # Shared values of the swept parameters apply where the grid does not set them
+        shared = {name: kwargs.pop(name) for name in ("tau", "n", "beta", "gamma") if name in kwargs}
+        param_grid = [dict(shared, **parameters) for parameters in param_grid]
+        defaults = {
+            name: parameter.default for name, parameter in inspect.signature(cls).parameters.items()
+        }
+        defaults.update(shared)
+        default_tau = defaults["tau"]
+
+        if kwargs.get("backend") == "torch":
+            # Integrate all combinations sharing a delay as one batch
+            burn_in = kwargs.get("burn_in", defaults["burn_in"])
+            rows = [None] * len(param_grid)
+            for tau in sorted({parameters.get("tau", default_tau) for parameters in param_grid}):
+                indices = [i for i, parameters in enumerate(param_grid) if parameters.get("tau", default_tau) == tau]
+                points = [
+                    {name: float(param_grid[i].get(name, defaults[name])) for name in ("n", "beta", "gamma")}
+                    for i in indices
+                ]
+                initial_condition = kwargs.get("initial_condition") or [
+                    cls._default_initial_condition(tau, **point) for point in points
+                ]
+                integrator = MackeyGlassIntegrator(
+                    tau,
+                    *[
+                        torch.tensor([point[name] for point in points], dtype=torch.float64)
+                        for name in ("n", "beta", "gamma")
+                    ],
+                    initial_condition,
+                    step=kwargs.get("step", defaults["step"]),
+                )
+                integrator.integrate(burn_in)
+                samples = integrator.sample(burn_in + as_time_tensor(time_vector, torch.float64))
+                for i, row in zip(indices, samples):
+                    rows[i] = row
+            return torch.stack(rows)
+
+        # Compile the module for every delay once, before the workers load it from the cache
+        for tau in sorted({parameters.get("tau", default_tau) for parameters in param_grid}):
+            cls(tau=tau, control_parameters=True, **kwargs)
+
+        jobs = [(cls, dict(parameters, **kwargs), time_vector) for parameters in param_grid]
+        if n_workers == 1:
+            rows = [_sample_sweep_point(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(n_workers) as executor:
+                rows = list(executor.map(_sample_sweep_point, jobs, chunksize=max(1, len(jobs) // (4 * n_workers))))
+        return torch.stack(rows)
+
+    def _compile(self, module_path:Optional[str])->bool:
+        """Compiles the DDE to C and stores the module at module_path, if given.
+
+        Returns False if compilation fails, e.g. without a C compiler, in which case the
+        Python backend of jitcdde is to be used once the past is set. Other errors, such as
+        failures to write to the cache, are raised.
+        """
+        from setuptools.errors import BaseError, CCompilerError
+
+        temporary_directory = None
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                if module_path is None:
+                    self.dde.compile_C()
+                else:
+                    # save_compiled compiles the module under a name matching the file name.
+                    # Write to a private directory first, as other processes may be loading it
+                    temporary_directory = os.path.join(
+                        os.path.dirname(module_path), f"tmp_{os.getpid()}"
+                    )
+                    os.makedirs(temporary_directory, exist_ok=True)
+                    temporary_path = os.path.join(temporary_directory, os.path.basename(module_path))
+                    self.dde.save_compiled(temporary_path, overwrite=True)
+                    os.replace(temporary_path, module_path)
+        # setuptools reports build failures, including a missing compiler, as SystemExit
+        except (SystemExit, BaseError, CCompilerError):
+            return False
+        finally:
+            if temporary_directory is not None:
+                shutil.rmtree(temporary_directory, ignore_errors=True)
+        return True
 
     def sample_next(self, time:int, samples:Tensor, errors:Tensor)->float:
         """Samples next point based on history of samples and errors
@@ -96,15 +322,36 @@ class MackeyGlass(BaseSignal):
             sampled signal for time t
 
         """
+        if self.backend == "torch":
+            return float(self._sample_torch(torch.tensor([float(time)]))[0])
         return self.dde.integrate(self.burn_in + time)
 
-    def sample_vectorized(self, time_vector:Tensor)->Tensor:
+    def _sample_torch(self, time_vector:Tensor)->Tensor:
+        """Samples with the torch backend, continuing the integration when possible.
+
+        If the times go back further than the integrator's history, the integration
+        restarts from the state after burn-in.
+        """
+        times = self.burn_in + as_time_tensor(time_vector, torch.float64).reshape(-1)
+        if times.numel() > 0:
+            history_start = self._integrator.time - self._integrator.delay_steps * self._integrator.step
+            if float(times.min()) < history_start:
+                self._integrator = self._burned_in.copy()
+        return self._integrator.sample(times)[0]
+
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
         """Samples for all time points in input
 
         Parameters
         ----------
         time_vector : array like
             all time stamps to be sampled
+        batch_size : int (default None)
+            Number of series to return. The DDE is deterministic, so all rows are equal
+        out : tensor (default None)
+            tensor of shape (T,) or (batch_size, T) to write the samples to
 
         Returns
         -------
@@ -112,7 +359,22 @@ class MackeyGlass(BaseSignal):
             samples for times provided in time_vector
 
         """
-        samples = []
-        for t in time_vector:
-            samples.append(self.dde.integrate(self.burn_in + t))
-        return torch.tensor(samples).reshape(-1,)
+        if self.backend == "torch":
+            samples = self._sample_torch(time_vector)
+        else:
+            samples = []
+            for t in time_vector:
+                samples.append(self.dde.integrate(self.burn_in + float(t)))
+            samples = torch.tensor(np.array(samples)).reshape(-1,)
+        if out is not None:
+            # Broadcasts over the rows of a batch
+            return out.copy_(samples)
+        if batch_size is not None:
+            samples = samples.repeat(batch_size, 1)
+        return self._output(samples)
+
+
+def _sample_sweep_point(job)->Tensor:
+    """Samples one parameter combination of `MackeyGlass.sweep`."""
+    cls, parameters, time_vector = job
+    return cls(control_parameters=True, **parameters).sample_vectorized(time_vector)
@@ -0,0 +1,259 @@
+__all__ = []
+import math
+import numpy as np
+import torch
+from torch import Tensor
+from typing import Callable, List, Optional, Sequence, Union
+
+_compiled_steps: Optional[Callable] = None
+
+
+def _hermite(x0:Tensor, x1:Tensor, f0:Tensor, f1:Tensor, step:float, s:Tensor)->Tensor:
+    """Cubic Hermite interpolation at fractions s of an interval with values x and slopes f."""
+    s2 = s * s
+    s3 = s2 * s
+    return (
+        (2 * s3 - 3 * s2 + 1) * x0
+        + (s3 - 2 * s2 + s) * step * f0
+        + (-2 * s3 + 3 * s2) * x1
+        + (s3 - s2) * step * f1
+    )
+
+
+def _hermite_derivative(x0:Tensor, x1:Tensor, f0:Tensor, f1:Tensor, step:float, s:Tensor)->Tensor:
+    """Time derivative of `_hermite`."""
+    s2 = s * s
+    return (
+        (6 * s2 - 6 * s) * x0 / step
+        + (3 * s2 - 4 * s + 1) * f0
+        + (-6 * s2 + 6 * s) * x1 / step
+        + (3 * s2 - 2 * s) * f1
+    )
+
+
+def _rk4_steps(
+    values:np.ndarray, derivatives:np.ndarray, pointer:int, n_steps:int, dt:float, n:np.ndarray,
+        beta:np.ndarray, gamma:np.ndarray, new_values:np.ndarray, new_derivatives:np.ndarray, record:bool
+)->int:
+    """RK4 steps of `MackeyGlassIntegrator` over ring buffers of shape (B, size), in place.
+
+    Written with scalar loops for numba. If record, the new states and derivatives of each
+    step are also written to new_values and new_derivatives, of shape (B, n_steps). Returns
+    the position of the current state in the ring buffers.
+    """
+    size = values.shape[1]
+    for k in range(n_steps):
+        oldest = (pointer + 1) % size
+        second = (pointer + 2) % size
+        for b in range(values.shape[0]):
+            x = values[b, pointer]
+            delayed_start = values[b, oldest]
+            delayed_end = values[b, second]
+            delayed_middle = 0.5 * (delayed_start + delayed_end) + dt / 8 * (
+                derivatives[b, oldest] - derivatives[b, second]
+            )
+            feedback_start = beta[b] * delayed_start / (1.0 + delayed_start ** n[b])
+            feedback_middle = beta[b] * delayed_middle / (1.0 + delayed_middle ** n[b])
+            feedback_end = beta[b] * delayed_end / (1.0 + delayed_end ** n[b])
+            k1 = feedback_start - gamma[b] * x
+            k2 = feedback_middle - gamma[b] * (x + 0.5 * dt * k1)
+            k3 = feedback_middle - gamma[b] * (x + 0.5 * dt * k2)
+            k4 = feedback_end - gamma[b] * (x + dt * k3)
+            new = x + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+            values[b, oldest] = new
+            derivatives[b, oldest] = feedback_end - gamma[b] * new
+            if record:
+                new_values[b, k] = new
+                new_derivatives[b, k] = derivatives[b, oldest]
+        pointer = oldest
+    return pointer
+
+
+def _compiled_rk4_steps()->Optional[Callable]:
+    """`_rk4_steps` compiled with numba, or None if numba is not installed."""
+    global _compiled_steps
+    if _compiled_steps is None:
+        try:
+            import numba
+        except ImportError:
+            _compiled_steps = False
+        else:
+            _compiled_steps = numba.njit(cache=True)(_rk4_steps)
+    return _compiled_steps or None
+
+
+class MackeyGlassIntegrator:
+    """Batched fixed-step RK4 integrator for the Mackey-Glass DDE, written in torch.
+
+    Integrates B trajectories at once, each with its own parameters and initial past.
+    The step divides the delay, so the delayed states of a step are the oldest two entries
+    of a ring buffer holding the last tau of states and derivatives; the delayed state at
+    the midpoint of a step is obtained by Hermite interpolation between them.
+
+    Parameters
+    ----------
+    tau : float
+        The delay, shared by all trajectories
+    n, beta, gamma : float or tensor of shape (B,)
+        Parameters of each trajectory
+    initial_condition : list of (time, value, derivative), or list of such lists
+        Anchors of a cubic Hermite spline defining the past of all trajectories, or of
+        each trajectory. The integration starts at the time of the last anchor, which must
+        be the same for all trajectories
+    step : float (default 0.05)
+        Maximum integration step. The actual step divides tau
+
+    With numba installed, the steps run in a compiled loop, at about a microsecond per step
+    and trajectory. Otherwise every step is a dozen tensor operations over the batch, about
+    0.2 ms whatever the batch size, which only pays off for large batches.
+
+    """
+
+    def __init__(
+        self, tau:float,
+            n:Union[float, Tensor],
+            beta:Union[float, Tensor],
+            gamma:Union[float, Tensor],
+            initial_condition:List,
+            step:float=0.05
+    ):
+        if not isinstance(initial_condition[0][0], (list, tuple)):
+            initial_condition = [initial_condition]
+        self.n, self.beta, self.gamma = [
+            torch.as_tensor(parameter, dtype=torch.float64).reshape(-1) for parameter in (n, beta, gamma)
+        ]
+        self.batch_size = max(len(initial_condition), *[p.shape[0] for p in (self.n, self.beta, self.gamma)])
+        self.delay_steps = max(1, math.ceil(tau / step))
+        self.step = tau / self.delay_steps
+
+        start_times = {float(sorted(anchors)[-1][0]) for anchors in initial_condition}
+        if len(start_times) > 1:
+            raise ValueError("All initial conditions must end at the same time")
+        self.time = start_times.pop()
+
+        # Ring buffer of the last tau of states and derivatives, oldest first at position pointer + 1
+        node_times = self.time - tau + self.step * torch.arange(self.delay_steps + 1, dtype=torch.float64)
+        past = [self._evaluate_past(sorted(anchors), node_times) for anchors in initial_condition]
+        self.values = torch.stack([values for values, _ in past]).expand(self.batch_size, -1).clone()
+        self.derivatives = torch.stack([derivatives for _, derivatives in past]).expand(self.batch_size, -1).clone()
+        self.pointer = self.delay_steps
+
+    @staticmethod
+    def _evaluate_past(anchors:Sequence, times:Tensor):
+        """Values and derivatives of the Hermite spline through anchors, extrapolated at its ends."""
+        anchor_times = torch.tensor([float(anchor[0]) for anchor in anchors], dtype=torch.float64)
+        anchor_values = torch.tensor([float(anchor[1]) for anchor in anchors], dtype=torch.float64)
+        anchor_slopes = torch.tensor([float(anchor[2]) for anchor in anchors], dtype=torch.float64)
+        segment = (torch.searchsorted(anchor_times, times, right=True) - 1).clamp(0, len(anchors) - 2)
+        lengths = anchor_times[segment + 1] - anchor_times[segment]
+        s = (times - anchor_times[segment]) / lengths
+        arguments = (
+            anchor_values[segment], anchor_values[segment + 1],
+            anchor_slopes[segment], anchor_slopes[segment + 1],
+        )
+        return _hermite(*arguments, lengths, s), _hermite_derivative(*arguments, lengths, s)
+
+    def _rhs(self, x:Tensor, delayed:Tensor)->Tensor:
+        return self.beta * delayed / (1.0 + delayed ** self.n) - self.gamma * x
+
+    def _step(self):
+        """Advances all trajectories by one RK4 step."""
+        size = self.delay_steps + 1
+        current, oldest, second = self.pointer, (self.pointer + 1) % size, (self.pointer + 2) % size
+        dt = self.step
+        x = self.values[:, current]
+        delayed_start = self.values[:, oldest]
+        delayed_end = self.values[:, second]
+        delayed_middle = 0.5 * (delayed_start + delayed_end) + dt / 8 * (
+            self.derivatives[:, oldest] - self.derivatives[:, second]
+        )
+
+        k1 = self._rhs(x, delayed_start)
+        k2 = self._rhs(x + 0.5 * dt * k1, delayed_middle)
+        k3 = self._rhs(x + 0.5 * dt * k2, delayed_middle)
+        k4 = self._rhs(x + dt * k3, delayed_end)
+        new = x + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+        # The new state overwrites the oldest one, which is no longer needed
+        self.values[:, oldest] = new
+        self.derivatives[:, oldest] = self._rhs(new, delayed_end)
+        self.pointer = oldest
+        self.time += dt
+
+    def _advance(self, n_steps:int, record:bool=False):
+        """Advances all trajectories by n_steps steps.
+
+        If record, returns the states and derivatives after each step, of shape (B, n_steps).
+        """
+        compiled = _compiled_rk4_steps()
+        if compiled is None:
+            new_values, new_derivatives = [], []
+            for _ in range(n_steps):
+                self._step()
+                if record:
+                    new_values.append(self.values[:, self.pointer, None].clone())
+                    new_derivatives.append(self.derivatives[:, self.pointer, None].clone())
+            if record:
+                empty = self.values.new_empty(self.batch_size, 0)
+                return torch.cat([empty] + new_values, dim=1), torch.cat([empty] + new_derivatives, dim=1)
+            return None
+
+        shape = (self.batch_size, n_steps if record else 0)
+        new_values = np.empty(shape, dtype=np.float64)
+        new_derivatives = np.empty(shape, dtype=np.float64)
+        parameters = [
+            np.ascontiguousarray(np.broadcast_to(parameter.numpy(), (self.batch_size,)))
+            for parameter in (self.n, self.beta, self.gamma)
+        ]
+        self.pointer = compiled(
+            self.values.numpy(), self.derivatives.numpy(), self.pointer, n_steps, self.step,
+            *parameters, new_values, new_derivatives, record,
+        )
+        # Accumulated like the steps of the torch loop, so both paths share their time grid
+        for _ in range(n_steps):
+            self.time += self.step
+        if record:
+            return torch.from_numpy(new_values), torch.from_numpy(new_derivatives)
+        return None
+
+    def integrate(self, target_time:float):
+        """Advances all trajectories to the last step at or before target_time."""
+        self._advance(int(math.floor((target_time - self.time) / self.step + 1e-9)))
+
+    def sample(self, times:Tensor)->Tensor:
+        """Values of all trajectories at the given times, of shape (B, T).
+
+        Times may go back up to tau before the current time. The trajectories are integrated
+        up to the last of the times, and interpolated with cubic Hermite splines.
+        """
+        times = torch.as_tensor(times, dtype=torch.float64).reshape(-1)
+        origin = self.time - self.delay_steps * self.step
+        if times.numel() == 0:
+            return torch.empty(self.batch_size, 0, dtype=torch.float64)
+        if float(times.min()) < origin - 1e-9:
+            raise ValueError("Cannot sample more than tau before the current time")
+
+        shift = -(self.pointer + 1)
+        node_values = [torch.roll(self.values, shift, dims=1)]
+        node_derivatives = [torch.roll(self.derivatives, shift, dims=1)]
+        n_steps = max(0, math.ceil((float(times.max()) - self.time) / self.step - 1e-9))
+        new_values, new_derivatives = self._advance(n_steps, record=True)
+        node_values = torch.cat(node_values + [new_values], dim=1)
+        node_derivatives = torch.cat(node_derivatives + [new_derivatives], dim=1)
+
+        position = (times - origin) / self.step
+        index = position.floor().long().clamp(0, node_values.shape[1] - 2)
+        s = position - index
+        return _hermite(
+            node_values[:, index], node_values[:, index + 1],
+            node_derivatives[:, index], node_derivatives[:, index + 1],
+            self.step, s,
+        )
+
+    def copy(self)->"MackeyGlassIntegrator":
+        """Independent copy of the integrator and its current state."""
+        other = object.__new__(MackeyGlassIntegrator)
+        other.__dict__.update(self.__dict__)
+        other.values = self.values.clone()
+        other.derivatives = self.derivatives.clone()
+        return other
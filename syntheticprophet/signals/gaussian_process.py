@@ -1,11 +1,73 @@
-import numpy as np
-import scipy.special
+import hashlib
+import math
+import warnings
+from collections import OrderedDict
 from torch import Tensor
 import torch
+from typing import Optional, Tuple
 from .base_signal import BaseSignal
+from ..grid import as_column, grid_shape
+from ..rng import make_generator, standard_gamma
+from ..timesampler.time_index import RegularTimeIndex, as_time_tensor
 
 __all__ = ["GaussianProcess"]
 
+# Maximum bytes of Cholesky factors kept in memory, shared by all GaussianProcess instances.
+# A factor larger than this is not cached
+CHOLESKY_CACHE_BYTES = 256 * 2 ** 20
+
+_cholesky_cache: "OrderedDict[Tuple, Tensor]" = OrderedDict()
+
+# Kernels that only depend on the distance between timestamps
+STATIONARY_KERNELS = ("SE", "Exponential", "RQ", "Matern", "Periodic")
+
+
+def clear_cholesky_cache():
+    """Drops all cached Cholesky factors."""
+    _cholesky_cache.clear()
+
+
+def _tensor_bytes(value:Tensor)->int:
+    return value.nelement() * value.element_size()
+
+
+def _cache_cholesky_factor(key:Tuple, factor:Tensor):
+    """Adds a factor to the cache, evicting the least recently used ones beyond
+    CHOLESKY_CACHE_BYTES."""
+    if _tensor_bytes(factor) > CHOLESKY_CACHE_BYTES:
+        return
+    _cholesky_cache[key] = factor
+    total = sum(_tensor_bytes(value) for value in _cholesky_cache.values())
+    while total > CHOLESKY_CACHE_BYTES:
+        _, evicted = _cholesky_cache.popitem(last=False)
+        total -= _tensor_bytes(evicted)
+
+
+def _matern(distance:Tensor, lengthscale:float, nu:float)->Tensor:
+    """Matern correlation for a tensor of absolute distances.
+
+    Half-integer orders use their closed form; other orders fall back to the modified
+    Bessel function of scipy, evaluated on the whole distance tensor at once.
+    """
+    if nu == 0.5:
+        return torch.exp(-distance / lengthscale)
+    if nu == 1.5:
+        scaled = math.sqrt(3) * distance / lengthscale
+        return (1 + scaled) * torch.exp(-scaled)
+    if nu == 2.5:
+        scaled = math.sqrt(5) * distance / lengthscale
+        return (1 + scaled + torch.square(scaled) / 3) * torch.exp(-scaled)
+
+    import numpy as np
+    import scipy.special
+
+    scaled = (math.sqrt(2 * nu) * distance / lengthscale).numpy()
+    with np.errstate(invalid="ignore"):  # 0 * inf at zero distance, replaced below
+        correlation = torch.from_numpy(
+            (2 ** (1 - nu) / scipy.special.gamma(nu)) * scaled ** nu * scipy.special.kv(nu, scaled)
+        ).to(distance.dtype)
+    return torch.where(distance == 0, torch.ones_like(correlation), correlation)
+
 
 class GaussianProcess(BaseSignal):
     """Gaussian Process time series sampler
@@ -29,8 +91,41 @@ class GaussianProcess(BaseSignal):
         the mean of the gaussian process
     variance : float
         the output variance of the gaussian process (sigma^2)
-    lengthscale : float
-            the characteristic lengthscale used to generate the covariance matrix
+    lengthscale : float or tensor
+            the characteristic lengthscale used to generate the covariance matrix. A tensor
+            of shape (P,) is a grid of P lengthscales: `sample_vectorized` then draws one
+            independent series per lengthscale at once, of shape (P, T), or
+            (batch_size, P, T) for a batch. Grids are sampled by the dense, circulant and
+            random Fourier feature paths, not in state-space form
+    method : {'auto', 'dense', 'circulant', 'statespace'}
+        how to draw samples:
+
+        - `dense`. Cholesky factorization of the full covariance matrix, O(n^3) time and O(n^2) memory
+        - `circulant`. Circulant embedding with FFT, O(n log n) time and O(n) memory.
+          Requires a stationary kernel and a regular time grid
+        - `statespace`. Exact stochastic differential equation form of the process, O(n) time on
+          any time vector. Requires a `Matern` kernel with nu in {1/2, 3/2, 5/2}, or an
+          `Exponential` kernel with gamma=1
+        - `auto`. Use `circulant` when possible, then `statespace`, and `dense` otherwise
+
+        If the circulant embedding is not positive semi-definite, the dense path is used.
+        Kernels with a state-space form also support `sample_next`, with constant memory.
+    approximation : {None, 'rff'} (default None)
+        If 'rff', samples are drawn from a random Fourier feature expansion of the kernel,
+        regardless of `method`. This works for the stationary kernels on any time vector,
+        in O(n * n_features) time and O(n + n_features) memory.
+    n_features : int (default 1000)
+        Number of random Fourier features. This is the accuracy/speed knob of the `rff`
+        approximation: cost grows linearly with it, while the error of the implied
+        covariance shrinks as variance * sqrt(2 / n_features).
+    seed : int (default None)
+        Seed of the generator's own random number generator. If neither seed nor generator
+        is given, torch's global generator is used
+    generator : torch.Generator (default None)
+        Random number generator to draw from. Takes precedence over seed
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to torch's default dtype. Samples are always
+        computed in float64
 
     References
     ----------
@@ -39,6 +134,8 @@ class GaussianProcess(BaseSignal):
 
     """
 
+    requires_history = False
+
     def __init__(
         self,
         kernel:str="SE",
@@ -51,37 +148,344 @@ class GaussianProcess(BaseSignal):
         offset:float=0.0,
         nu:float=5.0 / 2,
         p:float=1.0,
+        method:str="auto",
+        approximation:Optional[str]=None,
+        n_features:int=1000,
+        seed:Optional[int]=None,
+        generator:Optional[torch.Generator]=None,
+        dtype:Optional[torch.dtype]=None,
     ):
+        if method not in ("auto", "dense", "circulant", "statespace"):
+            raise ValueError(f"Unknown sampling method {method}")
+        if approximation not in (None, "rff"):
+            raise ValueError(f"Unknown approximation {approximation}")
+        if approximation == "rff" and kernel not in STATIONARY_KERNELS:
+            raise ValueError(f"Random Fourier features require a stationary kernel, got {kernel}")
+        self.grid = grid_shape(lengthscale)
+        if method == "statespace" and self.grid:
+            raise ValueError("Lengthscale grids cannot be sampled in state-space form")
         self.vectorizable = True
+        self.generator = make_generator(seed, generator)
+        self.dtype = dtype
+        self.method = method
+        self.approximation = approximation
+        self.n_features = n_features
         self.lengthscale = lengthscale
         self.mean = mean
         self.variance = variance
         self.kernel = kernel
-        #TODO: Refactor to pytorch
+        self.c = c
+        self.gamma = gamma
+        self.alpha = alpha
+        self.offset = offset
+        self.nu = nu
+        self.p = p
+        if self.grid:
+            # Covariances of shape (*grid, n, m) for timestamps of shapes (n, 1) and (1, m)
+            lengthscale = torch.as_tensor(lengthscale, dtype=torch.float64)[..., None, None]
+        # Kernels broadcast over tensors of timestamps, e.g. x1[:, None] and x2[None, :]
         self.kernel_function = {
-            "Constant": lambda x1, x2: variance,
+            "Constant": lambda x1, x2: variance * torch.ones_like(x1 - x2),
             "Exponential": lambda x1, x2: variance
-            * np.exp(-np.power(np.abs(x1 - x2) / lengthscale, gamma)),
+            * torch.exp(-torch.pow(torch.abs(x1 - x2) / lengthscale, gamma)),
             "SE": lambda x1, x2: variance
-            * np.exp(-np.square(x1 - x2) / (2 * np.square(lengthscale))),
+            * torch.exp(-torch.square(x1 - x2) / (2 * lengthscale ** 2)),
             "RQ": lambda x1, x2: variance
-            * np.power(
-                (1 + np.square(x1 - x2) / (2 * alpha * np.square(lengthscale))), -alpha
+            * torch.pow(
+                (1 + torch.square(x1 - x2) / (2 * alpha * lengthscale ** 2)), -alpha
             ),
             "Linear": lambda x1, x2: variance * (x1 - c) * (x2 - c) + offset,
             "Matern": lambda x1, x2: variance
-            if x1 - x2 == 0.0
-            else variance
-            * (np.power(2, 1 - nu) / scipy.special.gamma(nu))
-            * np.power(np.sqrt(2 * nu) * np.abs(x1 - x2) / lengthscale, nu)
-            * scipy.special.kv(nu, np.sqrt(2 * nu) * np.abs(x1 - x2) / lengthscale),
+            * _matern(torch.abs(x1 - x2), lengthscale, nu),
             "Periodic": lambda x1, x2: variance
-            * np.exp(-2 * np.square(np.sin(np.pi * np.abs(x1 - x2) / p))),
+            * torch.exp(-2 * torch.square(torch.sin(math.pi * torch.abs(x1 - x2) / p))),
         }[kernel]
 
+        self.state_space_model = self._state_space_model()
+        if method == "statespace" and self.state_space_model is None:
+            raise ValueError(f"Kernel {kernel} has no state-space form for these parameters")
+        self.previous_state: Optional[Tensor] = None
+        self.previous_time = None
+
+    def _kernel_parameters(self)->Tuple:
+        """Hashable description of the covariance function, used as cache key."""
+        lengthscale = self.lengthscale
+        if self.grid:
+            lengthscale = (self.grid, tuple(torch.as_tensor(lengthscale).reshape(-1).tolist()))
+        return (
+            self.kernel, lengthscale, self.variance, self.c, self.gamma,
+            self.alpha, self.offset, self.nu, self.p,
+        )
+
+    def covariance_matrix(self, time_vector:Tensor)->Tensor:
+        """Dense covariance matrix of the process over the given timestamps, in float64.
+
+        For a lengthscale grid, one matrix per lengthscale, of shape (*grid, T, T).
+        """
+        time_vector = as_time_tensor(time_vector, torch.float64).reshape(-1)
+        return self.kernel_function(time_vector[:, None], time_vector[None, :])
+
+    def cholesky_factor(self, time_vector:Tensor)->Tensor:
+        """Lower Cholesky factor of the covariance matrix over the given timestamps.
+
+        Factors are kept in a least-recently-used cache keyed by the kernel parameters and
+        the time grid, so that repeated draws on the same grid skip the factorization. The
+        cache holds at most CHOLESKY_CACHE_BYTES of factors.
+        A growing jitter is added to the diagonal until the factorization succeeds.
+        """
+        time_vector = as_time_tensor(time_vector, torch.float64).reshape(-1)
+        key = (
+            self._kernel_parameters(),
+            time_vector.shape[0],
+            hashlib.sha1(time_vector.numpy().tobytes()).hexdigest(),
+        )
+        if key in _cholesky_cache:
+            _cholesky_cache.move_to_end(key)
+            return _cholesky_cache[key]
+
+        covariance_matrix = self.covariance_matrix(time_vector)
+        scale = float(covariance_matrix.diagonal(dim1=-2, dim2=-1).abs().max().clamp(min=1.0))
+        jitter = 1e-12 * scale
+        eye = torch.eye(time_vector.shape[0], dtype=torch.float64)
+        while True:
+            factor, info = torch.linalg.cholesky_ex(covariance_matrix + jitter * eye)
+            if not bool(info.any()):
+                break
+            if jitter > 1e-2 * scale:
+                raise ValueError("Covariance matrix is not positive definite")
+            jitter *= 10
+
+        _cache_cholesky_factor(key, factor)
+        return factor
+
+    def _regular_step(self, time_vector:Tensor)->Optional[float]:
+        """Step of the time grid if it is regular, None otherwise.
+
+        The tolerance accounts for the rounding of float32 grids such as the ones
+        produced by `torch.linspace`. The step of a RegularTimeIndex is used as is.
+        """
+        if len(time_vector) < 3:
+            return None
+        if isinstance(time_vector, RegularTimeIndex):
+            return float(time_vector.step) if time_vector.step > 0 else None
+        if not time_vector.is_floating_point():
+            time_vector = time_vector.to(torch.float64)
+        diffs = time_vector[1:] - time_vector[:-1]
+        step = float(time_vector[-1] - time_vector[0]) / (time_vector.shape[0] - 1)
+        if step <= 0:
+            return None
+        rounding = 4 * torch.finfo(time_vector.dtype).eps * float(time_vector.abs().max())
+        if float((diffs - step).abs().max()) > max(1e-6 * step, rounding):
+            return None
+        return step
+
+    def _circulant_eigenvalues(self, n_points:int, step:float, max_doublings:int=3)->Optional[Tensor]:
+        """Eigenvalues of the smallest positive semi-definite circulant embedding.
+
+        The first row of the embedding holds the covariances at lags 0, ..., m/2 followed
+        by their mirror image. If negative eigenvalues remain after padding the
+        embedding `max_doublings` times, None is returned.
+        """
+        half = n_points - 1
+        for _ in range(max_doublings + 1):
+            lags = torch.arange(half + 1, dtype=torch.float64) * step
+            covariances = self.kernel_function(lags, torch.zeros_like(lags)).reshape(-1, len(lags))
+            # Kernels that ignore the lengthscale, e.g. Periodic, give one row for all grid points
+            covariances = covariances.expand(math.prod(self.grid), -1).reshape(self.grid + (-1,))
+            row = torch.cat((covariances, covariances[..., 1:-1].flip(-1)), dim=-1)
+            eigenvalues = torch.fft.fft(row).real
+            if float(eigenvalues.min()) >= -1e-8 * float(eigenvalues.abs().max()):
+                return eigenvalues.clamp(min=0.0)
+            half *= 2
+        return None
+
+    def _sample_circulant(self, eigenvalues:Tensor, n_points:int, n_series:int)->Tensor:
+        """Draws n_series samples of length n_points from a circulant embedding.
+
+        Each complex FFT yields two independent real samples, its real and imaginary parts.
+        For a lengthscale grid, eigenvalues of shape (*grid, m) give samples of shape
+        (n_series, *grid, n_points).
+        """
+        size = eigenvalues.shape[-1]
+        n_draws = (n_series + 1) // 2
+        noise = torch.complex(
+            torch.randn(n_draws, *eigenvalues.shape, dtype=torch.float64, generator=self.generator),
+            torch.randn(n_draws, *eigenvalues.shape, dtype=torch.float64, generator=self.generator),
+        )
+        transformed = torch.fft.fft(torch.sqrt(eigenvalues / size) * noise)[..., :n_points]
+        samples = torch.cat((transformed.real, transformed.imag))[:n_series]
+        return self.mean + samples
+
+    def _state_space_model(self)->Optional[Tuple[Tensor, Tensor]]:
+        """Feedback matrix F and stationary state covariance of the kernel's SDE form.
+
+        The process is the first component of a state x with dx = F x dt + L dW.
+        Returns None if the kernel has no exact state-space form, or the lengthscale is a grid.
+        """
+        if self.grid:
+            return None
+        if self.kernel == "Exponential" and self.gamma == 1:
+            nu = 0.5
+        elif self.kernel == "Matern" and self.nu in (0.5, 1.5, 2.5):
+            nu = self.nu
+        else:
+            return None
+
+        lam = math.sqrt(2 * nu) / self.lengthscale
+        variance = self.variance
+        if nu == 0.5:
+            feedback = [[-lam]]
+            stationary_covariance = [[variance]]
+        elif nu == 1.5:
+            feedback = [[0.0, 1.0], [-lam ** 2, -2 * lam]]
+            stationary_covariance = [[variance, 0.0], [0.0, variance * lam ** 2]]
+        else:
+            kappa = variance * lam ** 2 / 3
+            feedback = [[0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [-lam ** 3, -3 * lam ** 2, -3 * lam]]
+            stationary_covariance = [
+                [variance, 0.0, -kappa],
+                [0.0, kappa, 0.0],
+                [-kappa, 0.0, variance * lam ** 4],
+            ]
+        return (
+            torch.tensor(feedback, dtype=torch.float64),
+            torch.tensor(stationary_covariance, dtype=torch.float64),
+        )
+
+    def _state_space_transitions(self, time_diffs:Tensor)->Tuple[Tensor, Tensor]:
+        """Transition matrices and Cholesky factors of the process noise for each time step."""
+        feedback, stationary_covariance = self.state_space_model
+        transitions = torch.linalg.matrix_exp(feedback * time_diffs[:, None, None])
+        process_covariance = stationary_covariance - transitions @ stationary_covariance @ transitions.transpose(1, 2)
+        jitter = 1e-12 * self.variance * torch.eye(feedback.shape[0], dtype=torch.float64)
+        process_factor, _ = torch.linalg.cholesky_ex(process_covariance + jitter)
+        return transitions, process_factor.nan_to_num()
+
+    def _sample_state_space(
+        self, time_vector:Tensor, n_series:int, initial_state:Optional[Tensor]=None,
+            initial_time:Optional[float]=None
+    )->Tuple[Tensor, Tensor]:
+        """Draws n_series samples in O(n) time by iterating the discretized SDE.
+
+        If an initial state is given, the series continues from it, otherwise it starts from
+        the stationary distribution. Returns the samples and the state at the last timestamp.
+        """
+        time_vector = as_time_tensor(time_vector, torch.float64).reshape(-1)
+        order = torch.argsort(time_vector)
+        sorted_time = time_vector[order]
+        feedback, stationary_covariance = self.state_space_model
+        dimension = feedback.shape[0]
+
+        if initial_state is None:
+            time_diffs = sorted_time[1:] - sorted_time[:-1]
+            transitions, process_factor = self._state_space_transitions(time_diffs)
+            stationary_factor = torch.linalg.cholesky(stationary_covariance)
+            transitions = torch.cat((torch.zeros(1, dimension, dimension, dtype=torch.float64), transitions))
+            process_factor = torch.cat((stationary_factor[None], process_factor))
+            state = torch.zeros(n_series, dimension, dtype=torch.float64)
+        else:
+            time_diffs = sorted_time - torch.cat((torch.tensor([initial_time], dtype=torch.float64), sorted_time[:-1]))
+            transitions, process_factor = self._state_space_transitions(time_diffs)
+            state = initial_state.expand(n_series, dimension)
+
+        # Pre-compute all innovations at once, only the recursion itself is sequential
+        innovations = torch.einsum(
+            "kij,bkj->kbi",
+            process_factor,
+            torch.randn(
+                n_series, sorted_time.shape[0], dimension, dtype=torch.float64, generator=self.generator
+            ),
+        )
+        samples = torch.empty(sorted_time.shape[0], n_series, dtype=torch.float64)
+        for k in range(sorted_time.shape[0]):
+            state = state @ transitions[k].T + innovations[k]
+            samples[k] = state[:, 0]
+
+        unsorted = torch.empty_like(samples)
+        unsorted[order] = samples
+        return self.mean + unsorted.T, state
+
+    def _spectral_frequencies(self, n_features:int)->Tensor:
+        """Draws angular frequencies from the normalized spectral density of the kernel.
+
+        For a lengthscale grid, the frequencies of each lengthscale are drawn independently,
+        with shape (*grid, n_features).
+        """
+        lengthscale = as_column(self.lengthscale, torch.float64)
+        size = self.grid + (n_features,)
+        if self.kernel == "SE":
+            return torch.randn(size, dtype=torch.float64, generator=self.generator) / lengthscale
+        if self.kernel == "Matern":
+            # Student-t with 2 * nu degrees of freedom
+            chi2 = 2 * standard_gamma(self.nu, size, self.generator)
+            scale = torch.sqrt(2 * self.nu / chi2)
+            return torch.randn(size, dtype=torch.float64, generator=self.generator) * scale / lengthscale
+        if self.kernel == "RQ":
+            # Scale mixture of squared exponentials with Gamma distributed precision
+            precision = standard_gamma(self.alpha, size, self.generator) / (
+                self.alpha * lengthscale ** 2
+            )
+            return torch.randn(size, dtype=torch.float64, generator=self.generator) * torch.sqrt(precision)
+        if self.kernel == "Exponential":
+            # Symmetric alpha-stable with alpha = gamma, by the Chambers-Mallows-Stuck method
+            stability = self.gamma
+            angle = (torch.rand(size, dtype=torch.float64, generator=self.generator) - 0.5) * math.pi
+            if stability == 1:
+                return torch.tan(angle) / lengthscale
+            exponential = -torch.log1p(
+                -torch.rand(size, dtype=torch.float64, generator=self.generator)
+            )
+            stable = (
+                torch.sin(stability * angle) / torch.cos(angle) ** (1 / stability)
+                * (torch.cos(angle - stability * angle) / exponential) ** ((1 - stability) / stability)
+            )
+            return stable / lengthscale
+
+        # Periodic: exp(-2 sin^2(pi r / p)) = sum_k I_k(1) / e * cos(2 pi k r / p)
+        import scipy.special
+
+        harmonics = torch.arange(50, dtype=torch.float64)
+        weights = torch.from_numpy(scipy.special.iv(harmonics.numpy(), 1.0) / math.e)
+        weights[1:] *= 2
+        harmonic = torch.multinomial(
+            weights / weights.sum(), math.prod(size), replacement=True, generator=self.generator
+        ).reshape(size)
+        return 2 * math.pi * harmonics[harmonic] / self.p
+
+    def _sample_rff(self, time_vector:Tensor, n_series:int, chunk_elements:int=2 ** 22)->Tensor:
+        """Draws n_series samples from a random Fourier feature expansion of the kernel.
+
+        All series share one set of features, so the batch is a single matrix product per
+        chunk. Time is processed in chunks to keep memory at O(n + n_features), and a
+        RegularTimeIndex is only materialized one chunk at a time. For a lengthscale grid,
+        each lengthscale has its own features, and samples have shape (n_series, *grid, n).
+        """
+        if not isinstance(time_vector, RegularTimeIndex):
+            time_vector = torch.as_tensor(time_vector, dtype=torch.float64).reshape(-1)
+        n_points = len(time_vector)
+        n_features = self.n_features
+        frequencies = self._spectral_frequencies(n_features).expand(self.grid + (n_features,))
+        phases = 2 * math.pi * torch.rand(self.grid + (n_features,), dtype=torch.float64, generator=self.generator)
+        weights = math.sqrt(2 * self.variance / n_features) * torch.randn(
+            (n_series,) + self.grid + (n_features,), dtype=torch.float64, generator=self.generator
+        )
+        samples = torch.empty((n_series,) + self.grid + (n_points,), dtype=torch.float64)
+        chunk_size = max(1, chunk_elements // (n_features * math.prod(self.grid)))
+        for start in range(0, n_points, chunk_size):
+            chunk = as_time_tensor(time_vector[start : start + chunk_size], torch.float64)
+            features = torch.cos(chunk[:, None] * frequencies[..., None, :] + phases[..., None, :])
+            if self.grid:
+                samples[..., start : start + chunk_size] = (weights[..., None, :] @ features.mT)[..., 0, :]
+            else:
+                samples[:, start : start + chunk_size] = weights @ features.T
+        return self.mean + samples
+
     def sample_next(self, time:int, samples:Tensor, errors:Tensor)->float:
         """Sample a single time point
 
+        Only available for kernels with a state-space form. The process state is carried
+        between calls, so memory and time per call are constant.
+
         Parameters
         ----------
         time : number
@@ -93,36 +497,103 @@ class GaussianProcess(BaseSignal):
             sampled signal for time t
 
         """
-        raise NotImplementedError
+        if self.state_space_model is None:
+            raise NotImplementedError(f"Kernel {self.kernel} can only be sampled vectorized.")
+        time = float(time)
+        feedback, stationary_covariance = self.state_space_model
+        if self.previous_state is None:
+            state = torch.linalg.cholesky(stationary_covariance) @ torch.randn(
+                feedback.shape[0], dtype=torch.float64, generator=self.generator
+            )
+        else:
+            transitions, process_factor = self._state_space_transitions(
+                torch.tensor([time - self.previous_time], dtype=torch.float64)
+            )
+            state = transitions[0] @ self.previous_state + process_factor[0] @ torch.randn(
+                feedback.shape[0], dtype=torch.float64, generator=self.generator
+            )
+        self.previous_state = state
+        self.previous_time = time
+        return float(self.mean + state[0])
 
-    def sample_vectorized(self, time_vector:Tensor)->Tensor:
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
         """Sample entire series based off of time vector
 
         Parameters
         ----------
         time_vector : array-like
             Timestamps for signal generation
+        batch_size : int (default None)
+            Number of independent series to draw from the same covariance matrix
+        out : tensor (default None)
+            Tensor of shape (T,) or (batch_size, T), with the grid dimensions before T for a
+            lengthscale grid, to write the samples to
 
         Returns
         -------
         array-like
-            sampled signal for time vector
+            sampled signal for time vector, of shape (batch_size, T) if batch_size is given,
+            and (P, T) or (batch_size, P, T) for a grid of P lengthscales
 
         """
-        #TODO:Refactor to Pytorch
-        cartesian_time = np.dstack(np.meshgrid(time_vector, time_vector)).reshape(-1, 2)
-        covariance_matrix = (
-            np.vectorize(self.kernel_function)(
-                cartesian_time[:, 0], cartesian_time[:, 1]
+        if not isinstance(time_vector, RegularTimeIndex):
+            time_vector = torch.as_tensor(time_vector).reshape(-1)
+        n_points = len(time_vector)
+        n_series = 1 if batch_size is None else batch_size
+        samples = None
+        if self.approximation == "rff":
+            samples = self._sample_rff(time_vector, n_series)
+        elif self.method == "statespace":
+            samples = self._sample_state_space_continued(time_vector, batch_size)
+        if samples is None and self.method in ("auto", "circulant"):
+            step = self._regular_step(time_vector) if self.kernel in STATIONARY_KERNELS else None
+            if step is None:
+                if self.method == "circulant":
+                    raise ValueError(
+                        "Circulant sampling requires a stationary kernel and a regular time grid"
+                    )
+            else:
+                eigenvalues = self._circulant_eigenvalues(n_points, step)
+                if eigenvalues is not None:
+                    samples = self._sample_circulant(eigenvalues, n_points, n_series)
+                elif self.method == "circulant":
+                    warnings.warn(
+                        "Circulant embedding is not positive semi-definite, using dense sampling"
+                    )
+        if samples is None and self.method == "auto" and self.state_space_model is not None:
+            samples = self._sample_state_space_continued(time_vector, batch_size)
+
+        if samples is None:
+            factor = self.cholesky_factor(time_vector)
+            noise = torch.randn(
+                (n_series,) + self.grid + (n_points,), dtype=torch.float64, generator=self.generator
             )
-        ).reshape(-1, time_vector.shape[0])
-        covariance_matrix[
-            np.diag_indices_from(covariance_matrix)
-        ] += 1e-12  # Add small value to diagonal for numerical stability
+            if self.grid:
+                samples = self.mean + (noise[..., None, :] @ factor.mT)[..., 0, :]
+            else:
+                samples = self.mean + noise @ factor.T
+
+        samples = samples[0] if batch_size is None else samples
+        return self._output(samples, out, torch.get_default_dtype())
 
-        time_vector = torch.Tensor(np.random.multivariate_normal(
-            mean=np.full(shape=(time_vector.shape[0],), fill_value=self.mean),
-            cov=covariance_matrix,
-        ))
+    def _sample_state_space_continued(self, time_vector:Tensor, batch_size:Optional[int])->Tensor:
+        """State-space draw that continues the series left by previous calls.
 
-        return time_vector
+        A single series continues from the last sampled state when all its timestamps come
+        after the last sampled time, e.g. for consecutive chunks of a longer series.
+        Otherwise, and for batches, independent series are drawn.
+        """
+        if batch_size is not None:
+            return self._sample_state_space(time_vector, batch_size)[0]
+        time_vector = as_time_tensor(time_vector, torch.float64).reshape(-1)
+        if self.previous_state is not None and float(time_vector.min()) > self.previous_time:
+            samples, state = self._sample_state_space(
+                time_vector, 1, self.previous_state, self.previous_time
+            )
+        else:
+            samples, state = self._sample_state_space(time_vector, 1)
+        self.previous_state = state[0]
+        self.previous_time = float(time_vector.max())
+        return samples
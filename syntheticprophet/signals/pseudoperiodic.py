@@ -1,7 +1,10 @@
 import torch
 from torch import Tensor
-from typing import Callable
+from typing import Callable, Optional
 from .base_signal import BaseSignal
+from ..grid import as_column, grid_shape
+from ..rng import make_generator, normal
+from ..timesampler.time_index import RegularTimeIndex
 
 __all__ = ["PseudoPeriodic"]
 
@@ -14,27 +17,46 @@ class PseudoPeriodic(BaseSignal):
 
     Parameters
     ----------
-    amplitude : number (default 1.0)
+    amplitude : number or tensor (default 1.0)
         Amplitude of the harmonic series
-    frequency : number (default 1.0)
+    frequency : number or tensor (default 1.0)
         Frequency of the harmonic series
-    ampSD : number (default 0.1)
+    ampSD : number or tensor (default 0.1)
         Amplitude standard deviation
-    freqSD : number (default 0.1)
+    freqSD : number or tensor (default 0.1)
         Frequency standard deviation
     ftype : function(default np.sin)
         Harmonic function
+    seed : int (default None)
+        Seed of the generator's own random number generator. If neither seed nor generator
+        is given, torch's global generator is used
+    generator : torch.Generator (default None)
+        Random number generator to draw from. Takes precedence over seed
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to torch's default dtype
+
+    A parameter given as a tensor of shape (P,) is a grid of P values; grids of several
+    parameters broadcast against each other. `sample_vectorized` then draws one series per
+    grid point at once, of shape (P, T), or (batch_size, P, T) for a batch, and
+    `sample_next` returns one value per grid point.
 
     """
 
+    requires_history = False
+
     def __init__(
         self, amplitude:float=1.0,
             frequency:int=100,
             ampSD:float=0.1,
             freqSD:float=0.4,
-            ftype:Callable[[Tensor],Tensor]=torch.sin
+            ftype:Callable[[Tensor],Tensor]=torch.sin,
+            seed:Optional[int]=None,
+            generator:Optional[torch.Generator]=None,
+            dtype:Optional[torch.dtype]=None
     ):
         self.vectorizable = True
+        self.dtype = dtype
+        self.generator = make_generator(seed, generator)
         self.amplitude = amplitude
         self.frequency = frequency
         self.freqSD = freqSD
@@ -55,28 +77,44 @@ class PseudoPeriodic(BaseSignal):
             sampled signal for time t
 
         """
-        freq_val = torch.normal(mean=self.frequency, std=self.freqSD, size=(1,))
-        amplitude_val = torch.normal(mean=self.amplitude, std=self.ampSD, size=(1,))
+        grid = grid_shape(self.amplitude, self.frequency, self.ampSD, self.freqSD)
+        freq_val = normal(self.frequency, self.freqSD, grid or (1,), generator=self.generator)
+        amplitude_val = normal(self.amplitude, self.ampSD, grid or (1,), generator=self.generator)
+        if grid:
+            return amplitude_val * torch.sin(freq_val * time)
         return float(amplitude_val * torch.sin(freq_val * time))
 
-    def sample_vectorized(self, time_vector:Tensor)->Tensor:
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
         """Sample entire series based off of time vector
 
         Parameters
         ----------
         time_vector : array-like
             Timestamps for signal generation
+        batch_size : int (default None)
+            Number of independent series to draw
+        out : tensor (default None)
+            Tensor of shape (T,) or (batch_size, T) to write the samples to
 
         Returns
         -------
         array-like
-            sampled signal for time vector
+            sampled signal for time vector, of shape (batch_size, T) if batch_size is given
 
         """
         n_samples = len(time_vector)
-        freq_arr = torch.normal(
-            mean=self.frequency, std=self.freqSD, size=(n_samples,)
+        size = grid_shape(self.amplitude, self.frequency, self.ampSD, self.freqSD) + (n_samples,)
+        if batch_size is not None:
+            size = (batch_size,) + size
+        freq_arr = normal(
+            as_column(self.frequency), as_column(self.freqSD), size, generator=self.generator
         )
-        amp_arr = torch.normal(mean=self.amplitude, std=self.ampSD, size=(n_samples,))
+        amp_arr = normal(as_column(self.amplitude), as_column(self.ampSD), size, generator=self.generator)
+        if isinstance(time_vector, RegularTimeIndex):
+            # Timestamps and phases in float64, the signal in the default dtype
+            phases = torch.mul(freq_arr.double(), time_vector.materialize(torch.float64))
+            return self._output(torch.mul(amp_arr, self.ftype(phases).to(amp_arr.dtype)), out)
         signal = torch.mul(amp_arr, self.ftype(torch.mul(freq_arr, time_vector.clone().detach())))
-        return signal
+        return self._output(signal, out)
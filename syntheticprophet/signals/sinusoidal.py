@@ -1,8 +1,10 @@
 import numpy as np
 from .base_signal import BaseSignal
 from torch import Tensor
-from typing import Callable
+from typing import Callable, Optional
 import torch
+from ..grid import as_column, is_grid
+from ..timesampler.time_index import RegularTimeIndex
 
 
 __all__ = ["Sinusoidal"]
@@ -13,20 +15,31 @@ class Sinusoidal(BaseSignal):
 
     Parameters
     ----------
-    amplitude : number (default 1.0)
-        Amplitude of the harmonic series
-    frequency : number (default 1.0)
-        Frequency of the harmonic series
+    amplitude : number or tensor (default 1.0)
+        Amplitude of the harmonic series. A tensor of shape (P,) is a grid of P amplitudes
+    frequency : number or tensor (default 1.0)
+        Frequency of the harmonic series. A tensor of shape (P,) is a grid of P frequencies,
+        broadcast against a grid of amplitudes
     ftype : function (default np.sin)
         Harmonic function
+    dtype : torch dtype (default None)
+        Data type of the samples. Defaults to the dtype of the time vector
+
+    With parameter grids, `sample_vectorized` computes one series per grid point in a
+    single tensor operation, of shape (P, T), or (batch_size, P, T) for a batch, and
+    `sample_next` returns one value per grid point.
 
     """
 
+    requires_history = False
+
     def __init__(self,
                  amplitude:float=1.0,
                  frequency:float=1.0,
-                 ftype=torch.sin):
+                 ftype=torch.sin,
+                 dtype:Optional[torch.dtype]=None):
         super().__init__(vectorizable=True)
+        self.dtype = dtype
         self.amplitude:float = amplitude
         self.ftype:Callable[[Tensor],Tensor]= ftype
         self.frequency:float = frequency
@@ -45,26 +58,56 @@ class Sinusoidal(BaseSignal):
             sampled signal for time t
 
         """
-        return self.amplitude * self.ftype(2 * np.pi * self.frequency * time)
+        amplitude, frequency = self.amplitude, self.frequency
+        if is_grid(amplitude) or is_grid(frequency):
+            # One value per grid point
+            amplitude, frequency = torch.as_tensor(amplitude), torch.as_tensor(frequency)
+        return amplitude * self.ftype(2 * np.pi * frequency * time)
 
-    def sample_vectorized(self, time_vector:Tensor)->Tensor:
+    def sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int]=None, out:Optional[Tensor]=None
+    )->Tensor:
         """Sample entire series based off of time vector
 
         Parameters
         ----------
         time_vector : array-like
             Timestamps for signal generation
+        batch_size : int (default None)
+            Number of series to return. The signal is deterministic, so all rows are equal
+        out : tensor (default None)
+            Tensor of shape (T,) or (batch_size, T) to write the samples to
 
         Returns
         -------
         array-like
-            sampled signal for time vector
+            sampled signal for time vector, of shape (batch_size, T) if batch_size is given
 
         """
         if self.vectorizable is True:
-            signal = self.amplitude * self.ftype(
-                2 * np.pi * self.frequency * time_vector.clone().detach()
-            )
-            return signal
+            if isinstance(time_vector, RegularTimeIndex):
+                # Reduce the phase modulo one cycle in float64, so that large timestamps keep
+                # their precision in the default dtype
+                frequency = torch.as_tensor(as_column(self.frequency), dtype=torch.float64)
+                cycles = torch.remainder(
+                    torch.fmod(frequency * time_vector.start, 1.0)
+                    + torch.fmod(frequency * time_vector.step, 1.0)
+                    * torch.arange(len(time_vector), dtype=torch.float64),
+                    1.0,
+                )
+                dtype = torch.get_default_dtype()
+                signal = as_column(self.amplitude, dtype) * self.ftype((2 * np.pi * cycles).to(dtype))
+            else:
+                time_vector = torch.as_tensor(time_vector).clone().detach()
+                dtype = time_vector.dtype if time_vector.is_floating_point() else torch.get_default_dtype()
+                signal = as_column(self.amplitude, dtype) * self.ftype(
+                    2 * np.pi * as_column(self.frequency, dtype) * time_vector
+                )
+            if out is not None:
+                # Broadcasts over the rows of a batch
+                return out.copy_(signal)
+            if batch_size is not None:
+                signal = signal.repeat(batch_size, *(1,) * signal.dim())
+            return self._output(signal)
         else:
             raise ValueError("Signal type not vectorizable")
@@ -0,0 +1,2 @@
+from .writers import *
+from .readers import *
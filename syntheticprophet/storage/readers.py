@@ -0,0 +1,43 @@
+import json
+import os
+import numpy as np
+from typing import Dict, Union
+from .writers import COLUMNS
+
+__all__ = ["load_dataset"]
+
+
+def load_dataset(path:str)->Union[Dict[str, np.ndarray], "pyarrow.Table"]:
+    """Memory-maps a dataset written by `write_dataset` without copying it.
+
+    Parameters
+    ----------
+    path : str
+        Directory of an 'npy' dataset, or Arrow IPC/Parquet file
+
+    Returns
+    -------
+    dict or pyarrow.Table
+        For 'npy' datasets, read-only arrays of shape (n_series, n_points) for the time,
+        samples, signals and errors columns. For Arrow IPC files, a table backed by the
+        memory-mapped file, in long format. Parquet files are decoded, and hence copied,
+        into a table in memory.
+
+    """
+    if os.path.isdir(path):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return {
+            column: np.load(os.path.join(path, column + ".npy"), mmap_mode="r")[: meta["n_written"]]
+            for column in COLUMNS
+        }
+
+    import pyarrow as pa
+
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic == b"PAR1":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
@@ -0,0 +1,243 @@
+import json
+import math
+import os
+import numpy as np
+import torch
+from torch import Tensor
+from typing import Optional, Tuple
+from ..grid import align_grids
+from ..timesampler.time_index import as_time_tensor
+
+__all__ = ["NpyWriter", "ArrowWriter", "write_dataset"]
+
+COLUMNS = ("time", "samples", "signals", "errors")
+
+
+def _to_numpy(values:Tensor, shape, dtype)->np.ndarray:
+    """Converts a tensor to a numpy array of the given dtype, broadcast to shape."""
+    return np.broadcast_to(torch.as_tensor(values).detach().cpu().numpy().astype(dtype, copy=False), shape)
+
+
+def _grid_rows(samples:Tensor, signals:Tensor, errors:Tensor)->Tuple[Tensor, Tensor, Tensor]:
+    """Batch values of shape (B, *grid, T) as rows of shape (B * P, T), one per series and
+    grid point, broadcasting the values that have no grid dimensions."""
+    signals, errors = align_grids(signals, errors, True)
+    shape = samples.shape
+    return tuple(values.expand(shape).reshape(-1, shape[-1]) for values in (samples, signals, errors))
+
+
+class NpyWriter:
+    """Writes series into preallocated, memory-mapped `.npy` files.
+
+    One file per column (time, samples, signals, errors) of shape (n_series, n_points) is
+    created in `directory`, next to a `meta.json` description. Rows are written in place,
+    so the memory footprint is that of the batch being written.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to write the files to. It is created if needed
+    n_series : int
+        Number of series in the dataset
+    n_points : int
+        Number of time points per series
+    dtype : numpy dtype (default np.float32)
+        Data type of the stored values
+    grid : tuple of int (default ())
+        Shape of the parameter grid of the series, recorded in the metadata. Each series of
+        a grid of P points is stored as P consecutive rows
+
+    """
+
+    def __init__(self, directory:str, n_series:int, n_points:int, dtype=np.float32, grid:Tuple[int, ...]=()):
+        self.directory = directory
+        self.n_series = n_series
+        self.n_points = n_points
+        self.dtype = np.dtype(dtype)
+        self.grid = tuple(grid)
+        os.makedirs(directory, exist_ok=True)
+        self.columns = {
+            column: np.lib.format.open_memmap(
+                os.path.join(directory, column + ".npy"),
+                mode="w+",
+                dtype=self.dtype,
+                shape=(n_series, n_points),
+            )
+            for column in COLUMNS
+        }
+        self.n_written = 0
+
+    def write(self, time:Tensor, samples:Tensor, signals:Tensor, errors:Tensor, start:Optional[int]=None):
+        """Writes a batch of series at rows start, start + 1, ...
+
+        Parameters
+        ----------
+        time : tensor
+            Time vector of shape (T,) shared by the batch, or (B, T)
+        samples, signals, errors : tensor
+            Values of shape (B, T), or (T,) for a single series
+        start : int (default None)
+            First row to write. Defaults to the row after the last written one
+
+        """
+        start = self.n_written if start is None else start
+        samples = torch.as_tensor(samples)
+        if samples.dim() == 1:
+            samples, signals, errors = samples[None], torch.as_tensor(signals)[None], torch.as_tensor(errors)[None]
+        shape = (samples.shape[0], self.n_points)
+        rows = slice(start, start + samples.shape[0])
+        for column, values in zip(COLUMNS, (time, samples, signals, errors)):
+            self.columns[column][rows] = _to_numpy(values, shape, self.dtype)
+        self.n_written = max(self.n_written, rows.stop)
+
+    def close(self):
+        """Flushes the files to disk and writes the metadata."""
+        for array in self.columns.values():
+            array.flush()
+        with open(os.path.join(self.directory, "meta.json"), "w") as f:
+            json.dump(
+                {
+                    "format": "npy",
+                    "n_series": self.n_series,
+                    "n_points": self.n_points,
+                    "n_written": self.n_written,
+                    "dtype": self.dtype.str,
+                    "grid": list(self.grid),
+                },
+                f,
+            )
+        self.columns = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ArrowWriter:
+    """Writes series as Arrow record batches, to an Arrow IPC or a Parquet file.
+
+    Each batch is appended in long format, with columns series, time, samples, signals and
+    errors, as soon as it is written. Requires pyarrow.
+
+    Parameters
+    ----------
+    path : str
+        File to write to
+    format : {'arrow', 'parquet'} (default 'arrow')
+        Arrow IPC files can be memory-mapped back without copying
+    dtype : numpy dtype (default np.float32)
+        Data type of the stored values
+
+    """
+
+    def __init__(self, path:str, format:str="arrow", dtype=np.float32):
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("ArrowWriter requires pyarrow, install it with `pip install pyarrow`") from e
+        if format not in ("arrow", "parquet"):
+            raise ValueError(f"Unknown format {format}")
+
+        self.path = path
+        self.format = format
+        self.dtype = np.dtype(dtype)
+        value_type = pa.from_numpy_dtype(self.dtype)
+        self.schema = pa.schema(
+            [("series", pa.int64())] + [(column, value_type) for column in COLUMNS]
+        )
+        if format == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self.schema)
+        self.n_written = 0
+
+    def write(self, time:Tensor, samples:Tensor, signals:Tensor, errors:Tensor, start:Optional[int]=None):
+        """Appends a batch of series, numbered from start, as one record batch.
+
+        Parameters
+        ----------
+        time : tensor
+            Time vector of shape (T,) shared by the batch, or (B, T)
+        samples, signals, errors : tensor
+            Values of shape (B, T), or (T,) for a single series
+        start : int (default None)
+            Number of the first series. Defaults to the one after the last written series
+
+        """
+        import pyarrow as pa
+
+        start = self.n_written if start is None else start
+        samples = torch.as_tensor(samples)
+        if samples.dim() == 1:
+            samples, signals, errors = samples[None], torch.as_tensor(signals)[None], torch.as_tensor(errors)[None]
+        shape = tuple(samples.shape)
+        series = np.repeat(np.arange(start, start + shape[0], dtype=np.int64), shape[1])
+        arrays = [pa.array(series)] + [
+            pa.array(np.ascontiguousarray(_to_numpy(values, shape, self.dtype)).reshape(-1))
+            for values in (time, samples, signals, errors)
+        ]
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.n_written = max(self.n_written, start + shape[0])
+
+    def close(self):
+        """Finalizes the file."""
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def write_dataset(
+    series, time_vector:Tensor, n_series:int, path:str, batch_size:int=1024,
+        format:str="npy", dtype=np.float32
+):
+    """Samples n_series series and writes them to disk batch by batch.
+
+    Only one batch of batch_size series is held in memory at any time.
+
+    If series has parameter grids, e.g. a Sinusoidal with a tensor of P frequencies, each
+    series is stored as P consecutive rows, one per grid point, so the dataset has
+    n_series * P rows. Values without grid dimensions, such as the errors of a noise
+    without grid, are repeated over the grid points.
+
+    Parameters
+    ----------
+    series : SyntheticSeries
+        Series to sample from
+    time_vector : tensor or RegularTimeIndex
+        Times at which to generate the samples, shared by all series
+    n_series : int
+        Number of series to write
+    path : str
+        Directory for the 'npy' format, file for the 'arrow' and 'parquet' formats
+    batch_size : int (default 1024)
+        Number of series sampled and written at once
+    format : {'npy', 'arrow', 'parquet'} (default 'npy')
+        Storage format
+    dtype : numpy dtype (default np.float32)
+        Data type of the stored values
+
+    """
+    time_values = as_time_tensor(time_vector)
+    starts = range(0, n_series, batch_size)
+    batch = series.sample_batch(time_vector, min(batch_size, n_series)) if n_series > 0 else None
+    # The grid shape is only known from the samples, the files are sized after the first batch
+    grid = () if batch is None else tuple(batch[0].shape[1:-1])
+    n_rows = math.prod(grid)
+    if format == "npy":
+        writer = NpyWriter(path, n_series * n_rows, len(time_vector), dtype=dtype, grid=grid)
+    else:
+        writer = ArrowWriter(path, format=format, dtype=dtype)
+    with writer:
+        for start in starts:
+            if batch is None:
+                batch = series.sample_batch(time_vector, min(batch_size, n_series - start))
+            writer.write(time_values, *_grid_rows(*batch), start=start * n_rows)
+            batch = None
@@ -2,12 +2,17 @@ import torch
 from torch import Tensor
 from .noise.base_noise import BaseNoise
 from .signals.base_signal import BaseSignal
-from typing import Tuple
+from .config import Configurable
+from .grid import align_grids
+from .instrumentation import instrumented
+from .rng import derive_seed
+from .timesampler.time_index import RegularTimeIndex
+from typing import Iterable, Iterator, Optional, Tuple, Union
 
 __all__ = ["SyntheticSeries"]
 
 
-class SyntheticSeries:
+class SyntheticSeries(Configurable):
     """A SyntheticSeries object is the main interface from which to sample synthetic time series.
     Provide at least a signal generator; a noise generator is optional.
     It is recommended to set the sampling frequency.
@@ -18,65 +23,286 @@ class SyntheticSeries:
         signal object for synthetic time series
     noise_generator : Noise object
         noise object for synthetic time series
+    seed : int (default None)
+        Root seed. If given, `reseed` and `stream` draw every series and chunk from its own
+        random stream derived from it, so that the data does not depend on where the series
+        and chunks are generated. `sample` itself draws from the generators' current
+        streams; call `reseed` first to select those of a series
+    dtype : torch dtype (default None)
+        Data type of the returned tensors. Defaults to the dtypes of the generators' samples
 
     """
 
-    def __init__(self, signal_generator:BaseSignal, noise_generator:BaseNoise=None):
+    def __init__(
+        self, signal_generator:BaseSignal, noise_generator:BaseNoise=None, seed:Optional[int]=None,
+            dtype:Optional[torch.dtype]=None
+    ):
         self.signal_generator = signal_generator
         self.noise_generator = noise_generator
+        self.seed = seed
+        self.dtype = dtype
 
-    def sample(self, time_vector:Tensor)->Tuple[Tensor, Tensor, Tensor]:
+    def reseed(self, *ids:int):
+        """Switches the generators to the random streams identified by ids.
+
+        The signal and noise generators draw from the independent streams
+        derive_seed(seed, *ids, 0) and derive_seed(seed, *ids, 1). Nothing happens if the
+        series has no root seed.
+
+        Parameters
+        ----------
+        ids : int
+            Identifiers of the stream, e.g. series and chunk numbers
+
+        """
+        if self.seed is None:
+            return
+        self.signal_generator.reseed(derive_seed(self.seed, *ids, 0))
+        if self.noise_generator is not None:
+            self.noise_generator.reseed(derive_seed(self.seed, *ids, 1))
+
+    @property
+    def sampling_path(self)->str:
+        """How samples are generated.
+
+        'vectorized' if all generators are vectorizable. 'hybrid' if only one of the signal
+        and the noise generator is: it is sampled vectorized up front and only the other
+        one is stepped. 'stepwise' otherwise.
+        """
+        signal_vectorizable = self.signal_generator.vectorizable
+        if self.noise_generator is None:
+            return "vectorized" if signal_vectorizable else "stepwise"
+        noise_vectorizable = self.noise_generator.vectorizable
+        if signal_vectorizable and noise_vectorizable:
+            return "vectorized"
+        if signal_vectorizable or noise_vectorizable:
+            return "hybrid"
+        return "stepwise"
+
+    @instrumented
+    def sample(
+        self, time_vector:Tensor, out:Optional[Tuple[Tensor, Tensor, Tensor]]=None
+    )->Tuple[Tensor, Tensor, Tensor]:
         """Samples from the specified SyntheticSeries.
 
         Parameters
         ----------
-        time_vector : tensor
+        time_vector : tensor or RegularTimeIndex
             Times at which to generate a sample
+        out : tuple of tensors (default None)
+            Tensors of shape (T,) to write the samples, signals and errors to, e.g. a
+            preallocated training buffer. Values are cast to their dtypes
 
         Returns
         -------
         samples, signals, errors, : tuple (tensor, tensor, tensor)
-            Returns samples, and the signals and errors they were constructed from
+            Returns samples, and the signals and errors they were constructed from. With
+            parameter grids, e.g. a Sinusoidal with a tensor of frequencies, the grid
+            dimensions come before the time dimension, and samples broadcast over them
         """
 
         # Vectorize if possible
-        if (
-            self.signal_generator.vectorizable
-            and not self.noise_generator is None
-            and self.noise_generator.vectorizable
-        ):
-            signals = self.signal_generator.sample_vectorized(time_vector)
-            errors = self.noise_generator.sample_vectorized(time_vector)
-            samples = signals + errors
-        elif self.signal_generator.vectorizable and self.noise_generator is None:
-            signals = self.signal_generator.sample_vectorized(time_vector)
-            errors = torch.zeros(len(time_vector))
-            samples = signals
+        path = self.sampling_path
+        if path == "vectorized":
+            samples, signals, errors = self._sample_vectorized(time_vector, None, out)
+        elif path == "hybrid":
+            samples, signals, errors = self._sample_hybrid(time_vector, None, out)
         else:
-            n_samples = len(time_vector)
-            samples = torch.zeros(n_samples)  # Signal and errors combined
-            signals = torch.zeros(n_samples)  # Signal samples
-            errors = torch.zeros(n_samples)  # Handle errors separately
-            times = torch.arange(n_samples)
+            samples, signals, errors = self._sample_stepwise(time_vector, out)
 
-            # Sample iteratively, while providing access to all previously sampled steps
-            for i in range(n_samples):
-                # Get time
-                t = time_vector[i]
-                # Sample error
-                if not self.noise_generator is None:
-                    errors[i] = self.noise_generator.sample_next(
-                        t, samples[: i - 1], errors[: i - 1]
-                    )
-
-                # Sample signal
-                signal = self.signal_generator.sample_next(
-                    t, samples[: i - 1], errors[: i - 1]
+        # Return both times and samples, as well as signals and errors
+        return samples, signals, errors
+
+    def _generate(self, generator, time_vector:Tensor, batch_size:Optional[int], out:Optional[Tensor])->Tensor:
+        """Vectorized samples of one generator, in the series' dtype or written to out."""
+        if out is not None:
+            return generator.sample_vectorized(time_vector, batch_size, out=out)
+        values = generator.sample_vectorized(time_vector, batch_size)
+        return values if self.dtype is None else values.to(self.dtype)
+
+    def _sample_vectorized(
+        self, time_vector:Tensor, batch_size:Optional[int], out:Optional[Tuple[Tensor, Tensor, Tensor]]
+    )->Tuple[Tensor, Tensor, Tensor]:
+        """Samples all time points at once, for one series or a batch."""
+        samples_out, signals_out, errors_out = (None, None, None) if out is None else out
+        signals = self._generate(self.signal_generator, time_vector, batch_size, signals_out)
+        if self.noise_generator is None:
+            errors = torch.zeros_like(signals) if errors_out is None else errors_out.zero_()
+            samples = signals if samples_out is None else samples_out.copy_(signals)
+        else:
+            errors = self._generate(self.noise_generator, time_vector, batch_size, errors_out)
+            aligned_signals, aligned_errors = align_grids(signals, errors, batch_size is not None)
+            if samples_out is None:
+                samples = aligned_signals + aligned_errors
+            else:
+                samples = torch.add(aligned_signals, aligned_errors, out=samples_out)
+        return samples, signals, errors
+
+    def _sample_stepwise(
+        self, time_vector:Tensor, out:Optional[Tuple[Tensor, Tensor, Tensor]]=None
+    )->Tuple[Tensor, Tensor, Tensor]:
+        """Samples one time step after the other, through the generators' sample_next."""
+        n_samples = len(time_vector)
+        if out is None:
+            samples = torch.zeros(n_samples, dtype=self.dtype)  # Signal and errors combined
+            signals = torch.zeros(n_samples, dtype=self.dtype)  # Signal samples
+            errors = torch.zeros(n_samples, dtype=self.dtype)  # Handle errors separately
+        else:
+            samples, signals, errors = out
+            errors.zero_()
+
+        # Sample iteratively, while providing access to all previously sampled steps
+        for i in range(n_samples):
+            # Get time
+            t = time_vector[i]
+            # Sample error
+            if not self.noise_generator is None:
+                errors[i] = self.noise_generator.sample_next(
+                    t, samples[:i], errors[:i]
                 )
-                signals[i] = signal
 
-                # Compound signal and noise
-                samples[i] = signals[i] + errors[i]
+            # Sample signal
+            signal = self.signal_generator.sample_next(
+                t, samples[:i], errors[:i]
+            )
+            signals[i] = signal
+
+            # Compound signal and noise
+            samples[i] = signals[i] + errors[i]
 
-        # Return both times and samples, as well as signals and errors
         return samples, signals, errors
+
+    def _sample_hybrid(
+        self, time_vector:Tensor, batch_size:Optional[int], out:Optional[Tuple[Tensor, Tensor, Tensor]]
+    )->Tuple[Tensor, Tensor, Tensor]:
+        """Samples the vectorizable generator at once, and steps only the other one.
+
+        The stepped generator receives the history of samples and errors before each time
+        point if it requires it, and empty tensors otherwise.
+        """
+        n_samples = len(time_vector)
+        samples_out, signals_out, errors_out = (None, None, None) if out is None else out
+        size = (n_samples,) if batch_size is None else (batch_size, n_samples)
+        if self.signal_generator.vectorizable:
+            stepped = self.noise_generator
+            signals = self._generate(self.signal_generator, time_vector, batch_size, signals_out)
+            errors = torch.zeros(size, dtype=self.dtype) if errors_out is None else errors_out
+            steps = errors
+        else:
+            stepped = self.signal_generator
+            errors = self._generate(self.noise_generator, time_vector, batch_size, errors_out)
+            signals = torch.zeros(size, dtype=self.dtype) if signals_out is None else signals_out
+            steps = signals
+        rows = (lambda values: (values,)) if batch_size is None else (lambda values: values)
+
+        if not stepped.requires_history:
+            history = steps.new_empty(0)
+            for row in rows(steps):
+                for i in range(n_samples):
+                    row[i] = stepped.sample_next(time_vector[i], history, history)
+            aligned_signals, aligned_errors = align_grids(signals, errors, batch_size is not None)
+            if samples_out is None:
+                samples = aligned_signals + aligned_errors
+            else:
+                samples = torch.add(aligned_signals, aligned_errors, out=samples_out)
+            return samples, signals, errors
+
+        if signals.shape != size or errors.shape != size:
+            raise ValueError(
+                f"Parameter grids cannot be combined with a {type(stepped).__name__}, which requires "
+                "the history of samples"
+            )
+        samples = torch.zeros(size, dtype=self.dtype) if samples_out is None else samples_out
+        for samples_row, signals_row, errors_row, row in zip(
+            rows(samples), rows(signals), rows(errors), rows(steps)
+        ):
+            for i in range(n_samples):
+                row[i] = stepped.sample_next(time_vector[i], samples_row[:i], errors_row[:i])
+                samples_row[i] = signals_row[i] + errors_row[i]
+        return samples, signals, errors
+
+    def stream(
+        self, time_source:Union[Tensor, RegularTimeIndex, Iterable[Tensor]], chunk_size:int=10000,
+            series_id:int=0
+    )->Iterator[Tuple[Tensor, Tensor, Tensor]]:
+        """Samples a series chunk by chunk, with memory bounded by the chunk size.
+
+        Each chunk is sampled with `sample`, so vectorizable generators compute a chunk in
+        one shot. Stateful generators (AutoRegressive, CAR, RedNoise, NARMA, MackeyGlass and
+        GaussianProcess sampled through its state-space form) continue exactly where the
+        previous chunk stopped. Other GaussianProcess samplers draw each chunk independently,
+        and the history passed to `sample_next` is limited to the current chunk.
+
+        If the series has a root seed, chunk k is drawn from the random stream of
+        (series_id, k), so a given chunking yields the same data in any process and session.
+        The data depends on chunk_size, though: with a single chunk it is that of `sample`
+        after `reseed(series_id, 0)`, and other chunk sizes give different, equally
+        distributed draws.
+
+        Parameters
+        ----------
+        time_source : tensor, RegularTimeIndex or iterable of tensors
+            Times at which to generate samples. Either a tensor or a RegularTimeIndex, which
+            is split into chunks, or a (possibly unbounded) iterable of consecutive time
+            tensors, of which the ones longer than chunk_size are split further. The chunks
+            of a RegularTimeIndex are only materialized when they are sampled
+        chunk_size : int (default 10000)
+            Maximum number of time points per chunk
+        series_id : int (default 0)
+            Number of the series, selecting its random streams if the series has a root seed
+
+        Yields
+        ------
+        samples, signals, errors, : tuple (tensor, tensor, tensor)
+            Samples, signals and errors of one chunk
+        """
+        if isinstance(time_source, (Tensor, RegularTimeIndex)):
+            time_source = (time_source,)
+        chunk_id = 0
+        for time_vector in time_source:
+            if isinstance(time_vector, RegularTimeIndex):
+                time_chunks = time_vector.chunks(chunk_size)
+            else:
+                time_chunks = torch.split(torch.as_tensor(time_vector), chunk_size)
+            for time_chunk in time_chunks:
+                self.reseed(series_id, chunk_id)
+                chunk_id += 1
+                yield self.sample(time_chunk)
+
+    @instrumented
+    def sample_batch(
+        self, time_vector:Tensor, n_series:int, out:Optional[Tuple[Tensor, Tensor, Tensor]]=None
+    )->Tuple[Tensor, Tensor, Tensor]:
+        """Samples several independent series on the same time vector.
+
+        If all generators are vectorizable, every series is drawn in a single call per
+        generator. If only one of them is, it draws every series in a single call and the
+        other one is stepped. Otherwise, the series are sampled one by one and stacked.
+
+        Parameters
+        ----------
+        time_vector : tensor
+            Times at which to generate a sample
+        n_series : int
+            Number of series to sample
+        out : tuple of tensors (default None)
+            Tensors of shape (n_series, T) to write the samples, signals and errors to
+
+        Returns
+        -------
+        samples, signals, errors, : tuple (tensor, tensor, tensor)
+            Tensors of shape (n_series, T) with the samples, and the signals and errors
+            they were constructed from
+        """
+        path = self.sampling_path
+        if path == "vectorized":
+            return self._sample_vectorized(time_vector, n_series, out)
+        if path == "hybrid":
+            return self._sample_hybrid(time_vector, n_series, out)
+
+        if out is not None:
+            for i in range(n_series):
+                self.sample(time_vector, out=tuple(buffer[i] for buffer in out))
+            return tuple(out)
+        samples, signals, errors = zip(*[self.sample(time_vector) for _ in range(n_series)])
+        return torch.stack(samples), torch.stack(signals), torch.stack(errors)
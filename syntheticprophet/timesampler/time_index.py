@@ -0,0 +1,84 @@
+import torch
+from torch import Tensor
+from typing import Iterator, Optional, Union
+
+__all__ = ["RegularTimeIndex", "as_time_tensor"]
+
+
+class RegularTimeIndex:
+    """Lazy, regularly spaced time index start, start + step, ..., start + (n - 1) * step.
+
+    Only start, step and n are stored, so the index takes constant memory whatever its
+    length. Timestamps are computed on demand, in int64 if start and step are integers and
+    in float64 otherwise, so large timestamps (e.g. epoch seconds) keep their precision.
+
+    Parameters
+    ----------
+    start : int or float
+        First timestamp
+    step : int or float
+        Spacing between consecutive timestamps
+    n : int
+        Number of timestamps
+
+    """
+
+    def __init__(self, start:Union[int, float], step:Union[int, float], n:int):
+        if n < 0:
+            raise ValueError("The number of timestamps must be non-negative")
+        integral = all(isinstance(value, int) and not isinstance(value, bool) for value in (start, step))
+        self.dtype = torch.int64 if integral else torch.float64
+        self.start = start if integral else float(start)
+        self.step = step if integral else float(step)
+        self.n = int(n)
+
+    @property
+    def stop(self)->Union[int, float]:
+        """Last timestamp of the index."""
+        return self.start + self.step * (self.n - 1)
+
+    def __len__(self)->int:
+        return self.n
+
+    def __getitem__(self, key:Union[int, slice])->Union[Tensor, "RegularTimeIndex"]:
+        """Timestamp at an integer position, as a 0-d tensor, or lazy index of a slice."""
+        if isinstance(key, slice):
+            positions = range(self.n)[key]
+            return RegularTimeIndex(
+                self.start + self.step * positions.start, self.step * positions.step, len(positions)
+            )
+        position = range(self.n)[key]
+        return torch.tensor(self.start + self.step * position, dtype=self.dtype)
+
+    def __iter__(self)->Iterator[Tensor]:
+        for chunk in self.chunks(65536):
+            yield from chunk.materialize()
+
+    def __repr__(self)->str:
+        return f"RegularTimeIndex(start={self.start!r}, step={self.step!r}, n={self.n})"
+
+    def materialize(self, dtype:Optional[torch.dtype]=None)->Tensor:
+        """Timestamps as a tensor, computed in the index's dtype and cast to dtype if given."""
+        time_vector = self.start + self.step * torch.arange(self.n, dtype=self.dtype)
+        return time_vector if dtype is None else time_vector.to(dtype)
+
+    def chunks(self, chunk_size:int)->Iterator["RegularTimeIndex"]:
+        """Consecutive lazy sub-indices of at most chunk_size timestamps."""
+        for start in range(0, self.n, chunk_size):
+            yield self[start : start + chunk_size]
+
+
+def as_time_tensor(time_vector:Union[Tensor, RegularTimeIndex], dtype:Optional[torch.dtype]=None)->Tensor:
+    """Time vector as a tensor, materializing a RegularTimeIndex if needed.
+
+    Parameters
+    ----------
+    time_vector : tensor, array-like or RegularTimeIndex
+        Timestamps
+    dtype : torch dtype (default None)
+        Data type of the result. Defaults to the dtype of time_vector
+
+    """
+    if isinstance(time_vector, RegularTimeIndex):
+        return time_vector.materialize(dtype)
+    return torch.as_tensor(time_vector, dtype=dtype)
@@ -1,11 +1,21 @@
+import math
 import torch
 from torch import Tensor
-import random
+from typing import Optional, Tuple, Union
+from ..config import Configurable
+from ..rng import make_generator
+from .time_index import RegularTimeIndex
 
 __all__ = ["TimeSampler"]
 
 
-class TimeSampler:
+def _perturbed_dtype(time_vector:Tensor)->torch.dtype:
+    """Data type of perturbed timestamps: that of time_vector, or torch's default float
+    dtype for integer grids such as torch.arange(0, 100, 1)."""
+    return time_vector.dtype if time_vector.is_floating_point() else torch.get_default_dtype()
+
+
+class TimeSampler(Configurable):
     """TimeSampler determines how and when samples will be taken from signal and noise.
     Samples timestamps for regular and irregular time signals
 
@@ -15,15 +25,27 @@ class TimeSampler:
                 Time sampling of time series starts
     stop_time: float/int (default 10)
                 Time sampling of time series stops
+    seed: int (default None)
+                Seed of the sampler's own random number generator, used for irregular time.
+                If neither seed nor generator is given, torch's global generator is used
+    generator: torch.Generator (default None)
+                Random number generator to draw from. Takes precedence over seed
+    dtype: torch dtype (default None)
+                Data type of the sampled timestamps. Defaults to torch's default dtype.
+                Lazy regular time indices keep their own int64 or float64 precision
 
     """
 
-    def __init__(self, start_time=0, stop_time=10):
+    def __init__(self, start_time=0, stop_time=10, seed:Optional[int]=None,
+                 generator:Optional[torch.Generator]=None, dtype:Optional[torch.dtype]=None):
         self.start_time = start_time
         self.stop_time = stop_time
+        self.generator = make_generator(seed, generator)
+        self.dtype = dtype
 
     def sample_time(self, num_points:int=None, resolution:float=None,
-                    keep_percentage:int=100, how:str='regular')->Tensor:
+                    keep_percentage:int=100, how:str='regular',
+                    lazy:bool=False)->Union[Tensor, RegularTimeIndex]:
         """
 
         Parameters
@@ -32,13 +54,17 @@ class TimeSampler:
         resolution
         keep_percentage
         how
+        lazy: bool (default False)
+            For regular time, return a RegularTimeIndex computing the timestamps on
+            demand instead of a materialized tensor
 
         Returns
         -------
 
         """
+        if how == 'regular':
+            return self._sample_regular_time(num_points, resolution, keep_percentage, lazy=lazy)
         dispatch = {
-            'regular': self._sample_regular_time,
             'irregular': self._sample_irregular_time
         }
 
@@ -46,7 +72,8 @@ class TimeSampler:
 
 
     def _sample_regular_time(self, num_points:int=None,
-                             resolution:int=None, keep_percentage:int=100)->Tensor:
+                             resolution:int=None, keep_percentage:int=100,
+                             lazy:bool=False)->Union[Tensor, RegularTimeIndex]:
         """
         Samples regularly spaced time using the number of points or the
         resolution of the signal. Only one of the parameters is to be
@@ -58,6 +85,8 @@ class TimeSampler:
             Number of points in time series
         resolution: float/int (default None)
             Resolution of the time series
+        lazy: bool (default False)
+            Return a RegularTimeIndex instead of a tensor
 
         Returns
         -------
@@ -67,11 +96,17 @@ class TimeSampler:
         """
         if num_points is None and resolution is None:
             raise ValueError("One of the keyword arguments must be initialized.")
+        if lazy:
+            if resolution is not None:
+                n = max(0, math.ceil((self.stop_time - self.start_time) / resolution))
+                return RegularTimeIndex(self.start_time, resolution, n)
+            step = (self.stop_time - self.start_time) / (num_points - 1) if num_points > 1 else 0.0
+            return RegularTimeIndex(self.start_time, step, num_points)
         if resolution is not None:
-            time_vector = torch.arange(self.start_time, self.stop_time, resolution)
+            time_vector = torch.arange(self.start_time, self.stop_time, resolution, dtype=self.dtype)
             return time_vector
         else:
-            time_vector = torch.linspace(self.start_time, self.stop_time, num_points)
+            time_vector = torch.linspace(self.start_time, self.stop_time, num_points, dtype=self.dtype)
             return time_vector
 
     def _sample_irregular_time(
@@ -96,16 +131,100 @@ class TimeSampler:
         numpy array
             Irregularly sampled timestamps
 
+        """
+        time_vector, resolution = self._base_time(num_points, resolution)
+        time_vector = self._select_random_indices(time_vector, keep_percentage)
+        return self._create_perturbations(time_vector, resolution)
+
+    def sample_time_batch(
+        self, batch_size:int, num_points:int=None, resolution:float=None,
+            keep_percentage:float=100, selection:str='exact', layout:str='padded'
+    )->Union[Tuple[Tensor, Tensor, Tensor], Tensor]:
+        """
+        Samples batch_size irregular time vectors at once, without a loop over series.
+
+        Each series keeps a random subset of the regular grid defined by num_points or
+        resolution, whose timestamps are then perturbed as in `sample_time(how='irregular')`.
+
+        Parameters
+        ----------
+        batch_size: int
+            Number of time vectors
+        num_points: int (default None)
+            Number of points of the underlying regular grid
+        resolution: float/int (default None)
+            Resolution of the underlying regular grid
+        keep_percentage: float/int (default 100)
+            Percentage of points retained in each series
+        selection: {'exact', 'bernoulli'} (default 'exact')
+            With 'exact', every series keeps exactly keep_percentage percent of the points.
+            With 'bernoulli', every point is kept independently with probability
+            keep_percentage / 100, so series have different lengths
+        layout: {'padded', 'nested'} (default 'padded')
+            Layout of the returned time vectors
+
+        Returns
+        -------
+        tuple of tensors or nested tensor
+            For the 'padded' layout, the sorted timestamps of shape (batch_size, T_max), the
+            lengths of shape (batch_size,) and a boolean mask of valid entries of shape
+            (batch_size, T_max). Padded entries repeat the last timestamp of their series, so
+            that rows stay sorted. For the 'nested' layout, a nested tensor of the time vectors
+
+        """
+        if selection not in ('exact', 'bernoulli'):
+            raise ValueError(f"Unknown selection {selection}")
+        if layout not in ('padded', 'nested'):
+            raise ValueError(f"Unknown layout {layout}")
+        time_vector, resolution = self._base_time(num_points, resolution)
+        time_vector = time_vector.to(_perturbed_dtype(time_vector))
+        n = len(time_vector)
+
+        if selection == 'exact':
+            num_select_points = int(keep_percentage * n / 100)
+            index = torch.rand(batch_size, n, generator=self.generator).argsort(dim=1)[:, :num_select_points]
+            lengths = torch.full((batch_size,), num_select_points, dtype=torch.long)
+            time_batch = time_vector[index]
+        else:
+            keep = torch.rand(batch_size, n, generator=self.generator) < keep_percentage / 100
+            lengths = keep.sum(dim=1)
+            # Move the kept points of each row to its front, in their original order
+            positions = torch.cumsum(keep, dim=1) - 1
+            rows = torch.arange(batch_size)[:, None].expand(-1, n)
+            time_batch = torch.zeros(batch_size, int(lengths.max()) if n else 0, dtype=time_vector.dtype)
+            time_batch[rows[keep], positions[keep]] = time_vector.expand(batch_size, -1)[keep]
+
+        mask = torch.arange(time_batch.shape[1]) < lengths[:, None]
+        time_batch = time_batch + torch.normal(
+            mean=0.0, std=resolution, size=time_batch.shape, generator=self.generator,
+            dtype=time_batch.dtype
+        )
+        # Padded entries sort to the end, then repeat the last valid timestamp of their row
+        time_batch = torch.where(mask, time_batch, torch.full_like(time_batch, float('inf')))
+        time_batch = torch.sort(time_batch, dim=1)[0]
+        if time_batch.shape[1] > 0:
+            last = time_batch.gather(1, (lengths - 1).clamp(min=0)[:, None])
+            time_batch = torch.where(mask, time_batch, last)
+
+        if layout == 'nested':
+            return torch.nested.nested_tensor(
+                [row[:length] for row, length in zip(time_batch, lengths.tolist())]
+            )
+        return time_batch, lengths, mask
+
+    def _base_time(self, num_points:int=None, resolution:float=None)->Tuple[Tensor, float]:
+        """
+        Regular grid from which irregular timestamps are drawn, and its resolution.
+        The resolution keyword argument is given priority.
         """
         if num_points is None and resolution is None:
             raise ValueError("One of the keyword arguments must be initialized.")
         if resolution is not None:
-            time_vector = torch.arange(self.start_time, self.stop_time, resolution)
+            time_vector = torch.arange(self.start_time, self.stop_time, resolution, dtype=self.dtype)
         else:
-            time_vector = torch.linspace(self.start_time, self.stop_time, num_points)
+            time_vector = torch.linspace(self.start_time, self.stop_time, num_points, dtype=self.dtype)
             resolution = float(self.stop_time - self.start_time) / num_points
-        time_vector = self._select_random_indices(time_vector, keep_percentage)
-        return self._create_perturbations(time_vector, resolution)
+        return time_vector, resolution
 
     def _create_perturbations(self, time_vector:Tensor, resolution:float)->Tensor:
         """
@@ -126,7 +245,8 @@ class TimeSampler:
 
         """
         sample_perturbations = torch.normal(
-            mean=0.0, std=resolution, size=(len(time_vector),)
+            mean=0.0, std=resolution, size=(len(time_vector),), generator=self.generator,
+            dtype=_perturbed_dtype(time_vector)
         )
         time_vector = time_vector + sample_perturbations
         return torch.sort(time_vector)[0]
@@ -153,7 +273,5 @@ class TimeSampler:
         num_points = len(time_vector)
         num_select_points = int(keep_percentage * num_points / 100)
 
-        index = torch.tensor(random.sample(range(time_vector.size()[0]), num_select_points))
-
-
+        index = torch.randperm(num_points, generator=self.generator)[:num_select_points]
         return time_vector[index]
@@ -0,0 +1,47 @@
+import unittest
+
+import torch
+
+from syntheticprophet.signals import AutoRegressive
+
+
+def moments(series:torch.Tensor):
+    """Variance and lag-1 autocorrelation along the last dimension, pooled over rows."""
+    series = series - series.mean()
+    variance = float((series ** 2).mean())
+    return variance, float((series[..., 1:] * series[..., :-1]).mean()) / variance
+
+
+class TestAutoRegressive(unittest.TestCase):
+    # ar_param, stationary variance and lag-1 autocorrelation for sigma=1
+    processes = [
+        ([0.5], 1 / (1 - 0.5 ** 2), 0.5),
+        ([0.5, -0.3], 1.3 / (0.7 * (1.3 ** 2 - 0.5 ** 2)), 0.5 / 1.3),
+    ]
+
+    def test_vectorized_distribution(self):
+        for ar_param, variance, autocorrelation in self.processes:
+            with self.subTest(ar_param=ar_param):
+                signal = AutoRegressive(ar_param=ar_param, sigma=1.0, seed=0)
+                samples = signal.sample_vectorized(torch.arange(300), batch_size=2000)
+                empirical_variance, empirical_autocorrelation = moments(samples[:, 100:].double())
+                self.assertAlmostEqual(empirical_variance, variance, delta=0.05)
+                self.assertAlmostEqual(empirical_autocorrelation, autocorrelation, delta=0.02)
+
+    def test_stepwise_distribution(self):
+        for ar_param, variance, autocorrelation in self.processes:
+            with self.subTest(ar_param=ar_param):
+                signal = AutoRegressive(ar_param=ar_param, sigma=1.0, seed=0)
+                samples = torch.cat([signal.sample_next(t, None, None) for t in range(40000)])
+                empirical_variance, empirical_autocorrelation = moments(samples[100:].double())
+                self.assertAlmostEqual(empirical_variance, variance, delta=0.05)
+                self.assertAlmostEqual(empirical_autocorrelation, autocorrelation, delta=0.02)
+
+    def test_vectorized_continues_series(self):
+        signal = AutoRegressive(ar_param=[0.9], sigma=1.0, seed=0)
+        first = signal.sample_vectorized(torch.arange(50))
+        self.assertAlmostEqual(signal.previous_value[0], float(first[-1]), places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import math
+import unittest
+
+import torch
+
+from syntheticprophet.rng import derive_seed
+from syntheticprophet.signals import CAR, AutoRegressive, Sinusoidal
+from syntheticprophet.signals.base_signal import BaseSignal
+from syntheticprophet.signals.composite import Product, Scale, Sum
+
+
+class Feedback(BaseSignal):
+    """Half the last sample, a signal that can only be stepped with its history."""
+
+    def __init__(self):
+        super().__init__(vectorizable=False)
+
+    def sample_next(self, time, samples, errors):
+        return 0.5 * float(samples[-1]) if len(samples) else 1.0
+
+
+class Stepped(BaseSignal):
+    """Sinusoid that can only be stepped, without history."""
+
+    requires_history = False
+
+    def __init__(self):
+        super().__init__(vectorizable=False)
+
+    def sample_next(self, time, samples, errors):
+        return float(torch.sin(torch.as_tensor(time, dtype=torch.float64)))
+
+
+class TestComposite(unittest.TestCase):
+    time_vector = torch.arange(50, dtype=torch.float32)
+
+    def test_algebra(self):
+        first, second = Sinusoidal(frequency=0.1), Sinusoidal(frequency=0.05, amplitude=2.0)
+        a, b = first.sample_vectorized(self.time_vector), second.sample_vectorized(self.time_vector)
+        torch.testing.assert_close((first + second).sample_vectorized(self.time_vector), a + b)
+        torch.testing.assert_close((first * second).sample_vectorized(self.time_vector), a * b)
+        torch.testing.assert_close((3.0 * first).sample_vectorized(self.time_vector), 3.0 * a)
+        self.assertIsInstance(first + second + first, Sum)
+        self.assertEqual(len((first + second + first).children), 3)
+        self.assertIsInstance(first * second, Product)
+        self.assertIsInstance(2.0 * (3.0 * first), Scale)
+
+    def test_reseed_reaches_children(self):
+        signal = Sum(Sinusoidal(), CAR(), AutoRegressive(ar_param=[0.5]))
+        signal.reseed(5)
+        for i, child in enumerate(signal.children):
+            self.assertEqual(child.generator.initial_seed(), derive_seed(5, i))
+
+    def test_reseed_repeats_samples(self):
+        def sample(seed):
+            signal = Sum(Sinusoidal(), CAR(ar_param=0.9))
+            signal.reseed(seed)
+            return signal.sample_vectorized(self.time_vector)
+
+        self.assertTrue(torch.equal(sample(5), sample(5)))
+        self.assertFalse(torch.equal(sample(5), sample(6)))
+
+    def test_stepped_child_without_history(self):
+        signal = Sinusoidal(frequency=0.1) + Stepped()
+        self.assertTrue(signal.vectorizable)
+        expected = Sinusoidal(frequency=0.1).sample_vectorized(self.time_vector).double() + torch.sin(
+            self.time_vector.double()
+        )
+        torch.testing.assert_close(signal.sample_vectorized(self.time_vector).double(), expected, rtol=0, atol=1e-6)
+
+    def test_child_with_history_is_not_vectorized(self):
+        signal = Sinusoidal() + Feedback()
+        self.assertFalse(signal.vectorizable)
+        self.assertTrue(signal.requires_history)
+
+    def test_grid_child_with_stepped_child(self):
+        frequencies = torch.tensor([0.05, 0.1, 0.2])
+        signal = Sinusoidal(frequency=frequencies) + Stepped()
+        grid = Sinusoidal(frequency=frequencies).sample_vectorized(self.time_vector).double()
+        expected = grid + torch.sin(self.time_vector.double())
+        sampled = signal.sample_vectorized(self.time_vector)
+        self.assertEqual(sampled.shape, (3, 50))
+        torch.testing.assert_close(sampled.double(), expected, rtol=0, atol=1e-6)
+        batch = signal.sample_vectorized(self.time_vector, batch_size=2)
+        self.assertEqual(batch.shape, (2, 3, 50))
+        torch.testing.assert_close(batch.double(), expected.expand(2, -1, -1), rtol=0, atol=1e-6)
+        stepped = torch.stack([signal.sample_next(time, None, None) for time in self.time_vector], dim=-1)
+        torch.testing.assert_close(stepped, expected, rtol=0, atol=1e-6)
+
+    def test_stepped_child_into_out(self):
+        signal = Sinusoidal(frequency=0.1) + Stepped()
+        out = torch.empty(2, 50, dtype=torch.float64)
+        self.assertIs(signal.sample_vectorized(self.time_vector, batch_size=2, out=out), out)
+        torch.testing.assert_close(out[1], signal.sample_vectorized(self.time_vector).double(), rtol=0, atol=1e-6)
+
+    def test_scale(self):
+        self.assertEqual(Scale(Stepped(), 3.0).sample_next(1.0, None, None), 3.0 * math.sin(1.0))
+        scaled = Scale(Stepped(), 3.0).sample_vectorized(self.time_vector)
+        torch.testing.assert_close(scaled.double(), 3.0 * torch.sin(self.time_vector.double()), rtol=0, atol=1e-5)
+        grid = Scale(Sinusoidal(frequency=[0.1, 0.2]), -2.0).sample_next(1.0, None, None)
+        torch.testing.assert_close(grid, -2.0 * torch.sin(2 * math.pi * torch.tensor([0.1, 0.2], dtype=torch.float64)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import math
+import unittest
+
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.config import Configurable, dumps, from_config, rebuild
+from syntheticprophet.noise import GaussianNoise, RedNoise
+from syntheticprophet.signals import CAR, Sinusoidal
+
+
+class Transformed(Configurable):
+    """Configurable holding a function argument."""
+
+    def __init__(self, function, factor=1.0):
+        self.function = function
+        self.factor = factor
+
+
+def make_series():
+    signal = Sinusoidal(frequency=torch.tensor([0.1, 0.2])) + 2.0 * CAR(ar_param=0.9, seed=3)
+    return SyntheticSeries(signal, RedNoise(tau=0.5, seed=4), seed=5, dtype=torch.float64)
+
+
+class TestConfig(unittest.TestCase):
+    time_vector = torch.arange(30, dtype=torch.float32)
+
+    def test_defaults_are_recorded(self):
+        config = Sinusoidal(frequency=0.2).get_config()
+        self.assertEqual(config["class"], "syntheticprophet.signals.sinusoidal.Sinusoidal")
+        self.assertEqual(config["args"]["frequency"], 0.2)
+        self.assertIn("amplitude", config["args"])
+
+    def test_round_trip(self):
+        series = make_series()
+        config = series.get_config()
+        restored = SyntheticSeries.from_config(json.loads(json.dumps(config)))
+        self.assertEqual(dumps(restored.get_config()), dumps(config))
+        for expected, value in zip(make_series().sample(self.time_vector), restored.sample(self.time_vector)):
+            self.assertTrue(torch.equal(expected, value))
+
+    def test_config_ignores_sampling_state(self):
+        series = make_series()
+        config = dumps(series.get_config())
+        series.sample(self.time_vector)
+        self.assertEqual(dumps(series.get_config()), config)
+
+    def test_dumps_is_canonical(self):
+        self.assertEqual(dumps({"b": 1, "a": [1.5, None]}), '{"a":[1.5,null],"b":1}')
+        self.assertEqual(dumps(make_series().get_config()), dumps(make_series().get_config()))
+        self.assertNotEqual(dumps(make_series().get_config()), dumps(SyntheticSeries(Sinusoidal()).get_config()))
+
+    def test_functions(self):
+        config = Transformed(math.sqrt, factor=2.0).get_config()
+        self.assertEqual(config["args"]["function"], {"__function__": "math.sqrt"})
+        self.assertIs(Transformed.from_config(config).function, math.sqrt)
+        with self.assertRaises(ValueError):
+            Transformed(lambda x: x).get_config()
+
+    def test_generators_are_rejected(self):
+        with self.assertRaises(ValueError):
+            GaussianNoise(generator=torch.Generator()).get_config()
+
+    def test_from_config_checks_class(self):
+        with self.assertRaises(TypeError):
+            Sinusoidal.from_config(GaussianNoise().get_config())
+        self.assertIsInstance(from_config(GaussianNoise().get_config()), GaussianNoise)
+
+    def test_rebuild_keeps_lambdas_and_drops_state(self):
+        function = lambda x: x
+        self.assertIs(rebuild(Transformed(function)).function, function)
+        car = CAR(ar_param=0.9, seed=3)
+        expected = car.sample_vectorized(self.time_vector)
+        car.sample_vectorized(self.time_vector - 100)
+        self.assertTrue(torch.equal(rebuild(car).sample_vectorized(self.time_vector), expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
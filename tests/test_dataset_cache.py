@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.dataset_cache import DatasetCache
+from syntheticprophet.noise import GaussianNoise
+from syntheticprophet.signals import CAR, Sinusoidal
+from syntheticprophet.timesampler import TimeSampler
+
+
+def make_series(seed=5):
+    return SyntheticSeries(Sinusoidal(frequency=0.1) + CAR(ar_param=0.9), GaussianNoise(std=0.1), seed=seed)
+
+
+class TestDatasetCache(unittest.TestCase):
+    time_vector = torch.arange(16, dtype=torch.float32)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DatasetCache(cache_dir=self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_is_stable(self):
+        key = self.cache.key(make_series(), 4, self.time_vector)
+        self.assertEqual(self.cache.key(make_series(), 4, self.time_vector.clone()), key)
+        self.assertEqual(DatasetCache(cache_dir=self.directory.name).key(make_series(), 4, self.time_vector), key)
+        for other in (
+            self.cache.key(make_series(6), 4, self.time_vector),
+            self.cache.key(make_series(), 5, self.time_vector),
+            self.cache.key(make_series(), 4, self.time_vector + 1),
+            self.cache.key(make_series(), 4, self.time_vector, dtype=np.float64),
+        ):
+            self.assertNotEqual(other, key)
+
+    def test_key_of_time_sampler(self):
+        key = self.cache.key(make_series(), 4, TimeSampler(stop_time=10, seed=1), num_points=8)
+        self.assertEqual(self.cache.key(make_series(), 4, TimeSampler(stop_time=10, seed=1), num_points=8), key)
+        self.assertNotEqual(self.cache.key(make_series(), 4, TimeSampler(stop_time=10, seed=2), num_points=8), key)
+        self.assertNotEqual(self.cache.key(make_series(), 4, TimeSampler(stop_time=10, seed=1), num_points=9), key)
+
+    def test_seed_is_required(self):
+        with self.assertRaises(ValueError):
+            self.cache.key(make_series(None), 4, self.time_vector)
+        self.assertEqual(self.cache.config(make_series(None), 4, self.time_vector, seed=7)["seed"], 7)
+
+    def test_generate_then_load(self):
+        dataset = self.cache.generate(make_series(), 4, self.time_vector)
+        key = self.cache.key(make_series(), 4, self.time_vector)
+        self.assertIn(key, self.cache)
+        self.assertEqual(dataset["samples"].shape, (4, 16))
+        with open(os.path.join(self.cache.path(key), "config.json")) as f:
+            self.assertEqual(json.load(f), self.cache.config(make_series(), 4, self.time_vector))
+
+        again = self.cache.generate(make_series(), 4, self.time_vector)
+        for column in dataset:
+            np.testing.assert_array_equal(again[column], dataset[column])
+        self.assertEqual(len(self.cache.entries()), 1)
+        self.assertFalse([name for name in os.listdir(self.cache.directory) if name.startswith(".")])
+
+    def test_evict_least_recently_used(self):
+        keys = []
+        for seed in (1, 2, 3):
+            self.cache.generate(make_series(seed), 4, self.time_vector)
+            keys.append(self.cache.key(make_series(seed), 4, self.time_vector))
+        size = self.cache.entries()[0][1]
+        self.assertEqual(self.cache.size(), 3 * size)
+
+        # Loading the first dataset makes the second the least recently used
+        os.utime(self.cache.path(keys[1]), (0, 0))
+        self.cache.load(keys[0])
+        self.cache.max_bytes = 2 * size
+        self.cache.evict()
+        self.assertEqual(sorted(key for key, _, _ in self.cache.entries()), sorted([keys[0], keys[2]]))
+
+        self.cache.max_bytes = 0
+        self.cache.evict(keep=keys[2])
+        self.assertEqual([key for key, _, _ in self.cache.entries()], [keys[2]])
+        self.cache.clear()
+        self.assertEqual(self.cache.entries(), [])
+        self.assertIsNone(self.cache.load(keys[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import warnings
+
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.noise import GaussianNoise, RedNoise
+from syntheticprophet.signals import (
+    CAR, NARMA, AutoRegressive, GaussianProcess, MackeyGlass, PseudoPeriodic, Sinusoidal
+)
+from syntheticprophet.timesampler import TimeSampler
+
+GENERATORS = {
+    "Sinusoidal": lambda **kwargs: Sinusoidal(**kwargs),
+    "CAR": lambda **kwargs: CAR(ar_param=0.9, seed=1, **kwargs),
+    "AutoRegressive": lambda **kwargs: AutoRegressive(ar_param=[0.5], seed=1, **kwargs),
+    "NARMA": lambda **kwargs: NARMA(**kwargs),
+    "GaussianProcess": lambda **kwargs: GaussianProcess(seed=1, **kwargs),
+    "PseudoPeriodic": lambda **kwargs: PseudoPeriodic(seed=1, **kwargs),
+    "MackeyGlass": lambda **kwargs: MackeyGlass(backend="torch", burn_in=20.0, **kwargs),
+    "GaussianNoise": lambda **kwargs: GaussianNoise(seed=1, **kwargs),
+    "RedNoise": lambda **kwargs: RedNoise(seed=1, **kwargs),
+}
+
+
+class TestDtype(unittest.TestCase):
+    time_vector = torch.linspace(0, 10, 50)
+
+    def setUp(self):
+        warnings.simplefilter("ignore")
+
+    def test_generator_dtype(self):
+        for name, make in GENERATORS.items():
+            for dtype in (torch.float16, torch.float64):
+                with self.subTest(generator=name, dtype=dtype):
+                    self.assertEqual(make(dtype=dtype).sample_vectorized(self.time_vector).dtype, dtype)
+                    self.assertEqual(make(dtype=dtype).sample_vectorized(self.time_vector, 3).dtype, dtype)
+
+    def test_generator_out(self):
+        for name, make in GENERATORS.items():
+            with self.subTest(generator=name):
+                out = torch.empty(3, 50, dtype=torch.float64)
+                self.assertIs(make().sample_vectorized(self.time_vector, 3, out=out), out)
+                # A fresh generator with the same seed writes the same values as it returns
+                torch.testing.assert_close(out, make(dtype=torch.float64).sample_vectorized(self.time_vector, 3))
+
+    def test_series_out_buffers(self):
+        for signal in (Sinusoidal() + CAR(ar_param=0.9, seed=2), NARMA()):
+            with self.subTest(signal=type(signal).__name__):
+                series = SyntheticSeries(signal, GaussianNoise(seed=3), dtype=torch.float64)
+                self.assertEqual([values.dtype for values in series.sample(self.time_vector)], [torch.float64] * 3)
+                buffers = tuple(torch.empty(4, 50) for _ in range(3))
+                result = series.sample_batch(self.time_vector, 4, out=buffers)
+                self.assertTrue(all(a is b for a, b in zip(result, buffers)))
+                torch.testing.assert_close(buffers[0], buffers[1] + buffers[2])
+
+    def test_time_sampler_dtype(self):
+        sampler = TimeSampler(seed=0, dtype=torch.float64)
+        self.assertEqual(sampler.sample_time(num_points=10).dtype, torch.float64)
+        self.assertEqual(sampler.sample_time(num_points=10, how="irregular", keep_percentage=50).dtype, torch.float64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import math
+import unittest
+from unittest import mock
+
+import torch
+
+from syntheticprophet.signals import GaussianProcess
+from syntheticprophet.signals import gaussian_process
+from syntheticprophet.signals.gaussian_process import STATIONARY_KERNELS
+
+
+class TestRandomFourierFeatures(unittest.TestCase):
+    n_series = 4000
+    time_vector = torch.arange(21, dtype=torch.float64) * 0.25
+
+    def empirical_error(self, kernel:str, n_features:int)->float:
+        process = GaussianProcess(kernel=kernel, p=2.0, approximation="rff", n_features=n_features, seed=0)
+        samples = process.sample_vectorized(self.time_vector, self.n_series).double()
+        empirical = samples.T @ samples / self.n_series
+        exact = process.kernel_function(self.time_vector[:, None], self.time_vector[None, :])
+        return float((empirical - exact).abs().max())
+
+    def test_covariance_converges_to_kernel(self):
+        for kernel in STATIONARY_KERNELS:
+            for n_features in (50, 500, 5000):
+                # Sampling error of n_series draws, plus the feature error ~ sqrt(2 / n_features)
+                tolerance = 0.1 + 2.5 * math.sqrt(2 / n_features)
+                with self.subTest(kernel=kernel, n_features=n_features):
+                    self.assertLess(self.empirical_error(kernel, n_features), tolerance)
+
+
+class TestStateSpace(unittest.TestCase):
+    kernels = {
+        "Matern-0.5": {"kernel": "Matern", "nu": 0.5},
+        "Matern-1.5": {"kernel": "Matern", "nu": 1.5},
+        "Matern-2.5": {"kernel": "Matern", "nu": 2.5},
+        "Exponential": {"kernel": "Exponential", "gamma": 1.0},
+    }
+    # Irregular and fewer than 16 normals per draw, so that torch draws the block and the
+    # single normals alike
+    time_vector = torch.tensor([0.0, 0.3, 1.1, 1.2, 2.5], dtype=torch.float64)
+
+    def make(self, name, **kwargs):
+        return GaussianProcess(method="statespace", lengthscale=0.8, **self.kernels[name], **kwargs)
+
+    def test_stepwise_matches_vectorized(self):
+        for name in self.kernels:
+            with self.subTest(kernel=name):
+                vectorized = self.make(name, seed=0).sample_vectorized(self.time_vector)
+                generator = self.make(name, seed=0)
+                stepwise = torch.tensor([generator.sample_next(t, None, None) for t in self.time_vector])
+                torch.testing.assert_close(stepwise, vectorized.to(stepwise.dtype))
+
+    def test_chunks_continue_the_process(self):
+        for name in self.kernels:
+            with self.subTest(kernel=name):
+                expected = self.make(name, seed=0).sample_vectorized(self.time_vector)
+                generator = self.make(name, seed=0)
+                chunks = [generator.sample_vectorized(self.time_vector[:2]), generator.sample_vectorized(self.time_vector[2:])]
+                torch.testing.assert_close(torch.cat(chunks), expected)
+
+    def test_covariance_matches_kernel(self):
+        for name in self.kernels:
+            with self.subTest(kernel=name):
+                process = self.make(name, seed=0)
+                samples = process.sample_vectorized(self.time_vector, batch_size=20000).double()
+                empirical = samples.T @ samples / samples.shape[0]
+                expected = process.covariance_matrix(self.time_vector)
+                self.assertLess(float((empirical - expected).abs().max()), 0.05)
+
+
+class TestIntegerTime(unittest.TestCase):
+    def test_int_arange_matches_float(self):
+        configurations = {
+            "circulant": {"method": "circulant"},
+            "dense": {"method": "dense"},
+            "rff": {"approximation": "rff"},
+            "statespace": {"kernel": "Matern", "nu": 1.5, "method": "statespace"},
+        }
+        for name, kwargs in configurations.items():
+            with self.subTest(method=name):
+                values = GaussianProcess(seed=0, **kwargs).sample_vectorized(torch.arange(100))
+                expected = GaussianProcess(seed=0, **kwargs).sample_vectorized(torch.arange(100, dtype=torch.float64))
+                self.assertEqual(values.shape, (100,))
+                self.assertTrue(torch.equal(values, expected))
+
+
+class TestCholeskyCache(unittest.TestCase):
+    # Factors of 10 float64 timestamps take 800 bytes
+    factor_bytes = 10 * 10 * 8
+
+    def setUp(self):
+        gaussian_process.clear_cholesky_cache()
+        self.addCleanup(gaussian_process.clear_cholesky_cache)
+
+    def grid(self, start):
+        return torch.arange(10, dtype=torch.float64) + start
+
+    def test_repeated_grid_hits(self):
+        factor = GaussianProcess(method="dense").cholesky_factor(self.grid(0))
+        self.assertIs(GaussianProcess(method="dense", seed=3).cholesky_factor(self.grid(0)), factor)
+        self.assertIsNot(GaussianProcess(method="dense", lengthscale=2.0).cholesky_factor(self.grid(0)), factor)
+        self.assertIsNot(GaussianProcess(method="dense").cholesky_factor(self.grid(1)), factor)
+
+    def test_eviction_by_bytes(self):
+        process = GaussianProcess(method="dense")
+        with mock.patch.object(gaussian_process, "CHOLESKY_CACHE_BYTES", 2 * self.factor_bytes):
+            first = process.cholesky_factor(self.grid(0))
+            second = process.cholesky_factor(self.grid(1))
+            # Using the first factor makes the second the least recently used
+            self.assertIs(process.cholesky_factor(self.grid(0)), first)
+            process.cholesky_factor(self.grid(2))
+            self.assertEqual(len(gaussian_process._cholesky_cache), 2)
+            self.assertIs(process.cholesky_factor(self.grid(0)), first)
+            self.assertIsNot(process.cholesky_factor(self.grid(1)), second)
+
+    def test_large_factors_are_not_cached(self):
+        with mock.patch.object(gaussian_process, "CHOLESKY_CACHE_BYTES", self.factor_bytes - 1):
+            GaussianProcess(method="dense").cholesky_factor(self.grid(0))
+        self.assertEqual(len(gaussian_process._cholesky_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
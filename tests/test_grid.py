@@ -0,0 +1,120 @@
+import itertools
+import unittest
+
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.grid import align_grids, as_column, grid_shape, is_grid
+from syntheticprophet.noise import GaussianNoise
+from syntheticprophet.signals import CAR, GaussianProcess, PseudoPeriodic, Sinusoidal
+
+
+class TestGridHelpers(unittest.TestCase):
+    def test_is_grid(self):
+        self.assertFalse(is_grid(1.5))
+        self.assertFalse(is_grid(torch.tensor(1.5)))
+        self.assertTrue(is_grid([1.0, 2.0]))
+        self.assertTrue(is_grid(torch.tensor([1.5])))
+
+    def test_grid_shape(self):
+        self.assertEqual(grid_shape(1.0, 2.0), ())
+        self.assertEqual(grid_shape(torch.ones(3), 2.0), (3,))
+        self.assertEqual(grid_shape(torch.ones(3, 1), torch.ones(4)), (3, 4))
+        with self.assertRaises(RuntimeError):
+            grid_shape(torch.ones(3), torch.ones(4))
+
+    def test_as_column(self):
+        self.assertEqual(as_column(2.0), 2.0)
+        self.assertEqual(as_column([1.0, 2.0]).shape, (2, 1))
+        self.assertEqual(as_column(torch.ones(3, dtype=torch.float64), torch.float32).dtype, torch.float32)
+
+    def test_align_grids(self):
+        first, second = align_grids(torch.ones(4, 3, 10), torch.ones(4, 10), batched=True)
+        self.assertEqual((first + second).shape, (4, 3, 10))
+        self.assertEqual(second.shape, (4, 1, 10))
+        first, second = align_grids(torch.ones(3, 10), torch.ones(10), batched=False)
+        self.assertEqual(second.shape, (10,))
+
+
+class TestParameterGrids(unittest.TestCase):
+    time_vector = torch.linspace(0, 5, 40)
+    frequencies = torch.tensor([0.5, 1.0, 2.0])
+
+    def test_sinusoidal_rows_match_separate_signals(self):
+        amplitudes = torch.tensor([1.0, 2.0, 0.5])
+        values = Sinusoidal(amplitude=amplitudes, frequency=self.frequencies).sample_vectorized(self.time_vector)
+        self.assertEqual(values.shape, (3, 40))
+        for i in range(3):
+            expected = Sinusoidal(amplitude=float(amplitudes[i]), frequency=float(self.frequencies[i]))
+            torch.testing.assert_close(values[i], expected.sample_vectorized(self.time_vector))
+
+    def test_sinusoidal_combinations_and_batches(self):
+        signal = Sinusoidal(amplitude=torch.tensor([[1.0], [2.0]]), frequency=self.frequencies)
+        self.assertEqual(signal.sample_vectorized(self.time_vector).shape, (2, 3, 40))
+        self.assertEqual(signal.sample_vectorized(self.time_vector, batch_size=4).shape, (4, 2, 3, 40))
+
+    def test_pseudoperiodic_shapes(self):
+        signal = PseudoPeriodic(frequency=self.frequencies, seed=0)
+        self.assertEqual(signal.sample_vectorized(self.time_vector).shape, (3, 40))
+        self.assertEqual(signal.sample_vectorized(self.time_vector, batch_size=4).shape, (4, 3, 40))
+
+    def test_gaussian_noise_std_grid(self):
+        stds = torch.tensor([1.0, 2.0, 3.0])
+        values = GaussianNoise(std=stds, seed=0).sample_vectorized(self.time_vector)
+        standard = GaussianNoise(std=1.0, seed=0).sample_vectorized(self.time_vector, batch_size=3)
+        torch.testing.assert_close(values, stds[:, None] * standard)
+        self.assertEqual(GaussianNoise(std=stds, seed=0).sample_vectorized(self.time_vector, 4).shape, (4, 3, 40))
+
+    def test_gaussian_process_lengthscale_grid(self):
+        lengthscales = torch.tensor([0.5, 2.0])
+        time_vector = torch.arange(8, dtype=torch.float32) * 0.5
+        process = GaussianProcess(lengthscale=lengthscales, method="dense", seed=0)
+        covariances = process.covariance_matrix(time_vector)
+        self.assertEqual(covariances.shape, (2, 8, 8))
+        for i in range(2):
+            separate = GaussianProcess(lengthscale=float(lengthscales[i]), method="dense")
+            torch.testing.assert_close(covariances[i], separate.covariance_matrix(time_vector))
+
+        samples = process.sample_vectorized(time_vector, batch_size=20000).double()
+        self.assertEqual(samples.shape, (20000, 2, 8))
+        empirical = torch.einsum("bpi,bpj->pij", samples, samples) / samples.shape[0]
+        self.assertLess(float((empirical - covariances).abs().max()), 0.05)
+
+        for kwargs in ({"method": "circulant"}, {"approximation": "rff"}):
+            with self.subTest(**kwargs):
+                process = GaussianProcess(lengthscale=lengthscales, seed=0, **kwargs)
+                self.assertEqual(process.sample_vectorized(time_vector, batch_size=3).shape, (3, 2, 8))
+        with self.assertRaises(ValueError):
+            GaussianProcess(kernel="Matern", nu=1.5, lengthscale=lengthscales, method="statespace")
+
+    def test_gaussian_process_grid_of_ignored_lengthscales(self):
+        # Periodic and Constant kernels do not depend on the lengthscale: every grid point gets its own draw
+        lengthscales = torch.tensor([0.5, 2.0])
+        cases = [("Periodic", "circulant"), ("Periodic", "dense"), ("Periodic", "auto"), ("Constant", "dense")]
+        for (kernel, method), n_points in itertools.product(cases, (100, 101)):
+            with self.subTest(kernel=kernel, method=method, n_points=n_points):
+                process = GaussianProcess(kernel=kernel, lengthscale=lengthscales, method=method, seed=0)
+                time_vector = torch.arange(n_points, dtype=torch.float64)
+                self.assertEqual(process.sample_vectorized(time_vector).shape, (2, n_points))
+                self.assertEqual(process.sample_vectorized(time_vector, batch_size=3).shape, (3, 2, n_points))
+
+    def test_composite_broadcasts(self):
+        grid, car = Sinusoidal(frequency=self.frequencies), CAR(ar_param=0.9, seed=0)
+        values = (grid + car).sample_vectorized(self.time_vector)
+        self.assertEqual(values.shape, (3, 40))
+        expected = grid.sample_vectorized(self.time_vector) + CAR(ar_param=0.9, seed=0).sample_vectorized(self.time_vector)
+        torch.testing.assert_close(values, expected)
+
+    def test_series_broadcasts(self):
+        series = SyntheticSeries(Sinusoidal(frequency=self.frequencies), GaussianNoise(std=0.1, seed=0))
+        samples, signals, errors = series.sample(self.time_vector)
+        self.assertEqual((samples.shape, signals.shape, errors.shape), ((3, 40), (3, 40), (40,)))
+        torch.testing.assert_close(samples, signals + errors)
+
+        samples, signals, errors = series.sample_batch(self.time_vector, 4)
+        self.assertEqual((samples.shape, signals.shape, errors.shape), ((4, 3, 40), (4, 3, 40), (4, 40)))
+        torch.testing.assert_close(samples, signals + errors[:, None])
+
+
+if __name__ == "__main__":
+    unittest.main()
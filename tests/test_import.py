@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# Modules that only the generators using them may import
+HEAVY_MODULES = ("jitcdde", "symengine", "sympy", "scipy", "numba", "pyarrow")
+# Seconds that `import syntheticprophet` may take on top of `import torch`
+IMPORT_BUDGET = 0.5
+
+SCRIPT = """
+import json, sys, time
+import torch
+start = time.perf_counter()
+import syntheticprophet
+from syntheticprophet.signals import Sinusoidal
+from syntheticprophet.noise import GaussianNoise
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "modules": sorted(sys.modules)}))
+"""
+
+
+class TestImport(unittest.TestCase):
+    def test_import_is_light(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        loaded = [module for module in HEAVY_MODULES if module in result["modules"]]
+        self.assertEqual(loaded, [])
+        self.assertLess(result["seconds"], IMPORT_BUDGET)
+
+    def test_heavy_generators_resolve_on_first_use(self):
+        import syntheticprophet.signals
+
+        self.assertEqual(syntheticprophet.signals.MackeyGlass.__name__, "MackeyGlass")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import unittest
+
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.instrumentation import active_profiler, profile
+from syntheticprophet.noise import GaussianNoise
+from syntheticprophet.signals import Sinusoidal
+from syntheticprophet.signals.base_signal import BaseSignal
+
+
+class Feedback(BaseSignal):
+    """Half the last sample, a signal that can only be stepped with its history."""
+
+    def __init__(self):
+        super().__init__(vectorizable=False)
+
+    def sample_next(self, time, samples, errors):
+        return 0.5 * float(samples[-1]) if len(samples) else 1.0
+
+
+class TestProfile(unittest.TestCase):
+    time_vector = torch.arange(20, dtype=torch.float32)
+
+    def vectorized_series(self):
+        return SyntheticSeries(Sinusoidal(frequency=0.1), GaussianNoise(std=0.1, seed=0))
+
+    def test_disabled_by_default(self):
+        series = self.vectorized_series()
+        signal_generator = series.signal_generator
+        self.assertIsNone(active_profiler())
+        series.sample(self.time_vector)
+        self.assertIs(series.signal_generator, signal_generator)
+
+    def test_nested_profiles_record_innermost(self):
+        series = self.vectorized_series()
+        with profile() as outer:
+            with profile() as inner:
+                self.assertIs(active_profiler(), inner)
+                series.sample(self.time_vector)
+            self.assertIs(active_profiler(), outer)
+        self.assertIsNone(active_profiler())
+        self.assertEqual(len(inner.calls), 1)
+        self.assertEqual(len(outer.calls), 0)
+
+    def test_vectorized_sample(self):
+        series = self.vectorized_series()
+        generators = (series.signal_generator, series.noise_generator)
+        with profile() as profiler:
+            samples, signals, errors = series.sample(self.time_vector)
+        self.assertEqual((series.signal_generator, series.noise_generator), generators)
+        record = profiler.to_dict()["calls"][0]
+        self.assertEqual(record["name"], "sample")
+        self.assertEqual(record["path"], "vectorized")
+        self.assertEqual(record["n_points"], 20)
+        self.assertIsNone(record["batch_size"])
+        self.assertEqual(record["bytes"], sum(t.nelement() * t.element_size() for t in (samples, signals, errors)))
+        self.assertEqual(record["generators"]["signal"]["class"], "Sinusoidal")
+        self.assertEqual(record["generators"]["noise"]["class"], "GaussianNoise")
+        for stats in record["generators"].values():
+            self.assertEqual(stats["sample_vectorized_calls"], 1)
+            self.assertEqual(stats["sample_next_calls"], 0)
+
+    def test_stepwise_batch_is_one_call(self):
+        series = SyntheticSeries(Feedback())
+        with profile() as profiler:
+            series.sample_batch(self.time_vector, 3)
+        self.assertEqual(len(profiler.calls), 1)
+        record = profiler.to_dict()["calls"][0]
+        self.assertEqual((record["name"], record["path"], record["batch_size"]), ("sample_batch", "stepwise", 3))
+        self.assertEqual(record["generators"]["signal"]["sample_next_calls"], 3 * 20)
+        self.assertEqual(record["generators"]["signal"]["sample_vectorized_calls"], 0)
+
+    def test_hybrid_sample(self):
+        series = SyntheticSeries(Feedback(), GaussianNoise(std=0.1, seed=0))
+        with profile() as profiler:
+            series.sample(self.time_vector)
+        generators = profiler.to_dict()["calls"][0]["generators"]
+        self.assertEqual(profiler.calls[0]["path"], "hybrid")
+        self.assertEqual(generators["signal"]["sample_next_calls"], 20)
+        self.assertEqual(generators["noise"]["sample_vectorized_calls"], 1)
+        self.assertEqual(generators["noise"]["sample_next_calls"], 0)
+
+    def test_summary_and_callback(self):
+        records = []
+        vectorized, stepwise = self.vectorized_series(), SyntheticSeries(Feedback())
+        with profile(callback=records.append) as profiler:
+            vectorized.sample(self.time_vector)
+            vectorized.sample_batch(self.time_vector, 4)
+            stepwise.sample(self.time_vector)
+        summary = profiler.to_dict()["summary"]
+        self.assertEqual(summary["paths"], {"vectorized": 2, "stepwise": 1})
+        self.assertEqual(summary["points"], 20 + 4 * 20 + 20)
+        self.assertEqual(summary["generators"]["signal/Sinusoidal"]["sample_vectorized_calls"], 2)
+        self.assertEqual(summary["generators"]["signal/Feedback"]["sample_next_calls"], 20)
+        self.assertEqual([record["path"] for record in records], ["vectorized", "vectorized", "stepwise"])
+        self.assertEqual(records, profiler.to_dict()["calls"])
+
+    def test_chrome_trace(self):
+        series = SyntheticSeries(Feedback(), GaussianNoise(std=0.1, seed=0))
+        with profile() as profiler:
+            series.sample(self.time_vector)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            trace = profiler.to_chrome_trace(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f), trace)
+        names = [event["name"] for event in trace["traceEvents"]]
+        self.assertEqual(
+            names,
+            ["SyntheticSeries.sample", "signal: Feedback.sample_next", "noise: GaussianNoise.sample_vectorized"],
+        )
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"]))
+        self.assertEqual(trace["traceEvents"][1]["args"], {"calls": 20})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+
+import jitcdde
+import torch
+
+from syntheticprophet.signals import MackeyGlass, dde_integrator
+
+
+def ignore_warnings(test):
+    """Silences jitcdde's warnings until the end of the test."""
+    context = warnings.catch_warnings()
+    context.__enter__()
+    test.addCleanup(context.__exit__, None, None, None)
+    warnings.simplefilter("ignore")
+
+
+class TestMackeyGlassCache(unittest.TestCase):
+    time_vector = torch.arange(0, 30, 0.5, dtype=torch.float64)
+
+    def setUp(self):
+        ignore_warnings(self)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def test_cached_state_continues_like_burn_in(self):
+        # Up to jitcdde's tolerance, as the adaptive steps differ after the restart
+        fresh = MackeyGlass(tau=5.0, burn_in=10.0, cache_dir=self.cache_dir.name)
+        restored = MackeyGlass(tau=5.0, burn_in=10.0, cache_dir=self.cache_dir.name)
+        torch.testing.assert_close(
+            restored.sample_vectorized(self.time_vector), fresh.sample_vectorized(self.time_vector),
+            rtol=0, atol=2e-5,
+        )
+
+    def cached_files(self):
+        return sorted(os.listdir(os.path.join(self.cache_dir.name, "mackeyglass")))
+
+    # jitcdde names modules after their files, and a name can only be compiled once per
+    # process, so each test compiles its own delay
+    def test_module_key_includes_jitcdde_version(self):
+        MackeyGlass(tau=4.0, burn_in=10.0, cache_dir=self.cache_dir.name)
+        with mock.patch.object(jitcdde, "__version__", "0.0.0"):
+            MackeyGlass(tau=4.0, burn_in=10.0, cache_dir=self.cache_dir.name)
+        modules = [name for name in self.cached_files() if name.endswith(".so")]
+        self.assertEqual(len(modules), 2)
+
+    def test_missing_compiler_falls_back_to_python(self):
+        with mock.patch.dict(os.environ, {"CC": os.path.join(self.cache_dir.name, "missing-cc")}):
+            samples = MackeyGlass(tau=4.5, burn_in=10.0, cache_dir=self.cache_dir.name).sample_vectorized(
+                self.time_vector
+            )
+        self.assertEqual([name for name in self.cached_files() if not name.startswith("state_")], [])
+        reference = MackeyGlass(tau=4.5, burn_in=10.0, backend="torch").sample_vectorized(self.time_vector)
+        torch.testing.assert_close(samples, reference, rtol=0, atol=2e-5)
+
+    def test_cache_write_errors_are_raised(self):
+        with mock.patch("os.replace", side_effect=PermissionError("read-only cache")):
+            with self.assertRaises(PermissionError):
+                MackeyGlass(tau=5.5, burn_in=10.0, cache_dir=self.cache_dir.name)
+        self.assertEqual(self.cached_files(), [])
+
+
+class TestMackeyGlassBackends(unittest.TestCase):
+    time_vector = torch.arange(0, 30, 0.5, dtype=torch.float64)
+
+    def setUp(self):
+        ignore_warnings(self)
+
+    def test_torch_backend_matches_jitcdde(self):
+        # tau=5 is not chaotic, so both integrations stay close over the whole series. The
+        # tolerance is that of jitcdde's adaptive steps, rtol=1e-5 on values of order one
+        reference = MackeyGlass(tau=5.0, burn_in=10.0, cache=False).sample_vectorized(self.time_vector)
+        for step in (0.05, 0.01):
+            with self.subTest(step=step):
+                samples = MackeyGlass(tau=5.0, burn_in=10.0, backend="torch", step=step).sample_vectorized(
+                    self.time_vector
+                )
+                torch.testing.assert_close(samples, reference, rtol=0, atol=2e-5)
+
+    def test_compiled_steps_match_torch_steps(self):
+        # Batch of trajectories with their own parameters, continued over several calls
+        def sample():
+            integrator = dde_integrator.MackeyGlassIntegrator(
+                17.0, torch.tensor([9.0, 10.0]), torch.tensor([0.2, 0.25]), 0.1,
+                MackeyGlass._default_initial_condition(17.0, 10.0, 0.2, 0.1),
+            )
+            integrator.integrate(100.0)
+            return torch.cat([integrator.sample(100.0 + self.time_vector + offset) for offset in (0, 30)], dim=1)
+
+        compiled = sample()
+        with mock.patch.object(dde_integrator, "_compiled_steps", False):
+            stepped = sample()
+        self.assertEqual(compiled.shape, (2, 120))
+        torch.testing.assert_close(compiled, stepped, rtol=0, atol=1e-12)
+
+
+class TestMackeyGlassSweep(unittest.TestCase):
+    time_vector = torch.arange(0, 20, 0.5, dtype=torch.float64)
+    param_grid = {"beta": [0.2, 0.25], "n": [9.0, 10.0]}
+    # Restarts from cached states differ within jitcdde's tolerance, accumulated over the series
+    atol = 1e-4
+
+    def setUp(self):
+        ignore_warnings(self)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def individual(self, **kwargs):
+        return torch.stack([
+            MackeyGlass(tau=6.0, beta=beta, n=n, burn_in=10.0, **kwargs).sample_vectorized(self.time_vector)
+            for beta in self.param_grid["beta"] for n in self.param_grid["n"]
+        ])
+
+    def test_backends_workers_and_individual_samples_agree(self):
+        kwargs = {"tau": 6.0, "burn_in": 10.0, "cache_dir": self.cache_dir.name}
+        samples = MackeyGlass.sweep(self.param_grid, self.time_vector, **kwargs)
+        self.assertEqual(samples.shape, (4, 40))
+        torch.testing.assert_close(samples, self.individual(cache=False), rtol=0, atol=self.atol)
+        parallel = MackeyGlass.sweep(self.param_grid, self.time_vector, n_workers=2, **kwargs)
+        torch.testing.assert_close(parallel, samples, rtol=0, atol=self.atol)
+        batched = MackeyGlass.sweep(self.param_grid, self.time_vector, backend="torch", **kwargs)
+        torch.testing.assert_close(batched, samples, rtol=0, atol=self.atol)
+
+    def test_shared_parameters_apply_to_the_torch_backend(self):
+        batched = MackeyGlass.sweep(self.param_grid, self.time_vector, tau=6.0, burn_in=10.0, backend="torch")
+        torch.testing.assert_close(batched, self.individual(backend="torch"))
+        # Grid values take precedence over shared ones
+        overridden = MackeyGlass.sweep(
+            [{"beta": 0.25, "n": 9.0}], self.time_vector, tau=6.0, beta=0.2, burn_in=10.0, backend="torch"
+        )
+        torch.testing.assert_close(overridden[0], batched[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+import torch
+
+from syntheticprophet.signals import NARMA
+
+
+class TestNARMA(unittest.TestCase):
+    def test_stepwise_matches_vectorized(self):
+        # Uniforms come in the same order from torch.rand, so both paths follow the same draws
+        vectorized = NARMA(seed=1).sample_vectorized(torch.arange(30))
+        generator = NARMA(seed=1)
+        stepwise = torch.tensor([generator.sample_next(t, None, None) for t in range(30)])
+        torch.testing.assert_close(stepwise, vectorized.to(stepwise.dtype), rtol=0, atol=1e-6)
+
+    def test_stepwise_continues_vectorized(self):
+        generator = NARMA(seed=2)
+        first = generator.sample_vectorized(torch.arange(20))
+        following = generator.sample_next(20, None, None)
+        expected = NARMA(seed=2).sample_vectorized(torch.arange(21))
+        torch.testing.assert_close(first, expected[:20])
+        self.assertAlmostEqual(following, float(expected[20]), places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
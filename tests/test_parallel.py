@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.noise import GaussianNoise, RedNoise
+from syntheticprophet import parallel
+from syntheticprophet.parallel import generate_dataset
+from syntheticprophet.signals import CAR, Sinusoidal
+from syntheticprophet.timesampler import TimeSampler
+
+
+def composite_spec():
+    return SyntheticSeries(Sinusoidal(frequency=0.1) + 2.0 * CAR(ar_param=0.9), RedNoise(tau=0.5), seed=5)
+
+
+class TestGenerateDataset(unittest.TestCase):
+    time_vector = torch.arange(64, dtype=torch.float32)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def generate(self, spec, name, **kwargs):
+        kwargs.setdefault("time_sampler", self.time_vector)
+        path = os.path.join(self.directory.name, name)
+        return {column: np.array(values) for column, values in generate_dataset(spec, 12, path=path, **kwargs).items()}
+
+    def test_composite_spec_independent_of_workers(self):
+        reference = self.generate(composite_spec(), "one", n_workers=1)
+        for n_workers, shard_size in ((2, None), (3, 1)):
+            with self.subTest(n_workers=n_workers, shard_size=shard_size):
+                dataset = self.generate(composite_spec(), f"{n_workers}", n_workers=n_workers, shard_size=shard_size)
+                for column in reference:
+                    np.testing.assert_array_equal(dataset[column], reference[column])
+        self.assertFalse(np.array_equal(reference["samples"][0], reference["samples"][1]))
+
+    def test_irregular_time_independent_of_workers(self):
+        kwargs = dict(time_sampler=TimeSampler(stop_time=10), num_points=50, keep_percentage=60, how="irregular")
+        reference = self.generate(SyntheticSeries(CAR(ar_param=0.9), GaussianNoise(), seed=1), "one", n_workers=1, **kwargs)
+        dataset = self.generate(SyntheticSeries(CAR(ar_param=0.9), GaussianNoise(), seed=1), "two", n_workers=2, **kwargs)
+        np.testing.assert_array_equal(dataset["time"], reference["time"])
+        np.testing.assert_array_equal(dataset["samples"], reference["samples"])
+
+    def test_sampled_spec_starts_fresh(self):
+        reference = self.generate(composite_spec(), "fresh", n_workers=1)
+        spec = composite_spec()
+        # Stateful generators would continue from this series, which ends before the dataset's
+        spec.sample(self.time_vector - 100)
+        dataset = self.generate(spec, "sampled", n_workers=1)
+        self.assertTrue(np.isfinite(dataset["samples"]).all())
+        np.testing.assert_array_equal(dataset["samples"], reference["samples"])
+
+    def test_grid_spec_stores_a_row_per_grid_point(self):
+        frequencies = torch.tensor([0.05, 0.1, 0.2])
+
+        def grid_spec():
+            return SyntheticSeries(Sinusoidal(frequency=frequencies) + CAR(ar_param=0.9), GaussianNoise(), seed=3)
+
+        reference = self.generate(grid_spec(), "one", n_workers=1)
+        self.assertEqual(reference["samples"].shape, (36, 64))
+        dataset = self.generate(grid_spec(), "two", n_workers=2, shard_size=5)
+        for column in reference:
+            np.testing.assert_array_equal(dataset[column], reference[column])
+        series = grid_spec()
+        series.reseed(4)
+        samples, signals, _ = series.sample(self.time_vector)
+        np.testing.assert_allclose(reference["samples"][12:15], samples.numpy(), rtol=1e-6)
+        np.testing.assert_allclose(reference["signals"][12:15], signals.numpy(), rtol=1e-6)
+        np.testing.assert_array_equal(reference["time"][12:15], self.time_vector.expand(3, -1).numpy())
+
+    def test_spec_rebuilt_once_per_shard(self):
+        with mock.patch.object(parallel, "rebuild", wraps=parallel.rebuild) as rebuild:
+            dataset = self.generate(composite_spec(), "shards", n_workers=1, shard_size=4)
+        # One rebuild for the grid probe, then one per shard
+        self.assertEqual(rebuild.call_count, 4)
+        reference = self.generate(composite_spec(), "series", n_workers=1, shard_size=1)
+        np.testing.assert_array_equal(dataset["samples"], reference["samples"])
+
+
+if __name__ == "__main__":
+    unittest.main()
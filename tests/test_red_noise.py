@@ -0,0 +1,38 @@
+import unittest
+
+import torch
+
+from syntheticprophet.noise import RedNoise
+
+
+def make():
+    return RedNoise(std=1.0, tau=0.5, start_value=0.5, seed=0)
+
+
+class TestRedNoise(unittest.TestCase):
+    time_vector = torch.tensor([0.0, 0.5, 1.5, 2.0, 3.5, 4.0, 4.5, 6.0])
+
+    def test_vectorized_matches_stepwise(self):
+        # Fewer than 16 draws, so torch draws the block and the single normals alike
+        vectorized = make().sample_vectorized(self.time_vector)
+        generator = make()
+        stepwise = torch.cat([torch.as_tensor(generator.sample_next(t, None, None)).reshape(1) for t in self.time_vector])
+        torch.testing.assert_close(vectorized, stepwise.to(vectorized.dtype))
+
+    def test_resampling_same_grid_starts_new_series(self):
+        generator = make()
+        first = generator.sample_vectorized(self.time_vector)
+        second = generator.sample_vectorized(self.time_vector)
+        self.assertTrue(bool(torch.isfinite(second).all()))
+        self.assertEqual(float(second[0]), float(first[0]))
+        self.assertFalse(torch.equal(first, second))
+
+    def test_later_grid_continues_series(self):
+        generator, reference = make(), make()
+        head = generator.sample_vectorized(self.time_vector[:4])
+        tail = generator.sample_vectorized(self.time_vector[4:])
+        torch.testing.assert_close(torch.cat((head, tail)), reference.sample_vectorized(self.time_vector))
+
+
+if __name__ == "__main__":
+    unittest.main()
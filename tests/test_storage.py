@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.noise import GaussianNoise
+from syntheticprophet.signals import Sinusoidal
+from syntheticprophet.storage import load_dataset, write_dataset
+
+
+class TestWriteDataset(unittest.TestCase):
+    time_vector = torch.arange(20, dtype=torch.float32)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "dataset")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_npy_round_trip(self):
+        series = SyntheticSeries(Sinusoidal(frequency=0.1), GaussianNoise(seed=0))
+        write_dataset(series, self.time_vector, 5, self.path, batch_size=2)
+        dataset = load_dataset(self.path)
+        self.assertEqual(dataset["samples"].shape, (5, 20))
+        np.testing.assert_allclose(dataset["samples"], dataset["signals"] + dataset["errors"], atol=1e-6)
+        np.testing.assert_array_equal(dataset["time"][3], self.time_vector.numpy())
+
+    def test_parameter_grid_rows(self):
+        frequencies = torch.tensor([0.1, 0.2, 0.3])
+        series = SyntheticSeries(Sinusoidal(frequency=frequencies), GaussianNoise(seed=0))
+        write_dataset(series, self.time_vector, 5, self.path, batch_size=2)
+        dataset = load_dataset(self.path)
+        with open(os.path.join(self.path, "meta.json")) as f:
+            self.assertEqual(json.load(f)["grid"], [3])
+        self.assertEqual(dataset["samples"].shape, (15, 20))
+        for row in range(15):
+            expected = Sinusoidal(frequency=float(frequencies[row % 3])).sample_vectorized(self.time_vector)
+            np.testing.assert_allclose(dataset["signals"][row], expected.numpy(), atol=1e-5)
+        # The noise has no grid, so it is shared by the grid points of a series
+        np.testing.assert_array_equal(dataset["errors"][3], dataset["errors"][5])
+        np.testing.assert_allclose(dataset["samples"], dataset["signals"] + dataset["errors"], atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
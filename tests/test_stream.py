@@ -0,0 +1,76 @@
+import itertools
+import unittest
+
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.noise import GaussianNoise
+from syntheticprophet.signals import CAR, NARMA, Sinusoidal
+from syntheticprophet.timesampler import RegularTimeIndex
+
+
+def make_series():
+    # NARMA draws uniforms, which torch draws alike in one block or in pieces
+    return SyntheticSeries(Sinusoidal(frequency=0.1) + NARMA(seed=0))
+
+
+class TestStream(unittest.TestCase):
+    def test_chunks_of_a_regular_index(self):
+        chunks = list(make_series().stream(RegularTimeIndex(0, 1, 25), chunk_size=10))
+        self.assertEqual([len(samples) for samples, _, _ in chunks], [10, 10, 5])
+
+    def test_chunks_continue_the_series(self):
+        expected = make_series().sample(torch.arange(25))
+        for time_source in (torch.arange(25), RegularTimeIndex(0, 1, 25)):
+            with self.subTest(time_source=type(time_source).__name__):
+                chunks = list(make_series().stream(time_source, chunk_size=10))
+                for column, values in enumerate(zip(*chunks)):
+                    torch.testing.assert_close(torch.cat(values), expected[column])
+
+    def test_iterable_time_source(self):
+        time_source = (torch.arange(25), torch.arange(25, 30))
+        chunks = list(make_series().stream(time_source, chunk_size=10))
+        self.assertEqual([len(samples) for samples, _, _ in chunks], [10, 10, 5, 5])
+        torch.testing.assert_close(
+            torch.cat([samples for samples, _, _ in chunks]), make_series().sample(torch.arange(30))[0]
+        )
+
+    def test_unbounded_time_source(self):
+        time_source = (torch.arange(start, start + 8) for start in itertools.count(0, 8))
+        chunks = list(itertools.islice(make_series().stream(time_source, chunk_size=4), 5))
+        torch.testing.assert_close(
+            torch.cat([samples for samples, _, _ in chunks]), make_series().sample(torch.arange(20))[0]
+        )
+
+
+class TestSeededStream(unittest.TestCase):
+    time_vector = torch.arange(50, dtype=torch.float32)
+
+    def make_series(self):
+        return SyntheticSeries(Sinusoidal(frequency=0.1) + CAR(ar_param=0.9), GaussianNoise(std=0.1), seed=5)
+
+    def test_single_chunk_matches_sample(self):
+        (chunk,) = self.make_series().stream(self.time_vector, chunk_size=50, series_id=3)
+        series = self.make_series()
+        series.reseed(3, 0)
+        for value, expected in zip(chunk, series.sample(self.time_vector)):
+            self.assertTrue(torch.equal(value, expected))
+
+    def test_chunks_match_reseeded_samples(self):
+        chunks = list(self.make_series().stream(self.time_vector, chunk_size=20, series_id=3))
+        series = self.make_series()
+        for k, time_chunk in enumerate(torch.split(self.time_vector, 20)):
+            series.reseed(3, k)
+            for value, expected in zip(chunks[k], series.sample(time_chunk)):
+                self.assertTrue(torch.equal(value, expected))
+
+    def test_streams_repeat_for_a_chunk_size(self):
+        first = torch.cat([samples for samples, _, _ in self.make_series().stream(self.time_vector, 20, 1)])
+        second = torch.cat([samples for samples, _, _ in self.make_series().stream(self.time_vector, 20, 1)])
+        other = torch.cat([samples for samples, _, _ in self.make_series().stream(self.time_vector, 20, 2)])
+        self.assertTrue(torch.equal(first, second))
+        self.assertFalse(torch.equal(first, other))
+
+
+if __name__ == "__main__":
+    unittest.main()
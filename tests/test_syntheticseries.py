@@ -0,0 +1,97 @@
+import unittest
+
+import torch
+
+from syntheticprophet import SyntheticSeries
+from syntheticprophet.noise import GaussianNoise, RedNoise
+from syntheticprophet.signals import GaussianProcess, NARMA, PseudoPeriodic, Sinusoidal
+from syntheticprophet.signals.base_signal import BaseSignal
+
+
+class Feedback(BaseSignal):
+    """Half the last sample, a signal that can only be stepped with its history."""
+
+    def __init__(self):
+        super().__init__(vectorizable=False)
+
+    def sample_next(self, time, samples, errors):
+        return 0.5 * float(samples[-1]) if len(samples) else 1.0
+
+
+def make_series(noise):
+    return SyntheticSeries(Sinusoidal(frequency=0.3) + Feedback(), noise)
+
+
+class TestHybridSampling(unittest.TestCase):
+    # Fewer than 16 points, so torch draws the noise block and the single normals alike
+    time_vector = torch.arange(15, dtype=torch.float32) * 0.5
+    noises = {
+        "GaussianNoise": lambda: GaussianNoise(std=0.1, seed=0),
+        "RedNoise": lambda: RedNoise(tau=0.5, seed=0),
+    }
+
+    def test_composite_with_history_child_is_hybrid(self):
+        for name, noise in self.noises.items():
+            with self.subTest(noise=name):
+                self.assertEqual(make_series(noise()).sampling_path, "hybrid")
+                self.assertEqual(SyntheticSeries(Sinusoidal(), noise()).sampling_path, "vectorized")
+
+    def test_hybrid_matches_stepwise(self):
+        for name, noise in self.noises.items():
+            with self.subTest(noise=name):
+                hybrid = make_series(noise()).sample(self.time_vector)
+                stepwise = make_series(noise())._sample_stepwise(self.time_vector)
+                for value, expected in zip(hybrid, stepwise):
+                    torch.testing.assert_close(value, expected)
+
+    def test_hybrid_batch_feeds_each_series_its_history(self):
+        samples, signals, errors = make_series(self.noises["GaussianNoise"]()).sample_batch(self.time_vector, 3)
+        self.assertEqual(samples.shape, (3, 15))
+        torch.testing.assert_close(samples, signals + errors)
+        sinusoid = Sinusoidal(frequency=0.3).sample_vectorized(self.time_vector)
+        feedback = torch.cat((torch.ones(3, 1), 0.5 * samples[:, :-1]), dim=1)
+        torch.testing.assert_close(signals, sinusoid + feedback)
+        self.assertFalse(torch.equal(samples[0], samples[1]))
+
+
+class TestSampleBatch(unittest.TestCase):
+    time_vector = torch.arange(40, dtype=torch.float32) * 0.25
+    generators = {
+        "PseudoPeriodic": lambda: PseudoPeriodic(frequency=1, seed=1),
+        "GaussianProcess": lambda: GaussianProcess(seed=1),
+        "NARMA": lambda: NARMA(seed=1),
+        "GaussianNoise": lambda: GaussianNoise(seed=1),
+        "RedNoise": lambda: RedNoise(tau=0.5, seed=1),
+    }
+
+    def test_generators_draw_seeded_batches(self):
+        for name, make in self.generators.items():
+            with self.subTest(generator=name):
+                batch = make().sample_vectorized(self.time_vector, batch_size=3)
+                self.assertEqual(batch.shape, (3, 40))
+                self.assertTrue(torch.equal(make().sample_vectorized(self.time_vector, batch_size=3), batch))
+                self.assertFalse(torch.equal(batch[0], batch[1]))
+
+    def test_vectorized_batch_is_seeded(self):
+        def sample():
+            return SyntheticSeries(PseudoPeriodic(frequency=1, seed=2), GaussianNoise(seed=3)).sample_batch(
+                self.time_vector, 5
+            )
+
+        samples, signals, errors = sample()
+        self.assertEqual((samples.shape, signals.shape, errors.shape), ((5, 40),) * 3)
+        torch.testing.assert_close(samples, signals + errors)
+        for value, expected in zip(sample(), (samples, signals, errors)):
+            self.assertTrue(torch.equal(value, expected))
+
+    def test_stepwise_batch_stacks_series(self):
+        series = SyntheticSeries(Feedback())
+        samples, signals, errors = series.sample_batch(self.time_vector, 2)
+        expected = series.sample(self.time_vector)[0]
+        self.assertEqual(series.sampling_path, "stepwise")
+        self.assertTrue(torch.equal(samples, torch.stack((expected, expected))))
+        self.assertFalse(bool(errors.any()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import math
+import unittest
+
+import torch
+
+from syntheticprophet.signals import Sinusoidal
+from syntheticprophet.timesampler import RegularTimeIndex, TimeSampler, as_time_tensor
+
+
+class TestRegularTimeIndex(unittest.TestCase):
+    def test_length_and_indexing(self):
+        index = RegularTimeIndex(2.0, 0.5, 7)
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.stop, 5.0)
+        self.assertEqual(float(index[0]), 2.0)
+        self.assertEqual(float(index[-1]), 5.0)
+        self.assertEqual(index[3].dim(), 0)
+        with self.assertRaises(IndexError):
+            index[7]
+        self.assertEqual(len(RegularTimeIndex(0, 1, 0)), 0)
+        with self.assertRaises(ValueError):
+            RegularTimeIndex(0, 1, -1)
+
+    def test_slices_stay_lazy(self):
+        index = RegularTimeIndex(0, 3, 10)
+        for key in (slice(2, 8), slice(1, None, 2), slice(None, None, -1), slice(8, 20), slice(5, 5)):
+            with self.subTest(key=key):
+                sliced = index[key]
+                self.assertIsInstance(sliced, RegularTimeIndex)
+                self.assertEqual(sliced.materialize().tolist(), list(range(0, 30, 3))[key])
+        self.assertEqual([float(value) for value in index], index.materialize().tolist())
+
+    def test_integer_epoch_seconds_are_exact(self):
+        index = RegularTimeIndex(1_700_000_000, 1, 10)
+        self.assertEqual(index.dtype, torch.int64)
+        self.assertEqual(index.materialize().tolist(), list(range(1_700_000_000, 1_700_000_010)))
+        self.assertEqual(int(index[-1]), 1_700_000_009)
+
+    def test_float_timestamps_keep_float64_precision(self):
+        index = RegularTimeIndex(1.7e9, 0.25, 8)
+        expected = [1.7e9 + 0.25 * k for k in range(8)]
+        self.assertEqual(index.materialize().tolist(), expected)
+        # The same grid in float32 cannot tell the timestamps apart
+        self.assertEqual(len(set(index.materialize(torch.float32).tolist())), 1)
+
+    def test_slices_and_chunks_match_materialized(self):
+        index = RegularTimeIndex(3, 2, 25)
+        full = index.materialize()
+        self.assertTrue(torch.equal(index[5:20:3].materialize(), full[5:20:3]))
+        self.assertTrue(torch.equal(torch.cat([chunk.materialize() for chunk in index.chunks(7)]), full))
+        self.assertTrue(torch.equal(torch.stack(list(index)), full))
+
+    def test_lazy_sampler_matches_eager_grid(self):
+        sampler = TimeSampler(start_time=0, stop_time=10, dtype=torch.float64)
+        lazy = sampler.sample_time(num_points=101, lazy=True)
+        torch.testing.assert_close(as_time_tensor(lazy), sampler.sample_time(num_points=101))
+        lazy = sampler.sample_time(resolution=0.5, lazy=True)
+        torch.testing.assert_close(as_time_tensor(lazy), sampler.sample_time(resolution=0.5))
+
+    def test_sinusoid_phase_at_large_timestamps(self):
+        index = RegularTimeIndex(1.7e9, 0.1, 100)
+        samples = Sinusoidal(frequency=1 / 3).sample_vectorized(index)
+        expected = [math.sin(2 * math.pi * math.fmod((1.7e9 + 0.1 * k) / 3, 1.0)) for k in range(100)]
+        torch.testing.assert_close(samples, torch.tensor(expected, dtype=samples.dtype), rtol=0, atol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+import torch
+
+from syntheticprophet.timesampler import TimeSampler
+
+
+class TestSampleTimeBatch(unittest.TestCase):
+    def test_exact_selection(self):
+        times, lengths, mask = TimeSampler(seed=0).sample_time_batch(8, num_points=100, keep_percentage=30)
+        self.assertEqual(tuple(times.shape), (8, 30))
+        self.assertTrue(bool((lengths == 30).all()))
+        self.assertTrue(bool(mask.all()))
+        self.assertTrue(bool((times[:, 1:] >= times[:, :-1]).all()))
+
+    def test_bernoulli_selection_is_ragged(self):
+        times, lengths, mask = TimeSampler(seed=0).sample_time_batch(
+            64, num_points=1000, keep_percentage=25, selection="bernoulli"
+        )
+        self.assertEqual(times.shape[1], int(lengths.max()))
+        self.assertGreater(int(lengths.max()), int(lengths.min()))
+        self.assertAlmostEqual(float(lengths.double().mean()), 250, delta=10)
+        self.assertTrue(torch.equal(mask, torch.arange(times.shape[1]) < lengths[:, None]))
+        self.assertTrue(bool((times[:, 1:] >= times[:, :-1]).all()))
+        # Padding repeats the last timestamp of each row
+        last = times.gather(1, (lengths - 1)[:, None])
+        self.assertTrue(bool((times[~mask] == last.expand_as(times)[~mask]).all()))
+
+    def test_seeded_batches_repeat(self):
+        first = TimeSampler(seed=3).sample_time_batch(4, num_points=50, keep_percentage=50, selection="bernoulli")
+        second = TimeSampler(seed=3).sample_time_batch(4, num_points=50, keep_percentage=50, selection="bernoulli")
+        for a, b in zip(first, second):
+            self.assertTrue(torch.equal(a, b))
+
+    def test_nested_layout_matches_padded(self):
+        times, lengths, _ = TimeSampler(seed=1).sample_time_batch(
+            5, num_points=40, keep_percentage=50, selection="bernoulli"
+        )
+        nested = TimeSampler(seed=1).sample_time_batch(
+            5, num_points=40, keep_percentage=50, selection="bernoulli", layout="nested"
+        )
+        for row, length, series in zip(times, lengths.tolist(), nested.unbind()):
+            self.assertTrue(torch.equal(row[:length], series))
+
+    def test_integer_grids(self):
+        for selection in ("exact", "bernoulli"):
+            with self.subTest(selection=selection):
+                times, lengths, mask = TimeSampler(0, 100, seed=0).sample_time_batch(
+                    4, resolution=1, keep_percentage=50, selection=selection
+                )
+                self.assertEqual(times.dtype, torch.get_default_dtype())
+                self.assertTrue(bool((times[:, 1:] >= times[:, :-1]).all()))
+
+    def test_keeping_no_points(self):
+        for selection in ("exact", "bernoulli"):
+            with self.subTest(selection=selection):
+                sampler = TimeSampler(seed=0)
+                times, lengths, mask = sampler.sample_time_batch(
+                    3, num_points=20, keep_percentage=0, selection=selection
+                )
+                self.assertEqual((times.shape, mask.shape), ((3, 0), (3, 0)))
+                self.assertEqual(lengths.tolist(), [0, 0, 0])
+                nested = sampler.sample_time_batch(
+                    3, num_points=20, keep_percentage=0, selection=selection, layout="nested"
+                )
+                self.assertEqual([len(series) for series in nested.unbind()], [0, 0, 0])
+
+
+class TestSampleTime(unittest.TestCase):
+    def test_integer_grids_are_perturbed_in_float(self):
+        times = TimeSampler(0, 100, seed=0).sample_time(resolution=1, how="irregular")
+        self.assertEqual(times.dtype, torch.get_default_dtype())
+        self.assertEqual(times.shape, (100,))
+        self.assertTrue(bool((times[1:] >= times[:-1]).all()))
+        self.assertFalse(bool((times == times.round()).all()))
+
+    def test_float_grids_keep_their_dtype(self):
+        times = TimeSampler(0.0, 10.0, seed=0, dtype=torch.float64).sample_time(num_points=50, how="irregular")
+        self.assertEqual(times.dtype, torch.float64)
+
+
+if __name__ == "__main__":
+    unittest.main()